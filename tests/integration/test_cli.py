@@ -162,3 +162,21 @@ def test_list_groups(proj_path, runner):
     assert groups == true_groups
 
     assert result.exit_code == 0
+
+
+def test_status(proj_path, runner):
+    with zntrack.Project() as project:
+        zntrack.examples.ParamsToOuts(params=5)
+        zntrack.examples.WriteDVCOuts(params=3)
+    project.run()
+
+    result = runner.invoke(app, ["status"])
+    assert result.exit_code == 0
+    assert yaml.safe_load(result.stdout) == {
+        "ParamsToOuts": "AVAILABLE",
+        "WriteDVCOuts": "AVAILABLE",
+    }
+
+    pathlib.Path("nodes", "WriteDVCOuts", "output.txt").write_text("4")
+    result = runner.invoke(app, ["status", "WriteDVCOuts"])
+    assert yaml.safe_load(result.stdout) == {"WriteDVCOuts": "PENDING"}
@@ -1,4 +1,7 @@
+import pathlib
+
 import pytest
+import yaml
 
 import zntrack
 
@@ -57,3 +60,27 @@ def test_combine_dict(proj_path, eager):
         added.load()
 
     assert added.outs == {"a": [1], "b": [1, 2], "c": [1, 2, 3]}
+
+
+def test_combine_duplicate_deps(proj_path):
+    with zntrack.Project() as proj:
+        a = GenerateList(size=1, name="a")
+        b = GenerateList(size=2, name="b")
+
+        added = AddOneToList(data=a.outs + b.outs + a.outs)
+
+    proj.build()
+
+    deps = yaml.safe_load(pathlib.Path("dvc.yaml").read_text())["stages"][added.name][
+        "deps"
+    ]
+    assert deps == [
+        "nodes/a/node-meta.json",
+        "nodes/a/outs.json",
+        "nodes/b/node-meta.json",
+        "nodes/b/outs.json",
+    ]
+
+    proj.repro()
+    added.load()
+    assert added.outs == [1] + [1, 2] + [1]
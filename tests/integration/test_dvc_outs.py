@@ -1,8 +1,15 @@
+import os
 import pathlib
+import shutil
+import stat
 import typing
 
+import git
+import pytest
+
 import zntrack.examples
 from zntrack import Node, dvc, nwd
+from zntrack.utils import run_dvc_cmd
 
 
 class SingleNode(Node):
@@ -280,3 +287,100 @@ def test_use_tmp_path_exp(tmp_path_2):
     with node.state.use_tmp_path():
         assert node.outs == pathlib.Path("nodes", "WriteDVCOuts", "output.txt")
         assert pathlib.Path(node.outs).read_text() == "test"
+
+
+class WriteDirectory(Node):
+    files: list = zntrack.params()
+    outs = zntrack.outs_path(nwd / "data")
+
+    def run(self):
+        outs = pathlib.Path(self.outs)
+        outs.mkdir(parents=True, exist_ok=True)
+        for name in self.files:
+            (outs / name).write_text(name)
+
+
+def test_use_tmp_path_lazy(proj_path, tmp_path_factory, monkeypatch):
+    with zntrack.Project() as proj:
+        WriteDirectory(files=["a.txt", "b.txt", "c.txt"])
+    proj.run()
+
+    remote = tmp_path_factory.mktemp("remote").as_posix()
+    run_dvc_cmd(["remote", "add", "-d", "local", remote])
+    run_dvc_cmd(["push"])
+    repo = git.Repo()
+    repo.git.add(A=True)
+    commit = repo.index.commit("initial commit")
+    # the objects are only available in the remote
+    shutil.rmtree(".dvc/cache")
+
+    node = WriteDirectory.from_rev(rev=commit.hexsha)
+    fetched = []
+    get_file = node.state.fs.get_file
+
+    def _get_file(rpath, lpath, **kwargs):
+        fetched.append(rpath)
+        return get_file(rpath, lpath, **kwargs)
+
+    monkeypatch.setattr(node.state.fs, "get_file", _get_file)
+
+    with node.state.use_tmp_path(lazy=True):
+        outs = pathlib.Path(node.outs)
+        assert sorted(os.listdir(outs)) == ["a.txt", "b.txt", "c.txt"]
+        assert sorted(x.name for x in outs.iterdir()) == ["a.txt", "b.txt", "c.txt"]
+        assert fetched == []
+
+        assert (outs / "b.txt").read_text() == "b.txt"
+        assert (outs / "b.txt").read_text() == "b.txt"
+        # the directory is materialized only once
+        assert pathlib.Path(node.outs) == outs
+        assert fetched == ["nodes/WriteDirectory/data/b.txt"]
+
+        def _get_file_error(rpath, lpath, **kwargs):
+            fetched.append(rpath)
+            raise OSError("Connection lost")
+
+        # a failed fetch is retried on the next access
+        monkeypatch.setattr(node.state.fs, "get_file", _get_file_error)
+        with pytest.raises(OSError, match="Connection lost"):
+            (outs / "c.txt").read_text()
+        monkeypatch.setattr(node.state.fs, "get_file", _get_file)
+        assert (outs / "c.txt").read_text() == "c.txt"
+        assert fetched[1:] == ["nodes/WriteDirectory/data/c.txt"] * 2
+
+    fetched.clear()
+    with node.state.use_tmp_path():
+        outs = pathlib.Path(node.outs)
+        assert sorted(x.name for x in outs.iterdir()) == ["a.txt", "b.txt", "c.txt"]
+        # all files are visible without opening them
+        assert all((outs / x).is_file() for x in ["a.txt", "b.txt", "c.txt"])
+        assert len(fetched) == 3
+
+
+def test_use_tmp_path_from_cache(proj_path, monkeypatch):
+    with zntrack.Project() as proj:
+        WriteDirectory(files=["a.txt", "b.txt"])
+    proj.run()
+    repo = git.Repo()
+    repo.git.add(A=True)
+    commit = repo.index.commit("initial commit")
+
+    node = WriteDirectory.from_rev(rev=commit.hexsha)
+
+    def _get_file(*args, **kwargs):
+        raise AssertionError("The files should be linked from the local cache.")
+
+    monkeypatch.setattr(node.state.fs, "get_file", _get_file)
+
+    with node.state.use_tmp_path():
+        for name in ["a.txt", "b.txt"]:
+            assert (pathlib.Path(node.outs) / name).read_text() == name
+            # writing to the file does not modify the cache
+            (pathlib.Path(node.outs) / name).write_text("modified")
+
+    with node.state.use_tmp_path(link_types=["hardlink"]):
+        for name in ["a.txt", "b.txt"]:
+            file = pathlib.Path(node.outs) / name
+            assert file.read_text() == name
+            assert file.stat().st_nlink > 1
+            assert stat.S_IMODE(file.stat().st_mode) == 0o444
@@ -1,10 +1,14 @@
+import json
+import os
 import uuid
 
+import dvc.cli
 import dvc.scm
+import git
 import pytest
 
 import zntrack.examples
-from zntrack.utils import NodeStatusResults
+from zntrack.utils import NodeStatusResults, config
 
 
 def test_module_not_installed():
@@ -96,3 +100,81 @@ def test_two_nodes_connect_external(proj_path):
 
     assert node1.outs == node_a.random_number + 1
     assert node2.outs == node_a.random_number + 1
+
+
+def test_from_rev_index(proj_path, monkeypatch):
+    with zntrack.Project() as project:
+        node = zntrack.examples.ParamsToOuts(params=42)
+    project.run()
+
+    zntrack_config = json.loads(config.files.zntrack.read_text())
+    assert zntrack_config[node.name]["_cls_"] == {
+        "module": "zntrack.examples",
+        "cls": "ParamsToOuts",
+    }
+
+    def _get_stage(*args):
+        raise AssertionError("The stages should not be searched.")
+
+    monkeypatch.setattr(zntrack.core.load, "_get_stage", _get_stage)
+    assert zntrack.from_rev(node.name).outs == 42
+
+    monkeypatch.undo()
+    # older repositories do not contain the index
+    del zntrack_config[node.name]["_cls_"]
+    config.files.zntrack.write_text(json.dumps(zntrack_config))
+    assert zntrack.from_rev(node.name).outs == 42
+
+
+def test_from_rev_result_cache(proj_path, monkeypatch):
+    monkeypatch.setenv("XDG_CACHE_HOME", (proj_path / "cache").as_posix())
+    monkeypatch.setattr(config, "result_cache", True)
+
+    with zntrack.Project() as project:
+        node = zntrack.examples.ParamsToOuts(params={"data": [1, 2, 3]})
+    project.run()
+
+    repo = git.Repo()
+    repo.git.add(".")
+    repo.index.commit("initial commit")
+    rev = repo.head.commit.hexsha
+
+    # the workspace is never cached
+    assert zntrack.from_rev(node.name).outs == {"data": [1, 2, 3]}
+    assert not (proj_path / "cache").exists()
+
+    assert zntrack.from_rev(node.name, rev="HEAD").outs == {"data": [1, 2, 3]}
+    assert len(list((proj_path / "cache" / "zntrack" / "results").glob("*.pkl"))) == 1
+
+    def load(*args, **kwargs):
+        raise AssertionError("The result should be loaded from the cache.")
+
+    monkeypatch.setattr(zntrack.fields.zn.formats.JSONFormat, "load", load)
+    assert zntrack.from_rev(node.name, rev=rev).outs == {"data": [1, 2, 3]}
+
+
+def test_from_rev_moving_remote(proj_path, tmp_path_factory):
+    remote = tmp_path_factory.mktemp("remote")
+    os.chdir(remote)
+    repo = git.Repo.init()
+    dvc.cli.main(["init"])
+    with zntrack.Project() as project:
+        node = zntrack.examples.ParamsToOuts(params=1)
+    project.run()
+    repo.git.add(".")
+    repo.index.commit("initial commit")
+    os.chdir(proj_path)
+
+    remote_url = remote.as_uri()
+    assert zntrack.from_rev(node.name, remote=remote_url).params == 1
+
+    os.chdir(remote)
+    with zntrack.Project() as project:
+        node = zntrack.examples.ParamsToOuts(params=3)
+    project.run()
+    repo.git.add(".")
+    repo.index.commit("update params")
+    os.chdir(proj_path)
+
+    assert zntrack.from_rev(node.name, remote=remote_url).params == 3
+    assert zntrack.from_rev(node.name, remote=remote.as_posix()).params == 3
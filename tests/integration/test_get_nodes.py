@@ -12,7 +12,8 @@ def test_get_nodes_remote(proj_path):
     assert nodes["HelloWorld"].random_number == 123
 
 
-def test_get_nodes(proj_path):
+@pytest.mark.parametrize("max_workers", [1, 4])
+def test_get_nodes(proj_path, max_workers):
     with zntrack.Project(automatic_node_names=True) as proj:
         _ = zntrack.examples.ParamsToOuts(params=15)
         _ = zntrack.examples.ParamsToOuts(params=15)
@@ -30,7 +31,9 @@ def test_get_nodes(proj_path):
 
     proj.run()
 
-    nodes = zntrack.get_nodes(remote=proj_path, rev=None)
+    nodes = zntrack.get_nodes(remote=proj_path, rev=None, max_workers=max_workers)
+    # the order of the nodes does not depend on the number of workers
+    assert list(nodes) == list(zntrack.get_nodes(remote=proj_path, rev=None))
 
     assert nodes["ParamsToOuts"].outs == 15
     assert nodes["ParamsToOuts_1"].outs == 15
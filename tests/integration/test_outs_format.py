@@ -0,0 +1,90 @@
+import pathlib
+
+import git
+import numpy as np
+import numpy.testing as npt
+import pandas as pd
+import pytest
+
+import zntrack
+
+
+class WriteArray(zntrack.Node):
+    size: int = zntrack.params()
+    as_json: list = zntrack.outs()
+    as_pickle: dict = zntrack.outs(format="pickle")
+    as_npy: np.ndarray = zntrack.outs(format="npy")
+    as_npz: dict = zntrack.outs(format="npz")
+
+    def run(self):
+        array = np.arange(self.size, dtype=float)
+        self.as_json = array.tolist()
+        self.as_pickle = {"array": array, "size": self.size}
+        self.as_npy = array
+        self.as_npz = {"a": array, "b": array * 2}
+
+
+class WriteDataFrame(zntrack.Node):
+    df: pd.DataFrame = zntrack.outs(format="parquet")
+
+    def run(self):
+        self.df = pd.DataFrame({"a": [1, 2, 3], "b": [4.0, 5.0, 6.0]})
+
+
+@pytest.mark.parametrize("eager", [True, False])
+def test_outs_format(proj_path, eager):
+    with zntrack.Project() as project:
+        node = WriteArray(size=10)
+
+    project.run(eager=eager)
+
+    assert (node.nwd / "as_json.json").exists()
+    assert (node.nwd / "as_pickle.pkl").exists()
+    assert (node.nwd / "as_npy.npy").exists()
+    assert (node.nwd / "as_npz.npz").exists()
+
+    node = node.from_rev()
+    array = np.arange(10, dtype=float)
+    assert node.as_json == array.tolist()
+    npt.assert_array_equal(node.as_pickle["array"], array)
+    assert node.as_pickle["size"] == 10
+    npt.assert_array_equal(node.as_npy, array)
+    npt.assert_array_equal(node.as_npz["a"], array)
+    npt.assert_array_equal(node.as_npz["b"], array * 2)
+
+
+def test_outs_format_parquet(proj_path):
+    pytest.importorskip("pyarrow")
+    with zntrack.Project() as project:
+        node = WriteDataFrame()
+
+    project.run()
+
+    pd.testing.assert_frame_equal(
+        node.from_rev().df, pd.DataFrame({"a": [1, 2, 3], "b": [4.0, 5.0, 6.0]})
+    )
+
+
+def test_outs_format_unknown():
+    with pytest.raises(ValueError):
+        zntrack.outs(format="unknown")
+
+
+def test_outs_format_npy_memmap(proj_path):
+    with zntrack.Project() as project:
+        node = WriteArray(size=10)
+
+    project.run()
+
+    # the workspace file is memory mapped
+    assert isinstance(node.from_rev().as_npy, np.memmap)
+
+    repo = git.Repo()
+    repo.git.add(A=True)
+    repo.index.commit("run WriteArray")
+
+    # the file of a revision is memory mapped from the local DVC cache
+    loaded = zntrack.from_rev(node.name, rev="HEAD").as_npy
+    assert isinstance(loaded, np.memmap)
+    assert ".dvc/cache" in pathlib.Path(loaded.filename).as_posix()
+    npt.assert_array_equal(loaded, np.arange(10, dtype=float))
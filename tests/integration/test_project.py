@@ -1,12 +1,17 @@
+import copy
 import json
 import pathlib
 
+import dvc.repo
 import git
 import pytest
+import yaml
 
 import zntrack.examples
+from zntrack.core.node import get_dvc_cmd
 from zntrack.project import Experiment
-from zntrack.utils import config
+from zntrack.utils import DVCProcessError, NodeStatusResults, config, run_dvc_cmd
+from zntrack.utils.stages import add_stages
 
 
 class ZnNodesNode(zntrack.Node):
@@ -94,7 +99,7 @@ def test_WriteIO_no_name(tmp_path_2, assert_before_exp):
     assert exp1["ParamsToOuts"].params == "Hello World"
     assert exp1["ParamsToOuts"].outs == "Hello World"
 
-    exp2.load()
+    exp2.load(max_workers=2)
     assert exp2.nodes["ParamsToOuts"].params == "Lorem Ipsum"
     assert exp2.nodes["ParamsToOuts"].outs == "Lorem Ipsum"
 
@@ -176,6 +181,24 @@ def test_automatic_node_names_True(tmp_path_2):
     assert node3.outs == "Dolor Sit"
 
 
+def test_automatic_node_names_index(proj_path):
+    with zntrack.Project(automatic_node_names=True) as project:
+        nodes = [zntrack.examples.ParamsToOuts(params=idx) for idx in range(5)]
+        renamed = zntrack.examples.ParamsToOuts(params=5, name="ParamsToOuts_3")
+
+    assert [x.name for x in nodes] == ["ParamsToOuts"] + [
+        f"ParamsToOuts_{idx}" for idx in range(1, 5)
+    ]
+    assert renamed.name == "ParamsToOuts_3_1"
+
+    project.remove("ParamsToOuts_2")
+    with project:
+        node = zntrack.examples.ParamsToOuts(params=6)
+        node2 = zntrack.examples.ParamsToOuts(params=7)
+    assert node.name == "ParamsToOuts_2"
+    assert node2.name == "ParamsToOuts_5"
+
+
 def test_group_nodes(tmp_path_2):
     with zntrack.Project(automatic_node_names=True) as project:
         with project.group() as group_1:
@@ -584,3 +607,225 @@ def test_magic_names(proj_path):
     assert zntrack.from_rev(node02.name).outs == "Dolor Sit"
     assert zntrack.from_rev(node03.name).outs == "Test01"
     assert zntrack.from_rev(grp_node03.name).outs == "Test02"
+
+
+def test_add_stages(proj_path):
+    with zntrack.Project(automatic_node_names=True) as project:
+        node_1 = zntrack.examples.ParamsToOuts(params="Lorem Ipsum")
+        node_2 = zntrack.examples.ParamsToOuts(params="Dolor Sit")
+
+    cmds = [
+        *get_dvc_cmd(node_1, git_only_repo=True),
+        *get_dvc_cmd(node_2, git_only_repo=True),
+    ]
+    assert add_stages(cmds) == [node_1.name, node_2.name]
+    # re-adding unchanged stages does not modify anything
+    assert add_stages(cmds) == []
+
+    dvc_yaml = yaml.safe_load(config.files.dvc.read_text())
+    assert dvc_yaml["stages"][node_1.name]["outs"] == ["nodes/ParamsToOuts/outs.json"]
+
+    with pytest.raises(DVCProcessError):
+        add_stages([get_dvc_cmd(node_1, git_only_repo=True, force=False)[0]])
+
+    invalid_cmd = get_dvc_cmd(node_1, git_only_repo=True)[0]
+    invalid_cmd[invalid_cmd.index("--name") + 1] = "nodes/ParamsToOuts"
+    with pytest.raises(DVCProcessError, match="punctuation"):
+        add_stages([invalid_cmd])
+    assert (
+        "nodes/ParamsToOuts" not in yaml.safe_load(config.files.dvc.read_text())["stages"]
+    )
+
+
+def test_build_unchanged_nodes(proj_path, monkeypatch):
+    with zntrack.Project() as project:
+        node_1 = zntrack.examples.ParamsToOuts(params="Lorem Ipsum")
+        node_2 = zntrack.examples.ParamsToOuts(params="Dolor Sit")
+    project.build()
+
+    node_hashes = json.loads(config.files.hashes.read_text())
+    assert set(node_hashes) == {node_1.name, node_2.name}
+
+    added_stages = []
+
+    def _add_stages(scripts):
+        added_stages.append([x[3] for x in scripts if x[:2] == ["stage", "add"]])
+        return add_stages(scripts)
+
+    monkeypatch.setattr(zntrack.project.zntrack_project, "add_stages", _add_stages)
+    project.build()
+    assert added_stages == [[]]
+
+    node_2.params = "Amet"
+    project.build()
+    assert added_stages[-1] == [node_2.name]
+    assert json.loads(config.files.hashes.read_text())[node_1.name] == (
+        node_hashes[node_1.name]
+    )
+    assert zntrack.from_rev(node_2.name).params == "Amet"
+    # 'force' does not disable skipping unchanged nodes
+    project.force = True
+    project.build()
+    assert added_stages[-1] == []
+    project.build(skip_unchanged=False)
+    assert added_stages[-1] == [node_1.name, node_2.name]
+
+    # changes to the config files that are not made by ZnTrack
+    params = yaml.safe_load(config.files.params.read_text())
+    params[node_1.name]["params"] = "Modified"
+    config.files.params.write_text(yaml.safe_dump(params))
+    project.build()
+    assert added_stages[-1] == [node_1.name]
+    assert zntrack.from_rev(node_1.name).params == "Lorem Ipsum"
+
+    dvc_yaml = yaml.safe_load(config.files.dvc.read_text())
+    del dvc_yaml["stages"][node_2.name]["outs"]
+    config.files.dvc.write_text(yaml.safe_dump(dvc_yaml))
+    project.build()
+    assert added_stages[-1] == [node_2.name]
+
+    # running the nodes does not invalidate the hashes
+    project.run()
+    assert added_stages[-1] == []
+    project.build()
+    assert added_stages[-1] == []
+
+
+@pytest.mark.parametrize("max_workers", [1, 4])
+def test_run_eager_max_workers(proj_path, max_workers):
+    with zntrack.Project(automatic_node_names=True) as project:
+        add_1 = zntrack.examples.AddNumbers(a=1, b=2)
+        add_2 = zntrack.examples.AddNumbers(a=3, b=4)
+        add_3 = zntrack.examples.AddNodeAttributes(a=add_1.c, b=add_2.c)
+        add_4 = zntrack.examples.AddNodeAttributes(a=add_3.c, b=add_1.c)
+
+    project.run(eager=True, max_workers=max_workers)
+
+    assert add_3.c == 10
+    assert add_4.c == 13
+    assert add_4.state.loaded
+    assert zntrack.from_rev(add_4.name).c == 13
+
+
+def test_build_unchanged_nodes_no_save(proj_path, monkeypatch):
+    with zntrack.Project() as project:
+        node = zntrack.examples.ParamsToOuts(params="Lorem Ipsum")
+    project.build()
+
+    def save(*args, **kwargs):
+        raise AssertionError("Unchanged nodes should not be saved.")
+
+    # the hash is computed from the configuration in memory
+    monkeypatch.setattr(zntrack.examples.ParamsToOuts, "save", save)
+    project.build()
+
+    monkeypatch.undo()
+    node.params = "Dolor Sit"
+    project.build()
+    assert zntrack.from_rev(node.name).params == "Dolor Sit"
+
+
+def test_repro_jobs(proj_path):
+    with zntrack.Project(automatic_node_names=True) as project:
+        add_1 = zntrack.examples.AddNumbers(a=1, b=2)
+        add_2 = zntrack.examples.AddNumbers(a=3, b=4)
+        add_3 = zntrack.examples.AddNodeAttributes(a=add_1.c, b=add_2.c)
+        params = zntrack.examples.ParamsToOuts(params=5)
+        add_one = zntrack.examples.AddOne(number=params.outs)
+
+    project.build()
+    project.repro(jobs=2)
+
+    assert zntrack.from_rev(add_3.name).c == 10
+    assert zntrack.from_rev(add_one.name).outs == 6
+    assert dvc.repo.Repo().status() == {}
+
+    with project:
+        add_1.a = 10
+    project.build()
+    project.repro(jobs=2)
+
+    assert zntrack.from_rev(add_3.name).c == 19
+    assert zntrack.from_rev(add_one.name).outs == 6
+    assert dvc.repo.Repo().status() == {}
+
+
+def test_repro_jobs_missing_outs(proj_path):
+    with zntrack.Project() as project:
+        node = zntrack.examples.ParamsToOuts(params=1)
+    project.build()
+    run_dvc_cmd(["stage", "add", "--name", "broken", "--outs", "missing.txt", "echo"])
+
+    # a stage without its outputs is not committed
+    with pytest.raises(DVCProcessError, match=r"Failed to reproduce stages \[.broken.\]"):
+        project.repro(jobs=2)
+    assert "broken" not in yaml.safe_load(pathlib.Path("dvc.lock").read_text())["stages"]
+    assert zntrack.from_rev(node.name).outs == 1
+
+
+def test_project_status(proj_path):
+    with zntrack.Project() as project:
+        params = zntrack.examples.ParamsToOuts(params=5)
+        add_one = zntrack.examples.AddOne(number=params.outs)
+        outs_path = zntrack.examples.WriteDVCOutsPath(params=3)
+    project.run()
+
+    assert project.status() == {
+        "ParamsToOuts": NodeStatusResults.AVAILABLE,
+        "AddOne": NodeStatusResults.AVAILABLE,
+        "WriteDVCOutsPath": NodeStatusResults.AVAILABLE,
+    }
+
+    with project:
+        params.params = 6
+        added = zntrack.examples.ParamsToMetrics(params=1)
+    project.build()
+    (pathlib.Path(outs_path.outs) / "file.txt").write_text("4")
+
+    # only the node itself is outdated, like 'dvc status'
+    assert project.status() == {
+        "ParamsToOuts": NodeStatusResults.PENDING,
+        "AddOne": NodeStatusResults.AVAILABLE,
+        "WriteDVCOutsPath": NodeStatusResults.PENDING,
+        added.name: NodeStatusResults.PENDING,
+    }
+    assert project.status([add_one.name]) == {"AddOne": NodeStatusResults.AVAILABLE}
+
+
+def test_add_stages_matches_dvc_stage_add(proj_path):
+    """'add_stages' uses DVC internals, the result must equal 'dvc stage add'."""
+    with zntrack.Project(automatic_node_names=True) as project:
+        numbers = zntrack.examples.AddNumbers(a=1, b=2)
+        zntrack.examples.AddNodes(a=numbers, b=numbers)
+        zntrack.examples.ParamsToMetrics(params={"loss": 0.1})
+        zntrack.examples.StreamPlots()
+        zntrack.examples.WriteMultipleDVCOuts(params=[1, 2, 3])
+
+    cmds = []
+    for node_uuid in project.graph.get_sorted_nodes():
+        cmds += get_dvc_cmd(project.graph.nodes[node_uuid]["value"], git_only_repo=True)
+
+    def _dvc_stage_add() -> dict:
+        for cmd in cmds:
+            run_dvc_cmd(cmd)
+        return yaml.safe_load(config.files.dvc.read_text())
+
+    def _add_stages() -> dict:
+        add_stages(cmds)
+        return yaml.safe_load(config.files.dvc.read_text())
+
+    expected = _dvc_stage_add()
+    config.files.dvc.unlink()
+    assert _add_stages() == expected
+
+    # fields that are not set by 'dvc stage add' are kept, when a stage is updated
+    (name, stage), *_ = expected["stages"].items()
+    stage["desc"] = "Lorem Ipsum"
+    stage["meta"] = {"author": "Dolor Sit"}
+    stage["outs"][0] = {stage["outs"][0]: {"desc": "Amet", "remote": "storage"}}
+    stage_yaml = copy.deepcopy(expected)
+    config.files.dvc.write_text(yaml.safe_dump(expected))
+    expected = _dvc_stage_add()
+    assert expected["stages"][name]["desc"] == "Lorem Ipsum"
+    config.files.dvc.write_text(yaml.safe_dump(stage_yaml))
+    assert _add_stages() == expected
@@ -0,0 +1,89 @@
+import os
+import pathlib
+import stat
+import subprocess
+import tempfile
+import time
+
+import pytest
+
+import zntrack.examples
+from zntrack.utils import worker
+
+
+@pytest.fixture()
+def worker_socket(tmp_path_factory, monkeypatch) -> pathlib.Path:
+    socket_path = tmp_path_factory.mktemp("worker") / "worker.sock"
+    proc = subprocess.Popen(["zntrack", "worker", "--socket", socket_path.as_posix()])
+    for _ in range(300):
+        if worker._is_listening(socket_path):
+            break
+        time.sleep(0.1)
+    monkeypatch.setenv(worker.SOCKET_ENV, socket_path.as_posix())
+    yield socket_path
+    proc.terminate()
+    proc.wait(timeout=10)
+    assert not socket_path.exists()
+
+
+def test_run_via_worker(proj_path, worker_socket):
+    with zntrack.Project() as project:
+        node = zntrack.examples.ParamsToOuts(params=42)
+        failing = zntrack.examples.NodeWithRestart(start=0, raise_exception_until=2)
+    project.build()
+    assert stat.S_IMODE(worker_socket.stat().st_mode) == 0o600
+
+    env = {**os.environ, "ZNTRACK_VIA_WORKER": "1"}
+    cmd = ["zntrack", "run", "zntrack.examples.ParamsToOuts", "--name", node.name]
+    subprocess.run(cmd, check=True, env=env)
+    node.load()
+    assert node.outs == 42
+
+    cmd = ["zntrack", "run", "zntrack.examples.NodeWithRestart", "--name", failing.name]
+    proc = subprocess.run(cmd, env=env, capture_output=True, text=True)
+    assert proc.returncode == 1
+    assert "This is a test exception" in proc.stderr
+
+
+def test_run_via_worker_fallback(proj_path, monkeypatch, tmp_path):
+    monkeypatch.setenv(worker.SOCKET_ENV, (tmp_path / "missing.sock").as_posix())
+    with zntrack.Project() as project:
+        node = zntrack.examples.ParamsToOuts(params=42)
+    project.build()
+
+    cmd = ["zntrack", "run", "zntrack.examples.ParamsToOuts", "--name", node.name]
+    subprocess.run([*cmd, "--via-worker"], check=True)
+    node.load()
+    assert node.outs == 42
+
+
+def test_worker_rejects_other_users(worker_socket, monkeypatch):
+    monkeypatch.setattr(os, "getuid", lambda: os.geteuid() + 1)
+    with pytest.raises(zntrack.exceptions.WorkerNotAvailableError, match="uid"):
+        worker.submit({"node": "", "name": None, "meta_only": True})
+
+
+def test_worker_socket_path(tmp_path, monkeypatch):
+    monkeypatch.delenv(worker.SOCKET_ENV, raising=False)
+    monkeypatch.delenv("XDG_RUNTIME_DIR", raising=False)
+    monkeypatch.setattr(tempfile, "tempdir", tmp_path.as_posix())
+
+    socket_path = worker.get_socket_path()
+    assert socket_path.parent == tmp_path / f"zntrack-{os.getuid()}"
+    assert stat.S_IMODE(socket_path.parent.stat().st_mode) == 0o700
+
+    socket_path.parent.chmod(0o755)
+    with pytest.raises(PermissionError):
+        worker.get_socket_path()
+
+
+def test_worker_env(monkeypatch):
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "secret")
+    monkeypatch.setenv("DVC_ROOT", "/path")
+    monkeypatch.delenv(worker.FORWARD_ENV, raising=False)
+    env = worker._get_env()
+    assert "AWS_SECRET_ACCESS_KEY" not in env
+    assert env["DVC_ROOT"] == "/path"
+
+    monkeypatch.setenv(worker.FORWARD_ENV, "1")
+    assert worker._get_env()["AWS_SECRET_ACCESS_KEY"] == "secret"
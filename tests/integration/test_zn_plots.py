@@ -16,3 +16,70 @@ def test_WritePlots(proj_path, eager):
     if not eager:
         plots.load()
     pdt.assert_frame_equal(plots.plots, pd.DataFrame({"x": [1, 2, 3], "y": [4, 5, 6]}))
+
+
+@pytest.mark.parametrize("eager", [True, False])
+def test_StreamPlots(proj_path, eager):
+    with zntrack.Project() as project:
+        node = zntrack.examples.StreamPlots(steps=10)
+
+    project.run(eager=eager)
+    if not eager:
+        node.load()
+
+    expected = pd.DataFrame({"step": range(10), "loss": [1 / (x + 1) for x in range(10)]})
+    pdt.assert_frame_equal(node.plots, expected)
+
+    node = zntrack.from_rev(node.name)
+    field = type(node).plots
+    pdt.assert_frame_equal(field.read(node, columns=["loss"]), expected[["loss"]])
+    pdt.assert_frame_equal(field.read(node, rows=slice(3, 5)), expected.iloc[3:5])
+    pdt.assert_frame_equal(
+        field.read(node, columns=["step"], rows=slice(-2, None)),
+        expected[["step"]].iloc[-2:],
+    )
+
+
+class ProxyPlots(zntrack.Node):
+    plots: pd.DataFrame = zntrack.plots(proxy=True)
+    steps: int = zntrack.params(20)
+
+    def run(self):
+        self.plots = pd.DataFrame(
+            {"step": range(self.steps), "loss": [1 / (x + 1) for x in range(self.steps)]}
+        )
+
+
+def test_ProxyPlots(proj_path):
+    with zntrack.Project() as project:
+        node = ProxyPlots()
+    project.run()
+
+    node = zntrack.from_rev(node.name)
+    expected = pd.DataFrame({"step": range(20), "loss": [1 / (x + 1) for x in range(20)]})
+    df = node.plots
+    assert isinstance(df, zntrack.fields.zn.plots_io.LazyDataFrame)
+    assert df.columns == ["step", "loss"]
+    assert len(df) == 20
+
+    pdt.assert_series_equal(df["loss"], expected["loss"])
+    pdt.assert_series_equal(df.step, expected["step"])
+    pdt.assert_frame_equal(df[["loss"]], expected[["loss"]])
+    pdt.assert_frame_equal(df.head(3), expected.head(3))
+    pdt.assert_frame_equal(df.tail(4), expected.tail(4))
+    pdt.assert_frame_equal(df.iloc[5:15:3], expected.iloc[5:15:3])
+    pdt.assert_frame_equal(df.iloc[::-4], expected.iloc[::-4])
+    pdt.assert_series_equal(df.iloc[-1], expected.iloc[-1])
+    assert df._data is None
+
+    assert df.mean()["step"] == pytest.approx(9.5)
+    pdt.assert_frame_equal(df.to_pandas(), expected)
+
+
+def test_StreamPlots_no_save(proj_path):
+    with zntrack.Project() as project:
+        node = zntrack.examples.StreamPlots(steps=3)
+    project.run(eager=True, save=False)
+
+    expected = pd.DataFrame({"step": range(3), "loss": [1 / (x + 1) for x in range(3)]})
+    pdt.assert_frame_equal(node.plots, expected)
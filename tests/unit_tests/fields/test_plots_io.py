@@ -0,0 +1,29 @@
+import pandas as pd
+import pandas.testing as pdt
+import pytest
+
+from zntrack.fields.zn.plots_io import PlotsWriter
+
+
+def test_plots_writer_resume(tmp_path):
+    file = tmp_path / "plots.csv"
+    writer = PlotsWriter(file)
+    writer.append(step=0, loss=1.0)
+    writer.extend([{"step": 1, "loss": 0.5}, {"step": 2}])
+    writer.close()
+    assert len(writer) == 3
+
+    writer = PlotsWriter(file, resume=True)
+    writer.append({"step": 3, "loss": 0.25})
+    with pytest.raises(ValueError):
+        writer.append(acc=0.9)
+    writer.close()
+
+    expected = pd.DataFrame({"step": [0, 1, 2, 3], "loss": [1.0, 0.5, None, 0.25]})
+    pdt.assert_frame_equal(writer.to_dataframe(), expected)
+    pdt.assert_frame_equal(pd.read_csv(file, index_col=0), expected)
+
+    writer = PlotsWriter(file)
+    writer.append(step=0)
+    writer.close()
+    pdt.assert_frame_equal(writer.to_dataframe(), pd.DataFrame({"step": [0]}))
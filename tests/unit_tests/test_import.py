@@ -0,0 +1,50 @@
+"""Keep 'import zntrack' free of dependencies that are only needed later.
+
+These checks replace the import time benchmark: most of the import time of
+'import zntrack' came from importing DVC, GitPython and pandas eagerly.
+"""
+
+import json
+import subprocess
+import sys
+
+import pytest
+
+# only imported when a Project, the DVC API, plots or 'zntrack.tools' are used.
+#  'znflow' is not part of this, because 'zntrack.Node' is a 'znflow.Node'.
+LAZY_DEPENDENCIES = {"dvc", "git", "pandas", "tqdm", "typer"}
+
+
+def get_imported_modules(code: str) -> set:
+    proc = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            f"{code}\nimport json, sys\nprint(json.dumps(list(sys.modules)))",
+        ],
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+    return set(json.loads(proc.stdout.splitlines()[-1]))
+
+
+def test_import_zntrack():
+    modules = get_imported_modules("import zntrack")
+    for module in ["dvc", "dvc.repo", "git", "pandas", "tqdm"]:
+        assert module not in modules
+    packages = {x.split(".")[0] for x in modules}
+    assert packages & LAZY_DEPENDENCIES == set()
+
+
+@pytest.mark.parametrize(
+    ("attribute", "module"),
+    [
+        ("Project", "zntrack.project"),
+        ("from_rev", "zntrack.core.load"),
+        ("tools", "zntrack.tools"),
+    ],
+)
+def test_lazy_attributes(attribute, module):
+    assert module not in get_imported_modules("import zntrack")
+    assert module in get_imported_modules(f"import zntrack\nzntrack.{attribute}")
@@ -0,0 +1,90 @@
+import json
+import pathlib
+
+import pytest
+import znjson
+
+from zntrack.utils import config, file_io
+
+
+def test_config_session(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    config.files.zntrack.write_text(json.dumps({"A": {"x": 1}}))
+
+    with file_io.config_session() as session:
+        file_io.update_config_file(config.files.zntrack, "B", "y", 2)
+        file_io.update_config_file(config.files.params, "B", "z", 3)
+        assert file_io.read_file(config.files.zntrack) == {"A": {"x": 1}, "B": {"y": 2}}
+        # nothing is written until the session is closed
+        assert json.loads(config.files.zntrack.read_text()) == {"A": {"x": 1}}
+        assert not config.files.params.exists()
+        assert file_io.file_exists(config.files.params)
+        # nested sessions reuse the outer session
+        with file_io.config_session() as inner:
+            assert inner is session
+
+    assert file_io.get_config_session() is None
+    assert file_io.read_file(config.files.zntrack) == {"A": {"x": 1}, "B": {"y": 2}}
+    assert file_io.read_file(config.files.params) == {"B": {"z": 3}}
+    # temporary files are removed
+    assert sorted(x.name for x in pathlib.Path().iterdir()) == [
+        "params.yaml",
+        "zntrack.json",
+    ]
+
+
+def test_config_session_discard(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+    with pytest.raises(ValueError):
+        with file_io.config_session():
+            file_io.update_config_file(config.files.zntrack, "A", "x", 1)
+            raise ValueError
+
+    assert not config.files.zntrack.exists()
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        {"a": [1, 2.5, None, True], "b": {"c": "d"}},
+        {1: (1, 2), 2.5: float("nan"), None: pathlib.Path("file.txt")},
+        [pathlib.Path("a"), {"nested": [pathlib.Path("b")]}],
+    ],
+)
+def test_encode_decode(value):
+    expected = json.loads(json.dumps(value, cls=znjson.ZnEncoder))
+    encoded = file_io.encode(value)
+    assert json.dumps(encoded) == json.dumps(expected)
+    assert repr(file_io.decode(encoded)) == repr(
+        json.loads(json.dumps(expected), cls=znjson.ZnDecoder)
+    )
+
+
+def test_encode_circular():
+    value = {"a": []}
+    value["a"].append(value)
+    with pytest.raises(ValueError):
+        file_io.encode(value)
+    with pytest.raises(TypeError):
+        file_io.encode({"a": {1, 2}})
+
+
+@pytest.mark.parametrize("backend", ["json", "auto", "orjson"])
+@pytest.mark.parametrize("indent", [None, 2, 4])
+def test_dumps_loads(monkeypatch, backend, indent):
+    if backend == "orjson":
+        pytest.importorskip("orjson")
+    monkeypatch.setattr(config, "json_backend", backend)
+    value = {"path": pathlib.Path("file.txt"), "values": [1, 2.5, "3"]}
+    content = file_io.dumps(value, indent=indent)
+    if indent is None:
+        assert "\n" not in content
+    else:
+        assert content.splitlines()[1].startswith(" " * indent + '"')
+    assert file_io.loads(content) == value
+    assert file_io.loads(content, decoder=None)["path"]["_type"] == "pathlib.Path"
+
+    # non-finite floats are not supported by orjson
+    content = file_io.dumps({"value": float("inf")}, indent=4)
+    assert file_io.loads(content) == {"value": float("inf")}
@@ -0,0 +1,129 @@
+import json
+import os
+import pathlib
+
+import git
+
+from zntrack.utils import file_io, filesystem
+
+
+def test_pool(proj_path):
+    pool = filesystem.FileSystemPool(maxsize=2)
+
+    fs = pool.get()
+    assert pool.get() is fs
+    assert pool.get(remote=".") is fs
+    assert pool.get(remote=proj_path.as_posix()) is fs
+    assert len(pool) == 1
+
+    # modifying the 'dvc.yaml' replaces the file system of the workspace
+    pathlib.Path("dvc.yaml").write_text("stages: {}\n")
+    assert pool.get() is not fs
+    assert len(pool) == 1
+
+    # revisions without a commit are not pooled
+    pool.get(rev="HEAD")
+    assert len(pool) == 1
+
+    repo = git.Repo()
+    repo.git.add(".")
+    repo.index.commit("first commit")
+    pathlib.Path("file.txt").write_text("Hello World")
+    repo.git.add(".")
+    repo.index.commit("second commit")
+
+    # revisions are pooled by their commit
+    assert pool.get(rev="HEAD") is pool.get(rev=repo.head.commit.hexsha)
+    pool.get(rev="HEAD~1")
+    # the least recently used file system is removed
+    assert len(pool) == 2
+    pool.close(rev="HEAD~1")
+    assert len(pool) == 1
+    pool.close_all()
+    assert len(pool) == 0
+
+
+def test_pool_moving_rev(proj_path):
+    pool = filesystem.FileSystemPool()
+    repo = git.Repo()
+    repo.git.add(".")
+    repo.index.commit("first commit")
+    fs = pool.get(rev="HEAD")
+
+    pathlib.Path("file.txt").write_text("Hello World")
+    repo.git.add(".")
+    repo.index.commit("second commit")
+    assert pool.get(rev="HEAD") is not fs
+    assert pool.get(rev="HEAD").exists("file.txt")
+    assert not fs.exists("file.txt")
+
+    # file systems removed from the pool can still be used until closed later
+    pool = filesystem.FileSystemPool(maxsize=1)
+    fs = pool.get(rev="HEAD~1")
+    pool.get(rev="HEAD")
+    assert len(pool) == 1
+    assert not fs.exists("file.txt")
+    pool.close_all()
+    assert len(pool._retired) == 0
+
+
+def test_content_cache(proj_path, monkeypatch):
+    cache = filesystem.ContentCache()
+    config_file = pathlib.Path("zntrack.json")
+    config_file.write_text(json.dumps({"A": {"x": 1}}))
+    # files are only cached, if they were not modified within the last seconds
+    mtime_ns = config_file.stat().st_mtime_ns - 10 * 10**9
+    os.utime(config_file, ns=(mtime_ns, mtime_ns))
+
+    parsed = []
+    parse_content = file_io.parse_content
+
+    def _parse_content(*args):
+        parsed.append(args[0])
+        return parse_content(*args)
+
+    monkeypatch.setattr(file_io, "parse_content", _parse_content)
+
+    assert cache.read(config_file) == {"A": {"x": 1}}
+    assert cache.read(config_file) is cache.read(config_file)
+    assert parsed == ["zntrack.json"]
+
+    # the workspace file is parsed again, once it changed
+    config_file.write_text(json.dumps({"A": {"x": 2}}))
+    assert cache.read(config_file) == {"A": {"x": 2}}
+    assert len(parsed) == 2
+    # recently modified files are not cached
+    assert cache.read(config_file) == {"A": {"x": 2}}
+    assert len(parsed) == 3
+
+    # replacing the file with the same size and modification time
+    os.utime(config_file, ns=(mtime_ns, mtime_ns))
+    assert cache.read(config_file) == {"A": {"x": 2}}
+    assert cache.read(config_file) == {"A": {"x": 2}}
+    assert len(parsed) == 4
+    tmp_file = pathlib.Path("tmp.json")
+    tmp_file.write_text(json.dumps({"A": {"x": 3}}))
+    os.utime(tmp_file, ns=(mtime_ns, mtime_ns))
+    os.replace(tmp_file, config_file)
+    assert cache.read(config_file) == {"A": {"x": 3}}
+
+
+def test_content_cache_moving_rev(proj_path):
+    cache = filesystem.ContentCache()
+    config_file = pathlib.Path("zntrack.json")
+    config_file.write_text(json.dumps({"A": {"x": 1}}))
+    repo = git.Repo()
+    repo.git.add(".")
+    repo.index.commit("first commit")
+    repo.git.branch("dev")
+
+    assert cache.read(config_file, rev="dev") == {"A": {"x": 1}}
+
+    config_file.write_text(json.dumps({"A": {"x": 2}}))
+    repo.git.add(".")
+    repo.index.commit("second commit")
+    # the branch is moved without being checked out
+    repo.git.branch("-f", "dev", "HEAD")
+    assert cache.read(config_file, rev="dev") == {"A": {"x": 2}}
+    # the previous commit is still available
+    assert cache.read(config_file, rev="HEAD~1") == {"A": {"x": 1}}
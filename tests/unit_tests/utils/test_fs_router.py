@@ -0,0 +1,62 @@
+import concurrent.futures
+import os
+import pathlib
+import threading
+
+import fsspec
+
+from zntrack.utils import fs_router
+
+
+def test_route(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    pathlib.Path("data").mkdir()
+    pathlib.Path("data", "file.txt").write_text("local")
+
+    fs = fsspec.filesystem("memory")
+    fs.pipe("/routed/data/file.txt", b"routed")
+    fs.pipe("/routed/data/other.txt", b"other")
+    routed = fsspec.filesystem("dir", path="/routed", fs=fs)
+
+    original_open = open
+    with fs_router.route(lambda: routed):
+        with open("data/file.txt") as f:
+            assert f.read() == "routed"
+        assert pathlib.Path("data", "file.txt").read_text() == "routed"
+        assert sorted(os.listdir("data")) == ["data/file.txt", "data/other.txt"]
+        with os.scandir("data") as entries:
+            assert sorted(x.name for x in entries) == ["file.txt", "other.txt"]
+        # absolute paths are not routed
+        assert (tmp_path / "data" / "file.txt").read_text() == "local"
+        with open(tmp_path / "data" / "file.txt") as f:
+            assert f.read() == "local"
+
+    assert open is original_open
+    assert pathlib.Path("data", "file.txt").read_text() == "local"
+    assert os.listdir("data") == ["file.txt"]
+
+
+def test_route_thread_local(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    pathlib.Path("file.txt").write_text("local")
+
+    fs = fsspec.filesystem("memory")
+    fs.pipe("/routed/file.txt", b"routed")
+    routed = fsspec.filesystem("dir", path="/routed", fs=fs)
+
+    entered = threading.Event()
+    release = threading.Event()
+
+    def _routed():
+        with fs_router.route(lambda: routed):
+            entered.set()
+            release.wait()
+            return pathlib.Path("file.txt").read_text()
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+        future = executor.submit(_routed)
+        entered.wait()
+        # other threads are not affected by the active route.
+        assert pathlib.Path("file.txt").read_text() == "local"
+        release.set()
+        assert future.result() == "routed"
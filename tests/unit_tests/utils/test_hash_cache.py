@@ -0,0 +1,124 @@
+import hashlib
+import os
+
+from zntrack.utils import hash_cache
+
+
+def test_hash_cache(tmp_path, monkeypatch):
+    file = tmp_path / "data.txt"
+    file.write_text("Lorem Ipsum")
+    # files are only stored, if they were not modified within the last seconds
+    mtime_ns = file.stat().st_mtime_ns - 10 * 10**9
+    os.utime(file, ns=(mtime_ns, mtime_ns))
+
+    computed = []
+    file_md5 = hash_cache.file_md5
+
+    def _file_md5(path):
+        computed.append(path)
+        return file_md5(path)
+
+    monkeypatch.setattr(hash_cache, "file_md5", _file_md5)
+
+    with hash_cache.HashCache(tmp_path / "cache" / "hashes.db") as cache:
+        assert cache.get(file) == hashlib.md5(b"Lorem Ipsum").hexdigest()
+        assert cache.get(file) == hashlib.md5(b"Lorem Ipsum").hexdigest()
+        assert len(computed) == 1
+
+    # the index is persistent
+    with hash_cache.HashCache(tmp_path / "cache" / "hashes.db") as cache:
+        assert cache.get(file) == hashlib.md5(b"Lorem Ipsum").hexdigest()
+        assert len(computed) == 1
+
+        # same size, but a new modification time
+        file.write_text("Lorem Dolor")
+        os.utime(file, ns=(mtime_ns + 1, mtime_ns + 1))
+        assert cache.get(file) == hashlib.md5(b"Lorem Dolor").hexdigest()
+        assert len(computed) == 2
+
+
+def test_hash_cache_racy(tmp_path, monkeypatch):
+    file = tmp_path / "data.txt"
+    file.write_text("Lorem Ipsum")
+
+    computed = []
+    file_md5 = hash_cache.file_md5
+
+    def _file_md5(path):
+        computed.append(path)
+        return file_md5(path)
+
+    monkeypatch.setattr(hash_cache, "file_md5", _file_md5)
+
+    with hash_cache.HashCache(tmp_path / "cache" / "hashes.db") as cache:
+        # recently modified files are not stored
+        assert cache.get(file) == hashlib.md5(b"Lorem Ipsum").hexdigest()
+        assert cache.get(file) == hashlib.md5(b"Lorem Ipsum").hexdigest()
+        assert len(computed) == 2
+
+        mtime_ns = file.stat().st_mtime_ns - 10 * 10**9
+        os.utime(file, ns=(mtime_ns, mtime_ns))
+        assert cache.get(file) == hashlib.md5(b"Lorem Ipsum").hexdigest()
+        assert cache.get(file) == hashlib.md5(b"Lorem Ipsum").hexdigest()
+        assert len(computed) == 3
+
+        # rewriting the file with the same size and modification time
+        file.write_text("Lorem Dolor")
+        os.utime(file, ns=(mtime_ns, mtime_ns))
+        assert cache.get(file) == hashlib.md5(b"Lorem Dolor").hexdigest()
+        assert len(computed) == 4
+
+        # replacing the file with the same size and modification time
+        tmp_file = tmp_path / "tmp.txt"
+        tmp_file.write_text("Lorem Sitam")
+        os.utime(tmp_file, ns=(mtime_ns, mtime_ns))
+        os.replace(tmp_file, file)
+        assert cache.get(file) == hashlib.md5(b"Lorem Sitam").hexdigest()
+        assert len(computed) == 5
+
+
+def test_hash_cache_dir(proj_path, monkeypatch):
+    import dvc.repo
+    import yaml
+
+    data = proj_path / "data"
+    (data / "nested").mkdir(parents=True)
+    (data / "a.txt").write_text("Lorem")
+    (data / "nested" / "b.txt").write_text("Ipsum")
+    dvc.repo.Repo().add("data")
+    dvc_md5 = yaml.safe_load((proj_path / "data.dvc").read_text())["outs"][0]["md5"]
+
+    computed = []
+    file_md5 = hash_cache.file_md5
+
+    def _file_md5(path):
+        computed.append(path)
+        return file_md5(path)
+
+    monkeypatch.setattr(hash_cache, "file_md5", _file_md5)
+    # 'dvc add' just replaced the files with their cached copy.
+    monkeypatch.setattr(hash_cache, "_RACY_WINDOW_NS", 0)
+
+    # the files were hashed by 'dvc add' and are taken from the DVC state.
+    with hash_cache.HashCache(dvc_state=True) as cache:
+        assert cache.get_dir(data) == dvc_md5
+    assert computed == []
+
+    (data / "c.txt").write_text("Dolor")
+    with hash_cache.HashCache() as cache:
+        assert cache.get_dir(data) != dvc_md5
+    assert len(computed) == 1
+
+
+def test_hash_cache_share_dvc_state(proj_path):
+    import dvc.repo
+
+    file = proj_path / "data.txt"
+    file.write_text("Lorem Ipsum")
+
+    with hash_cache.HashCache(dvc_state=True) as cache:
+        md5 = cache.get(file)
+
+    with dvc.repo.Repo() as repo:
+        _, hash_info = repo.state.get(file.as_posix(), repo.fs)
+    assert hash_info.value == md5
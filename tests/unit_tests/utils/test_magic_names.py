@@ -0,0 +1,31 @@
+from zntrack.utils import magic_names
+
+
+def create(frame: int = 1):
+    return magic_names.get_location(frame=frame)
+
+
+def test_resolve(monkeypatch):
+    node = create()
+    multi_line = create(
+        frame=1,
+    )
+    unassigned = [create()]
+    first = create(); second = create()  # noqa: E702  # fmt: skip
+    nested = create(frame=[create()][0] and 1)
+    assert magic_names.resolve(node) == "node"
+    assert magic_names.resolve(multi_line) == "multi_line"
+    assert magic_names.resolve(first) == "first"
+    assert magic_names.resolve(second) == "second"
+    assert magic_names.resolve(nested) == "nested"
+
+    calls = []
+    parse = magic_names._parse_assignments
+    monkeypatch.setattr(
+        magic_names,
+        "_parse_assignments",
+        lambda source: calls.append(source) or parse(source),
+    )
+    assert magic_names.resolve(node) == "node"
+    assert magic_names.resolve(unassigned[0]) is None
+    assert calls == []  # the file is parsed only once
@@ -0,0 +1,37 @@
+import os
+import stat
+
+import pytest
+
+from zntrack.utils import materialize
+
+
+@pytest.mark.parametrize("link_type", ["hardlink", "symlink", "copy"])
+def test_link_from_cache(tmp_path, link_type):
+    cache_file = tmp_path / "cache"
+    cache_file.write_text("Lorem Ipsum")
+    target = tmp_path / "target"
+
+    assert materialize.link_from_cache(cache_file, target, [link_type]) == link_type
+    assert target.read_text() == "Lorem Ipsum"
+    assert target.is_symlink() == (link_type == "symlink")
+    assert os.path.samefile(target, cache_file) == (link_type != "copy")
+    # files that are shared with the cache are protected
+    mode = stat.S_IMODE(target.stat().st_mode)
+    assert (mode == 0o444) == (link_type != "copy")
+
+
+def test_link_from_cache_fallback(tmp_path):
+    cache_file = tmp_path / "cache"
+    cache_file.write_text("Lorem Ipsum")
+
+    # reflinks are not supported by every file system
+    assert materialize.link_from_cache(cache_file, tmp_path / "target") in [
+        "reflink",
+        "copy",
+    ]
+    assert (tmp_path / "target").read_text() == "Lorem Ipsum"
+    assert not os.path.samefile(tmp_path / "target", cache_file)
+    assert (
+        materialize.link_from_cache(cache_file, tmp_path / "missing" / "target") is None
+    )
@@ -0,0 +1,87 @@
+import errno
+import os
+import pickle
+
+import pytest
+
+from zntrack.utils.result_cache import ResultCache
+
+
+def test_result_cache(tmp_path):
+    cache = ResultCache(path=tmp_path)
+    key = ("repo", "0" * 40, "Node", "outs")
+    with pytest.raises(KeyError):
+        cache.get(key)
+    cache.set(key, {"data": [1, 2, 3]})
+    assert cache.get(key) == {"data": [1, 2, 3]}
+    # shared with other instances, e.g. in other processes
+    assert ResultCache(path=tmp_path).get(key) == {"data": [1, 2, 3]}
+
+    cache.clear()
+    with pytest.raises(KeyError):
+        cache.get(key)
+
+
+def test_result_cache_invalid(tmp_path):
+    cache = ResultCache(path=tmp_path)
+    key = ("repo", "0" * 40, "Node", "outs")
+    cache.set(key, 42)
+    (file,) = tmp_path.glob("*.pkl")
+    file.write_bytes(b"invalid")
+    with pytest.raises(KeyError):
+        cache.get(key)
+    assert not file.exists()
+
+    # values that can not be pickled are not cached
+    cache.set(key, lambda: 42)
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_result_cache_eviction(tmp_path):
+    cache = ResultCache(path=tmp_path, max_size=2500)
+    for idx in range(3):
+        key = ("repo", "sha", "Node", idx)
+        cache.set(key, b"x" * 1000)
+        os.utime(cache._get_file(key), ns=(idx * 10**9, idx * 10**9))
+    # the first entry was evicted while setting the third one
+    with pytest.raises(KeyError):
+        cache.get(("repo", "sha", "Node", 0))
+    # accessing an entry makes it the most recently used one
+    assert cache.get(("repo", "sha", "Node", 1)) == b"x" * 1000
+    cache.set(("repo", "sha", "Node", 3), b"x" * 1000)
+    with pytest.raises(KeyError):
+        cache.get(("repo", "sha", "Node", 2))
+    assert cache.get(("repo", "sha", "Node", 1)) == b"x" * 1000
+    assert cache.get(("repo", "sha", "Node", 3)) == b"x" * 1000
+
+
+def test_result_cache_write_error(tmp_path, monkeypatch):
+    cache = ResultCache(path=tmp_path)
+    key = ("repo", "0" * 40, "Node", "outs")
+
+    def dump(*args, **kwargs):
+        raise OSError(errno.ENOSPC, "No space left on device")
+
+    monkeypatch.setattr(pickle, "dump", dump)
+    # the value is not cached and the temporary file is removed
+    cache.set(key, 42)
+    assert list(tmp_path.iterdir()) == []
+    with pytest.raises(KeyError):
+        cache.get(key)
+
+
+def test_result_cache_eviction_scan(tmp_path, monkeypatch):
+    cache = ResultCache(path=tmp_path, max_size=2500)
+    scans = []
+    evict = ResultCache.evict
+
+    def _evict(self):
+        scans.append(len(list(tmp_path.glob("*.pkl"))))
+        evict(self)
+
+    monkeypatch.setattr(ResultCache, "evict", _evict)
+    # the directory is scanned once and again after the size is exceeded
+    for idx in range(3):
+        cache.set(("repo", "sha", "Node", idx), b"x" * 1000)
+    assert scans == [1, 3]
+    assert len(list(tmp_path.glob("*.pkl"))) == 2
@@ -3,12 +3,11 @@
 GitHub: https://github.com/zincware/ZnTrack
 """
 
-import importlib.metadata
+import importlib
+import typing
 
-from zntrack import exceptions, tools
-from zntrack.core.load import from_rev, get_nodes
+from zntrack import exceptions
 from zntrack.core.node import Node
-from zntrack.core.nodify import NodeConfig, nodify
 from zntrack.fields import Field, FieldGroup, LazyField, dvc, meta, zn
 from zntrack.fields.fields import (
     deps,
@@ -22,11 +21,47 @@ from zntrack.fields.fields import (
     plots,
     plots_path,
 )
-from zntrack.project import Project
 from zntrack.utils import config
 from zntrack.utils.node_wd import nwd
 
-__version__ = importlib.metadata.version("zntrack")
+if typing.TYPE_CHECKING:
+    from zntrack import tools
+    from zntrack.core.load import from_rev, get_nodes
+    from zntrack.core.nodify import NodeConfig, nodify
+    from zntrack.project import Project
+
+# Attributes that are imported on first access, because they require dependencies
+#  like 'git' or 'dvc.repo' that are not needed to run a Node. (PEP 562)
+_LAZY_ATTRIBUTES = {
+    "Project": "zntrack.project",
+    "from_rev": "zntrack.core.load",
+    "get_nodes": "zntrack.core.load",
+    "nodify": "zntrack.core.nodify",
+    "NodeConfig": "zntrack.core.nodify",
+}
+_LAZY_MODULES = {"tools": "zntrack.tools"}
+
+
+def __getattr__(name: str) -> typing.Any:
+    """Import the lazy attributes of the package."""
+    if name in _LAZY_ATTRIBUTES:
+        value = getattr(importlib.import_module(_LAZY_ATTRIBUTES[name]), name)
+    elif name in _LAZY_MODULES:
+        value = importlib.import_module(_LAZY_MODULES[name])
+    elif name == "__version__":
+        from importlib import metadata
+
+        value = metadata.version("zntrack")
+    else:
+        raise AttributeError(f"module '{__name__}' has no attribute '{name}'")
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> typing.List[str]:
+    """List the attributes of the package, including the lazy ones."""
+    return sorted([*globals(), *_LAZY_ATTRIBUTES, *_LAZY_MODULES, "__version__"])
+
 
 __all__ = [
     "Node",
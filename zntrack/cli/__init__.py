@@ -1,16 +1,20 @@
 """The ZnTrack CLI."""
 
 import contextlib
+import functools
 import importlib.metadata
+import logging
 import os
 import pathlib
 import sys
+import typing
 
-import git
 import typer
 import yaml
 
-from zntrack import Node, utils
+from zntrack import Node, exceptions, utils
+
+log = logging.getLogger(__name__)
 
 app = typer.Typer()
 
@@ -18,6 +22,8 @@ app = typer.Typer()
 def version_callback(value: bool) -> None:
     """Get the installed 'ZnTrack' version."""
     if value:
+        import git
+
         path = pathlib.Path(__file__).parent.parent.parent
         report = f"ZnTrack {importlib.metadata.version('zntrack')} at '{path}'"
 
@@ -47,12 +53,36 @@ def main(
 
 
 @app.command()
-def run(node: str, name: str = None, meta_only: bool = False) -> None:
+def run(
+    node: str,
+    name: str = None,
+    meta_only: bool = False,
+    via_worker: bool = typer.Option(
+        False,
+        "--via-worker",
+        envvar="ZNTRACK_VIA_WORKER",
+        help=(
+            "Run the Node on a running 'zntrack worker'. Falls back to running it"
+            " in this process, if no worker is available."
+        ),
+    ),
+) -> None:
     """Execute a ZnTrack Node.
 
     Use as 'zntrack run module.Node --name node_name'.
     """
-    env_file = pathlib.Path("env.yaml")
+    if via_worker:
+        from zntrack.utils import worker
+
+        kwargs = {"node": node, "name": name, "meta_only": meta_only}
+        try:
+            code = worker.submit(kwargs)
+        except exceptions.WorkerNotAvailableError as err:
+            log.warning(f"ZnTrack worker not available, running locally: {err}")
+        else:
+            raise typer.Exit(code)
+
+    env_file = utils.config.files.env
     if env_file.exists():
         env = yaml.safe_load(env_file.read_text())
         os.environ.update(env.get("global", {}))
@@ -86,6 +116,25 @@ def run(node: str, name: str = None, meta_only: bool = False) -> None:
         raise ValueError(f"Node {node} is not a ZnTrack Node.")
 
 
+@app.command()
+def worker(
+    socket: str = typer.Option(
+        None, help="The socket to listen on. Defaults to $ZNTRACK_WORKER_SOCKET."
+    ),
+    preload: typing.List[str] = typer.Option(
+        [], help="Additional modules to import once, e.g. stable dependencies."
+    ),
+) -> None:
+    """Run a worker that executes 'zntrack run --via-worker' in forked processes."""
+    from zntrack.utils import worker
+
+    worker.serve(
+        target=functools.partial(run, via_worker=False),
+        socket_path=socket,
+        preload=[*worker.DEFAULT_PRELOAD, *preload],
+    )
+
+
 @app.command()
 def init(
     name: str = "New Project",
@@ -101,6 +150,19 @@ def init(
     initializer.run()
 
 
+@app.command()
+def status(
+    nodes: typing.List[str] = typer.Argument(
+        None, help="The names of the Nodes (default: all Nodes)"
+    ),
+):
+    """Show which Nodes need to be run, without running 'dvc status'."""
+    from zntrack.utils.status import get_status
+
+    results = get_status(nodes or None)
+    print(yaml.dump({name: result.name for name, result in results.items()}))
+
+
 @app.command()
 def list(
     remote: str = typer.Argument(".", help="The path/url to the repository"),
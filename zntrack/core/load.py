@@ -1,5 +1,6 @@
 """Load a node from a dvc stage."""
 
+import concurrent.futures
 import contextlib
 import importlib
 import importlib.util
@@ -7,32 +8,51 @@ import json
 import pathlib
 import sys
 import tempfile
+import threading
 import typing
 import uuid
 
-import dvc.api
-import dvc.repo
-import dvc.stage
-
-from zntrack.core.node import Node
-from zntrack.utils import config
+from zntrack.core.node import NODE_CLS_KEY, Node
+from zntrack.utils import config, filesystem
 from zntrack.utils.cli import get_groups
 
+if typing.TYPE_CHECKING:
+    import dvc.stage
+
 T = typing.TypeVar("T", bound=Node)
 
+# modules that were imported from a remote, keyed by (module, remote, rev).
+_TEMPFILE_MODULES = {}
+_IMPORT_LOCK = threading.RLock()
+
 
-def _get_stage(name, remote, rev) -> dvc.stage.PipelineStage:
+def _get_stage(name, remote, rev) -> "dvc.stage.PipelineStage":
     """Get a stage from a dvc.Repo."""
-    with dvc.repo.Repo.open(url=remote, rev=rev) as repo:
-        for stage in repo.index.stages:
-            with contextlib.suppress(AttributeError):
-                # non pipeline stage don't have name
-                if stage.name == name:
-                    return stage
-
-        raise ValueError(
-            f"Stage {name} not found in {remote}" + (f"/tree/{rev}" if rev else "")
-        )
+    repo = filesystem.get_fs(remote, rev).repo
+    for stage in repo.index.stages:
+        with contextlib.suppress(AttributeError):
+            # non pipeline stage don't have name
+            if stage.name == name:
+                return stage
+
+    raise ValueError(
+        f"Stage {name} not found in {remote}" + (f"/tree/{rev}" if rev else "")
+    )
+
+
+def _get_indexed_cls(name, remote, rev) -> typing.Optional[dict]:
+    """Get the module and class of a node from the 'zntrack.json'.
+
+    Returns
+    -------
+    dict|None
+        {"module": str, "cls": str} or None if the node is not indexed.
+    """
+    try:
+        zntrack_config = filesystem.read_file(config.files.zntrack, remote, rev)
+    except FileNotFoundError:
+        return None
+    return zntrack_config.get(name, {}).get(NODE_CLS_KEY)
 
 
 def _import_from_tempfile(package_and_module: str, remote, rev):
@@ -59,45 +79,42 @@ def _import_from_tempfile(package_and_module: str, remote, rev):
     FileNotFoundError
         If the file could not be found.
     """
-    file = pathlib.Path(*package_and_module.split(".")).with_suffix(".py")
-    fs = dvc.api.DVCFileSystem(url=remote, rev=rev)
-    with tempfile.NamedTemporaryFile(suffix=".py") as temp_file, fs.open(file) as f:
-        temp_file.write(f.read())
-        temp_file.flush()
+    key = (package_and_module, remote, rev)
+    with _IMPORT_LOCK:
+        with contextlib.suppress(KeyError):
+            # each module is only imported once per remote and revision.
+            return _TEMPFILE_MODULES[key]
 
-        # we use a random uuid to avoid name clashes
-        ref_module = f"{uuid.uuid4()}.{package_and_module}"
+        file = pathlib.Path(*package_and_module.split(".")).with_suffix(".py")
+        fs = filesystem.get_fs(remote, rev)
+        with tempfile.NamedTemporaryFile(suffix=".py") as temp_file, fs.open(file) as f:
+            temp_file.write(f.read())
+            temp_file.flush()
 
-        spec = importlib.util.spec_from_file_location(ref_module, temp_file.name)
-        module = importlib.util.module_from_spec(spec)
-        sys.modules[ref_module] = module
-        spec.loader.exec_module(module)
-        return module
+            # we use a random uuid to avoid name clashes
+            ref_module = f"{uuid.uuid4()}.{package_and_module}"
 
+            spec = importlib.util.spec_from_file_location(ref_module, temp_file.name)
+            module = importlib.util.module_from_spec(spec)
+            sys.modules[ref_module] = module
+            spec.loader.exec_module(module)
+            _TEMPFILE_MODULES[key] = module
+            return module
 
-def from_rev(name, remote=".", rev=None, **kwargs) -> T:
-    """Load a ZnTrack Node by its name.
 
-    Parameters
-    ----------
-    name : str|Node
-        The name of the node.
-    remote : str, optional
-        The remote to load the node from. Defaults to workspace.
-    rev : str, optional
-        The revision to load the node from. Defaults to HEAD.
-    **kwargs
-        Additional keyword arguments to pass to the node's constructor.
+def _get_node_cls(name: str, remote, rev) -> typing.Tuple[typing.Type[Node], str]:
+    """Get the Node class and the name of the node.
 
     Returns
     -------
-    Node
-        The loaded node.
+    cls : type[Node]
+        The class of the node.
+    name : str
+        The name of the node.
     """
-    if isinstance(name, Node):
-        name = name.name
+    node_cls = None if "+" in name else _get_indexed_cls(name, remote, rev)
     if "+" in name:
-        fs = dvc.api.DVCFileSystem(url=remote, rev=rev)
+        fs = filesystem.get_fs(remote, rev)
 
         components = name.split("+")
 
@@ -120,8 +137,10 @@ def from_rev(name, remote=".", rev=None, **kwargs) -> T:
             ), f"Expected zntrack.Node, got {data['_type']}"
             package_and_module = data["value"]["module"]
             cls_name = data["value"]["cls"]
-            module = None
+    elif node_cls is not None:
+        package_and_module, cls_name = node_cls["module"], node_cls["cls"]
     else:
+        # repositories that were built with older versions do not store the class.
         stage = _get_stage(name, remote, rev)
 
         cmd = stage.cmd
@@ -129,9 +148,11 @@ def from_rev(name, remote=".", rev=None, **kwargs) -> T:
         name = cmd.split()[4]
 
         package_and_module, cls_name = run_str.rsplit(".", 1)
-        module = None
+
+    module = None
     try:
-        module = importlib.import_module(package_and_module)
+        with _IMPORT_LOCK:
+            module = importlib.import_module(package_and_module)
     except ModuleNotFoundError:
         with contextlib.suppress(FileNotFoundError, ModuleNotFoundError):
             module = _import_from_tempfile(package_and_module, remote, rev)
@@ -143,12 +164,94 @@ def from_rev(name, remote=".", rev=None, **kwargs) -> T:
             f" install {module_name}' or from the remote via 'pip install git+{remote}'."
         )
 
-    cls = getattr(module, cls_name)
+    return getattr(module, cls_name), name
+
 
+def from_rev(name, remote=".", rev=None, **kwargs) -> T:
+    """Load a ZnTrack Node by its name.
+
+    Parameters
+    ----------
+    name : str|Node
+        The name of the node.
+    remote : str, optional
+        The remote to load the node from. Defaults to workspace.
+    rev : str, optional
+        The revision to load the node from. Defaults to HEAD.
+    **kwargs
+        Additional keyword arguments to pass to the node's constructor.
+
+    Returns
+    -------
+    Node
+        The loaded node.
+    """
+    if isinstance(name, Node):
+        name = name.name
+    cls, name = _get_node_cls(name, remote, rev)
     return cls.from_rev(name, remote, rev, **kwargs)
 
 
-def get_nodes(remote=".", rev=None) -> dict[str, Node]:
-    """Load all nodes from the given remote and revision."""
+def load_nodes(
+    nodes: typing.Iterable[typing.Union[str, Node]],
+    remote=".",
+    rev=None,
+    max_workers: int = 1,
+) -> dict[str, Node]:
+    """Load multiple ZnTrack Nodes, optionally in parallel.
+
+    The classes of the nodes are resolved first, so every module is only
+    imported once. Afterwards, the nodes are loaded from a shared file system.
+
+    Parameters
+    ----------
+    nodes : list[str|Node]
+        The names of the nodes. For Node instances, the class of the
+        instance is used instead of resolving it from the stage.
+    remote : str, optional
+        The remote to load the nodes from. Defaults to workspace.
+    rev : str, optional
+        The revision to load the nodes from. Defaults to HEAD.
+    max_workers : int, default = 1
+        The number of threads used to load the nodes.
+        If None, the default of 'concurrent.futures.ThreadPoolExecutor' is used.
+
+    Returns
+    -------
+    dict[str, Node]
+        The loaded nodes in the order they were given.
+    """
+    loaders = {}
+    for node in nodes:
+        if isinstance(node, Node):
+            loaders[node.name] = (type(node), node.name)
+        else:
+            loaders[node] = _get_node_cls(node, remote, rev)
+
+    if max_workers == 1 or len(loaders) <= 1:
+        return {
+            key: cls.from_rev(name, remote, rev) for key, (cls, name) in loaders.items()
+        }
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            key: executor.submit(cls.from_rev, name, remote, rev)
+            for key, (cls, name) in loaders.items()
+        }
+        return {key: future.result() for key, future in futures.items()}
+
+
+def get_nodes(remote=".", rev=None, max_workers: int = 1) -> dict[str, Node]:
+    """Load all nodes from the given remote and revision.
+
+    Parameters
+    ----------
+    remote : str, optional
+        The remote to load the nodes from. Defaults to workspace.
+    rev : str, optional
+        The revision to load the nodes from. Defaults to HEAD.
+    max_workers : int, default = 1
+        The number of threads used to load the nodes.
+    """
     _, node_names = get_groups(remote, rev)
-    return {node_name: from_rev(node_name, remote, rev) for node_name in node_names}
+    return load_nodes(node_names, remote, rev, max_workers=max_workers)
@@ -4,24 +4,17 @@ from __future__ import annotations
 
 import contextlib
 import dataclasses
-import functools
+import hashlib
 import json
 import logging
-import os
 import pathlib
 import tempfile
-import time
 import typing
-import unittest.mock
 import uuid
 
-import dvc.api
-import dvc.cli
-import dvc.utils.strictyaml
 import znflow
 import zninit
 import znjson
-from varname import VarnameException, varname
 
 from zntrack import exceptions
 from zntrack.notebooks.jupyter import jupyter_class_to_file
@@ -31,12 +24,22 @@ from zntrack.utils import (
     NodeStatusResults,
     config,
     file_io,
+    filesystem,
     get_nwd,
+    magic_names,
     module_handler,
 )
 
+if typing.TYPE_CHECKING:
+    import dvc.api
+
+    from zntrack.utils.materialize import Materializer
+
 log = logging.getLogger(__name__)
 
+# The key in the 'zntrack.json' entry of a Node that stores its module and class.
+NODE_CLS_KEY = "_cls_"
+
 
 @dataclasses.dataclass
 class NodeStatus:
@@ -69,20 +72,19 @@ class NodeStatus:
         default=DISABLE_TMP_PATH, init=False, repr=False
     )
     _run_count: int = dataclasses.field(default=0, init=False, repr=False)
+    _materializer: "Materializer" = dataclasses.field(
+        default=None, init=False, repr=False
+    )
+    # files that downstream nodes depend on, see 'get_output_files'.
+    _output_files: tuple = dataclasses.field(default=None, init=False, repr=False)
 
-    @functools.cached_property
+    @property
     def fs(self) -> dvc.api.DVCFileSystem:
-        """Get the file system of the Node."""
-        for _ in range(10):
-            try:
-                return dvc.api.DVCFileSystem(
-                    url=self.remote,
-                    rev=self.rev,
-                )
-            except dvc.utils.strictyaml.YAMLValidationError as err:
-                log.debug(err)
-                time.sleep(0.1)
-        raise dvc.utils.strictyaml.YAMLValidationError
+        """Get the file system of the Node.
+
+        The file system is shared between all Nodes with the same 'remote' and 'rev'.
+        """
+        return filesystem.get_fs(self.remote, self.rev)
 
     @contextlib.contextmanager
     def magic_patch(self) -> typing.ContextManager:
@@ -90,33 +92,22 @@ class NodeStatus:
 
         Opening a relative path will use the Node's file system.
         Opening an absolute path will use the local file system.
+        This applies to 'open', 'io.open', 'pathlib.Path.open', 'pathlib.Path.read_text',
+        'os.listdir' and 'os.scandir' in the current thread only, so Nodes from
+        different revisions can be loaded concurrently.
         """
-        original_open = open
-        original_listdir = os.listdir
-
-        def _open(file, *args, **kwargs):
-            if file == config.files.params:
-                return original_open(file, *args, **kwargs)
-
-            if not pathlib.Path(file).is_absolute():
-                return self.fs.open(file, *args, **kwargs)
-
-            return original_open(file, *args, **kwargs)
+        from zntrack.utils import fs_router
 
-        def _listdir(path, *args, **kwargs):
-            if not pathlib.Path(path).is_absolute():
-                return self.fs.listdir(path, detail=False)
-
-            return original_listdir(path, *args, **kwargs)
-
-        with unittest.mock.patch("builtins.open", _open):
-            with unittest.mock.patch("__main__.open", _open):
-                with unittest.mock.patch("os.listdir", _listdir):
-                    # Jupyter Notebooks replace open with io.open
-                    yield
+        with fs_router.route(lambda: self.fs):
+            yield
 
     @contextlib.contextmanager
-    def use_tmp_path(self, path: pathlib.Path = None) -> typing.ContextManager:
+    def use_tmp_path(
+        self,
+        path: pathlib.Path = None,
+        lazy: bool = False,
+        link_types: typing.Sequence[str] = None,
+    ) -> typing.ContextManager:
         """Load the data for '*_path' into a temporary directory.
 
         If you can not use 'node.state.fs.open' you can use
@@ -125,6 +116,17 @@ class NodeStatus:
         The respective paths 'node.*_path' will be replaced
         automatically inside the context manager.
 
+        Each path is loaded once, when it is first accessed. Files in the local
+        DVC cache are reflinked or copied instead of being downloaded. Pass e.g.
+        'link_types=("reflink", "hardlink", "copy")' to share files with the
+        cache. These files are read-only and must not be modified.
+
+        If 'lazy' is set, files of directories that are not in the local DVC cache
+        are only fetched when they are opened with 'open' or 'pathlib.Path.open'.
+        Until then, they are only visible to 'os.listdir' and 'os.scandir', but not
+        to e.g. 'pathlib.Path.exists', 'os.stat' or libraries that read files
+        through C code.
+
         This is only set, if either 'remote' or 'rev' are set.
         Otherwise, the data will be loaded from the current directory.
         """
@@ -134,12 +136,23 @@ class NodeStatus:
         if self.tmp_path is DISABLE_TMP_PATH:
             yield
         else:
+            from zntrack.utils import fs_router
+            from zntrack.utils.materialize import DEFAULT_LINK_TYPES, Materializer
+
             with tempfile.TemporaryDirectory() as tmpdir:
                 self.tmp_path = pathlib.Path(tmpdir)
+                self._materializer = Materializer(
+                    self,
+                    root=self.tmp_path,
+                    lazy=lazy,
+                    link_types=link_types or DEFAULT_LINK_TYPES,
+                )
                 log.debug(f"Using temporary directory {self.tmp_path}")
                 try:
-                    yield
+                    with fs_router.materialize_on_access(self._materializer):
+                        yield
                 finally:
+                    self._materializer = None
                     files = list(self.tmp_path.glob("**/*"))
                     log.debug(
                         f"Deleting temporary directory {self.tmp_path} containing {files}"
@@ -174,18 +187,25 @@ class _NameDescriptor(zninit.Descriptor):
     def __set__(self, instance, value):
         if value is None:
             return
+        # The variable name is resolved when the name is used, e.g. in
+        #  'Project.__exit__'. Here, only the location is recorded.
+        project = getattr(instance._graph_, "project", None)
+        magic_names_enabled = getattr(project, "magic_names", False)
         if isinstance(value, NodeName):
             if not instance._external_:
                 value.update_suffix(instance._graph_.project, instance)
-            with contextlib.suppress(VarnameException):
-                value.varname = varname(frame=4)
+            if magic_names_enabled:
+                value.location = magic_names.get_location(frame=4)
             instance._name_ = value
         elif isinstance(getattr(instance, "_name_"), NodeName):
-            with contextlib.suppress(VarnameException):
-                instance._name_.varname = varname(frame=4)
+            if magic_names_enabled:
+                instance._name_.varname = None
+                instance._name_.location = magic_names.get_location(frame=4)
             instance._name_.name = value
             instance._name_.suffix = 0
             instance._name_.update_suffix(instance._graph_.project, instance)
+            if instance.uuid in instance._graph_:
+                instance._graph_.update_name_index(instance)
         else:
             # This should only happen if an instance is loaded.
             instance._name_ = value
@@ -271,6 +291,7 @@ class Node(zninit.ZnInit, znflow.Node):
         self, parameter: bool = True, results: bool = True, meta_only: bool = False
     ) -> None:
         """Save the node's output to disk."""
+        self.state._output_files = None
         if meta_only:
             # the meta data will only be written here.
             import json
@@ -311,6 +332,17 @@ class Node(zninit.ZnInit, znflow.Node):
             value_name="nwd",
             value=get_nwd(self),
         )
+        # save the class to zntrack.json, so 'from_rev' does not have to
+        #  search the stages of the repository.
+        file_io.update_config_file(
+            file=config.files.zntrack,
+            node_name=self.name,
+            value_name=NODE_CLS_KEY,
+            value={
+                "module": module_handler(self.__class__),
+                "cls": self.__class__.__name__,
+            },
+        )
 
     def run(self) -> None:
         """Run the node's code."""
@@ -350,7 +382,9 @@ class Node(zninit.ZnInit, znflow.Node):
                 self.state.results = NodeStatusResults.AVAILABLE
         # TODO: documentation about _post_init and _post_load_ and when they are called
 
-        zntrack_config = json.loads(self.state.fs.read_text(config.files.zntrack))
+        zntrack_config = filesystem.read_file(
+            config.files.zntrack, self.state.remote, self.state.rev
+        )
 
         if self.name not in zntrack_config:
             raise exceptions.NodeNotAvailableError(self)
@@ -434,7 +468,8 @@ def get_dvc_cmd(
         field_cmds += attr.get_stage_add_argument(node)
         optionals += attr.get_optional_dvc_cmd(node, git_only_repo=git_only_repo)
 
-    for field_cmd in set(field_cmds):
+    # remove duplicates but keep the order, so the command is reproducible.
+    for field_cmd in dict.fromkeys(field_cmds):
         cmd += list(field_cmd)
 
     if git_only_repo:
@@ -448,6 +483,91 @@ def get_dvc_cmd(
     return [cmd] + optionals
 
 
+def get_node_config(node: Node) -> dict:
+    """Get the configuration that 'Node.save(results=False)' writes, in memory.
+
+    Parameters
+    ----------
+    node : Node
+        The node to get the configuration for.
+
+    Returns
+    -------
+    dict
+        The node class, the node working directory and the serialized
+        value of every parameter field.
+    """
+    from zntrack.fields import Field, FieldGroup
+
+    return {
+        "node": f"{module_handler(node.__class__)}.{node.__class__.__name__}",
+        "nwd": get_nwd(node).as_posix(),
+        "fields": {
+            attr.name: attr.get_config(node)
+            for attr in zninit.get_descriptors(Field, self=node)
+            if attr.group == FieldGroup.PARAMETER
+        },
+    }
+
+
+def get_node_hash(node: Node, dvc_cmds: typing.List[typing.List[str]]) -> str:
+    """Get a hash of everything that defines the node in the project.
+
+    The hash covers the 'dvc stage add' commands and the configuration
+    of the node, without writing any file.
+
+    Parameters
+    ----------
+    node : Node
+        The node to compute the hash for.
+    dvc_cmds : list[list[str]]
+        The commands to add the node, as returned by 'get_dvc_cmd'.
+
+    Returns
+    -------
+    str
+        The sha256 hex digest.
+    """
+    definition = {"cmds": dvc_cmds, "config": get_node_config(node)}
+    definition = json.dumps(definition, sort_keys=True, default=str)
+    return hashlib.sha256(definition.encode()).hexdigest()
+
+
+def get_node_config_hash(name: str) -> str:
+    """Get a hash of the current entries of the node in the config files.
+
+    The hash covers the stage in 'dvc.yaml' and the entries of the node in
+    'params.yaml', 'zntrack.json' and 'env.yaml', as they are on disk or in
+    the active config session.
+
+    Parameters
+    ----------
+    name : str
+        The name of the node.
+
+    Returns
+    -------
+    str
+        The sha256 hex digest.
+    """
+    files = config.files
+    content = {}
+    for file in (files.dvc, files.params, files.zntrack, files.env):
+        try:
+            content[file.as_posix()] = file_io.read_file(file) or {}
+        except FileNotFoundError:
+            content[file.as_posix()] = {}
+    entries = {
+        "dvc": content[files.dvc.as_posix()].get("stages", {}).get(name),
+        "params": content[files.params.as_posix()].get(name),
+        "zntrack": content[files.zntrack.as_posix()].get(name),
+        "env": content[files.env.as_posix()].get("stages", {}).get(name),
+    }
+    # the session content is not yet encoded the way it is written to disk.
+    entries = json.dumps(file_io.encode(entries), sort_keys=True)
+    return hashlib.sha256(entries.encode()).hexdigest()
+
+
 @dataclasses.dataclass
 class NodeIdentifier:
     """All information that uniquely identifies a node."""
@@ -2,14 +2,12 @@
 
 import copy
 import dataclasses
-import json
 import logging
 import pathlib
 import typing
 
 import dot4dict
 import znflow
-import znjson
 
 from zntrack.notebooks.jupyter import jupyter_class_to_file
 from zntrack.utils import config, file_io, module_handler, run_dvc_cmd
@@ -274,7 +272,7 @@ def save_node_config_to_files(cfg: NodeConfig, node_name: str):
 
 def decode_dict(value):
     """Decode dict that was loaded without znjson."""
-    return json.loads(json.dumps(value), cls=znjson.ZnDecoder)
+    return file_io.decode(value)
 
 
 def execute_function_call(func):
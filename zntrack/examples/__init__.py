@@ -47,6 +47,18 @@ class WritePlots(zntrack.Node):
         self.plots = pd.DataFrame({"x": self.x, "y": self.y})
 
 
+class StreamPlots(zntrack.Node):
+    """Append rows to a plot while running."""
+
+    plots: pd.DataFrame = zntrack.plots(stream=True, x="step", y="loss")
+    steps: int = zntrack.params(10)
+
+    def run(self):
+        """Append one row per step."""
+        for step in range(self.steps):
+            self.plots.append(step=step, loss=1 / (step + 1))
+
+
 class AddNumbers(zntrack.Node):
     """Add two numbers."""
 
@@ -68,3 +68,7 @@ class DuplicateNodeNameError(Exception):
             " to overwrite existing nodes."
         )
         super().__init__(msg)
+
+
+class WorkerNotAvailableError(Exception):
+    """Raised when no 'zntrack worker' accepts connections on the socket."""
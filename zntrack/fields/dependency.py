@@ -1,7 +1,6 @@
 """Dependency field."""
 
 import copy
-import json
 import logging
 import pathlib
 import typing as t
@@ -17,8 +16,9 @@ from zntrack.fields.zn.options import (
     ConnectionConverter,
     _default,
     _get_all_connections_and_instances,
+    get_output_files,
 )
-from zntrack.utils import config, get_nwd, update_key_val
+from zntrack.utils import config, file_io, filesystem, get_nwd, update_key_val
 
 log = logging.getLogger(__name__)
 
@@ -180,15 +180,9 @@ class Dependency(LazyField):
             #     # nodes with the same name...)
             #     # and make the uuid a dependency of the node.
             #     continue
-            files.append(get_nwd(node) / "node-meta.json")
-            for field in zninit.get_descriptors(Field, self=node):
-                if field.dvc_option in ["params", "deps"]:
-                    # We do not want to depend on parameter files or
-                    # recursively on dependencies.
-                    continue
-                files.extend(field.get_files(node))
-                log.debug(f"Found field {field} and extended files to {files}")
-        return files
+            files.extend(get_output_files(node))
+        # remove duplicates but keep the order, so the command is reproducible.
+        return list(dict.fromkeys(pathlib.Path(x).as_posix() for x in files))
 
     def save(self, instance: "Node"):
         """Save the field to disk."""
@@ -210,18 +204,38 @@ class Dependency(LazyField):
             ),
         )
 
+    def get_config(self, instance: "Node") -> t.Any:
+        """Get the serialized value and the configuration of off-graph Nodes."""
+        from zntrack.core.node import get_node_config
+
+        try:
+            value = self.get_value_except_lazy(instance)
+        except DataIsLazyError:
+            return None
+
+        _, off_graph = self._get_nodes_on_off_graph(instance)
+        return {
+            "value": file_io.encode(
+                value,
+                encoder=znjson.ZnEncoder.from_converters(
+                    [ConnectionConverter, CombinedConnectionsConverter], add_default=True
+                ),
+            ),
+            "nodes": {node.name: get_node_config(node) for node in off_graph},
+        }
+
     def get_data(self, instance: "Node") -> any:
         """Get the value of the field from the file."""
-        zntrack_dict = json.loads(
-            instance.state.fs.read_text(config.files.zntrack),
+        zntrack_dict = filesystem.read_file(
+            config.files.zntrack, instance.state.remote, instance.state.rev
         )
-        value = zntrack_dict[instance.name][self.name]
+        value = copy.deepcopy(zntrack_dict[instance.name][self.name])
 
         value = update_key_val(value, instance=instance)
 
-        value = json.loads(
-            json.dumps(value),
-            cls=znjson.ZnDecoder.from_converters(
+        value = file_io.decode(
+            value,
+            decoder=znjson.ZnDecoder.from_converters(
                 [ConnectionConverter, CombinedConnectionsConverter], add_default=True
             ),
         )
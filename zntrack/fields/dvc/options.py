@@ -1,6 +1,5 @@
 """Base classes for 'zntrack.<field>_path' fields."""
 
-import json
 import pathlib
 import typing
 
@@ -8,7 +7,14 @@ import znflow.utils
 import znjson
 
 from zntrack.fields.field import Field, FieldGroup, PlotsMixin
-from zntrack.utils import DISABLE_TMP_PATH, get_nwd, node_wd
+from zntrack.utils import (
+    DISABLE_TMP_PATH,
+    config,
+    file_io,
+    filesystem,
+    get_nwd,
+    node_wd,
+)
 
 if typing.TYPE_CHECKING:
     from zntrack import Node
@@ -19,17 +25,7 @@ class _LoadIntoTmpPath(znflow.utils.IterableHandler):
         instance = kwargs["instance"]
         path = value
 
-        if instance.state.fs.isdir(pathlib.Path(path).as_posix()):
-            instance.state.fs.get(
-                pathlib.Path(path).as_posix(),
-                instance.state.tmp_path.as_posix(),
-                recursive=True,
-            )
-            _path = instance.state.tmp_path / pathlib.Path(path).name
-        else:
-            temp_file = instance.state.tmp_path / pathlib.Path(path).name
-            instance.state.fs.get(pathlib.Path(path).as_posix(), temp_file.as_posix())
-            _path = temp_file
+        _path = instance.state._materializer.get(path)
 
         if isinstance(path, pathlib.PurePath):
             return _path
@@ -112,12 +108,10 @@ class DVCOption(Field):
         any
             The value of the field from the configuration file.
         """
-        zntrack_dict = json.loads(
-            instance.state.fs.read_text("zntrack.json"),
-        )
-        return json.loads(
-            json.dumps(zntrack_dict[instance.name][self.name]), cls=znjson.ZnDecoder
+        zntrack_dict = filesystem.read_file(
+            config.files.zntrack, instance.state.remote, instance.state.rev
         )
+        return file_io.decode(zntrack_dict[instance.name][self.name])
 
     def save(self, instance: "Node"):
         """Save the field to config file.
@@ -129,16 +123,33 @@ class DVCOption(Field):
 
         """
         try:
-            value = instance.__dict__[self.name]
-        except KeyError:
-            try:
-                # default value is not stored in __dict__
-                # TODO: not sure if I like this
-                value = getattr(instance, self.name)
-            except AttributeError:
-                return
+            value = self._get_raw_value(instance)
+        except AttributeError:
+            return
         self._write_value_to_config(value, instance, encoder=znjson.ZnEncoder)
 
+    def get_config(self, instance: "Node") -> typing.Any:
+        """Get the serialized paths, or None if the field has no value."""
+        try:
+            value = self._get_raw_value(instance)
+        except AttributeError:
+            return None
+        return file_io.encode(value, encoder=znjson.ZnEncoder)
+
+    def _get_raw_value(self, instance: "Node") -> typing.Any:
+        """Get the value of the field, without replacing the nwd.
+
+        Raises
+        ------
+        AttributeError: if the field has no value.
+        """
+        try:
+            return instance.__dict__[self.name]
+        except KeyError:
+            # default value is not stored in __dict__
+            # TODO: not sure if I like this
+            return getattr(instance, self.name)
+
     def __get__(self, instance: "Node", owner=None):
         """Add replacement of the nwd to the get method.
 
@@ -3,16 +3,15 @@
 import abc
 import contextlib
 import enum
-import json
 import logging
 import pathlib
 import shutil
 import typing
 
-import yaml
 import zninit
+import znjson
 
-from zntrack.utils import LazyOption, config
+from zntrack.utils import LazyOption, config, file_io
 
 if typing.TYPE_CHECKING:
     from zntrack.core.node import Node
@@ -73,6 +72,18 @@ class Field(zninit.Descriptor, abc.ABC):
         """
         raise NotImplementedError
 
+    def get_config(self, instance: "Node") -> typing.Any:
+        """Get the serialized value that 'save' writes for this parameter field.
+
+        This is used to detect changes of a Node without writing any file.
+
+        Parameters
+        ----------
+        instance : Node
+            The Node instance to get the configuration for.
+        """
+        return file_io.encode(getattr(instance, self.name), encoder=znjson.ZnEncoder)
+
     def load(self, instance: "Node", lazy: bool = None):
         """Load the field from disk.
 
@@ -143,18 +154,14 @@ class Field(zninit.Descriptor, abc.ABC):
             The JSON encoder to use, by default None.
 
         """
-        try:
-            with open(config.files.zntrack, "r") as f:
-                zntrack_dict = json.load(f)
-        except FileNotFoundError:
-            zntrack_dict = {}
-
-        if instance.name not in zntrack_dict:
-            zntrack_dict[instance.name] = {}
-        zntrack_dict[instance.name][self.name] = value
-        # use the __dict__ to avoid the nwd replacement
-        with open(config.files.zntrack, "w") as f:
-            json.dump(zntrack_dict, f, indent=4, cls=encoder)
+        # only the value is serialized here, the file is written by 'file_io'
+        value = file_io.encode(value, encoder=encoder)
+        file_io.update_config_file(
+            file=config.files.zntrack,
+            node_name=instance.name,
+            value_name=self.name,
+            value=value,
+        )
 
 
 class DataIsLazyError(Exception):
@@ -268,10 +275,10 @@ class PlotsMixin(Field):
         if not self.use_global_plots:
             return
 
-        dvc_file = config.files.dvc
-        if not dvc_file.exists():
-            dvc_file.write_text(yaml.safe_dump({}))
-        dvc_config = yaml.safe_load(dvc_file.read_text())
+        try:
+            dvc_config = file_io.read_file(config.files.dvc)
+        except FileNotFoundError:
+            dvc_config = {}
         plots = dvc_config.get("plots", [])
 
         # remove leading "-/--"
@@ -298,7 +305,7 @@ class PlotsMixin(Field):
                 plots.append({pathlib.Path(file).as_posix(): self.plots_options})
 
         dvc_config["plots"] = plots
-        dvc_file.write_text(yaml.dump(dvc_config))
+        file_io.write_file(config.files.dvc, value=dvc_config)
 
     def get_optional_dvc_cmd(
         self, instance: "Node", git_only_repo: bool
@@ -7,18 +7,23 @@ from zntrack.fields.zn.options import Output, Params, Plots
 # Serialized Fields
 
 
-def outs():
+def outs(format="json"):
     """Define a Node Output.
 
     Parameters
     ----------
-        data: any
-            A data object that is generated by the Node.
-            The object is serialized and deserialized by ZnTrack
-            and stored in the node working directory.
-            see https://dvc.org/doc/command-reference/stage/add#-o
+    data: any
+        A data object that is generated by the Node.
+        The object is serialized and deserialized by ZnTrack
+        and stored in the node working directory.
+        see https://dvc.org/doc/command-reference/stage/add#-o
+    format: str, default="json"
+        The file format, one of "json", "pickle", "npy", "npz" or "parquet".
+        Binary formats are much faster for large arrays or DataFrames.
+        Custom formats can be added with
+        'zntrack.fields.zn.formats.register_format'.
     """
-    return Output(dvc_option="outs", use_repr=False)
+    return Output(dvc_option="outs", format=format, use_repr=False)
 
 
 def metrics():
@@ -79,6 +84,11 @@ def plots(*args, **kwargs):
         see https://dvc.org/doc/command-reference/stage/add#--plots
     kwargs: dict
         Additional keyword arguments that are used for plotting.
+        Use 'stream=True' to append rows during 'run()' with
+        'self.<field>.append({...})' instead of assigning a DataFrame and
+        'parquet=True' to write a parquet sidecar for column selection.
+        With 'proxy=True', only the columns and rows that are accessed
+        on a loaded Node are read.
 
     """
     return Plots(*args, **kwargs)
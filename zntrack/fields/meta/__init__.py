@@ -1,14 +1,12 @@
 """Additional fields that are neither dvc/zn i/o fields."""
 
-import json
-import pathlib
+import copy
 import typing
 
-import yaml
 import znjson
 
 from zntrack.fields.field import Field, FieldGroup
-from zntrack.utils import config, file_io
+from zntrack.utils import config, file_io, filesystem
 
 if typing.TYPE_CHECKING:
     from zntrack import Node
@@ -28,7 +26,7 @@ class Text(Field):
     def save(self, instance):
         """Save the field to disk."""
         value = getattr(instance, self.name)
-        if config.files.dvc.exists() and self.use_dvc_yaml:
+        if file_io.file_exists(config.files.dvc) and self.use_dvc_yaml:
             file_io.update_meta(
                 file=config.files.dvc,
                 node_name=instance.name,
@@ -41,16 +39,17 @@ class Text(Field):
     def get_data(self, instance: "Node") -> any:
         """Get the value of the field from the file."""
         if config.files.dvc.exists() and self.use_dvc_yaml:
-            dvc_dict = yaml.safe_load(instance.state.fs.read_text(config.files.dvc))
-            return dvc_dict["stages"][instance.name]["meta"].get(self.name, None)
+            dvc_dict = filesystem.read_file(
+                config.files.dvc, instance.state.remote, instance.state.rev
+            )
+            value = dvc_dict["stages"][instance.name]["meta"].get(self.name, None)
+            return copy.deepcopy(value)
         else:
             # load from zntrack.json
-            zntrack_dict = json.loads(
-                instance.state.fs.read_text(config.files.zntrack),
-            )
-            return json.loads(
-                json.dumps(zntrack_dict[instance.name][self.name]), cls=znjson.ZnDecoder
+            zntrack_dict = filesystem.read_file(
+                config.files.zntrack, instance.state.remote, instance.state.rev
             )
+            return file_io.decode(zntrack_dict[instance.name][self.name])
 
     def get_stage_add_argument(self, instance) -> typing.List[tuple]:
         """Get the dvc command for this field."""
@@ -74,9 +73,8 @@ class Environment(Field):
 
     def save(self, instance):
         """Save the field to disk."""
-        file = pathlib.Path("env.yaml")
         try:
-            context = yaml.safe_load(file.read_text())
+            context = file_io.read_file(config.files.env)
         except FileNotFoundError:
             context = {}
 
@@ -96,15 +94,23 @@ class Environment(Field):
             )
 
         context["stages"] = stages
-        file.write_text(yaml.safe_dump(context))
+        file_io.write_file(config.files.env, value=context)
+
+    def get_config(self, instance: "Node") -> typing.Any:
+        """Get the environment variables of the field."""
+        return getattr(instance, self.name)
 
     def get_data(self, instance: "Node") -> any:
         """Get the value of the field from the file."""
-        env_dict = yaml.safe_load(instance.state.fs.read_text("env.yaml"))
-        return env_dict.get("stages", {}).get(instance.name, {}).get(self.name, None)
+        env_dict = filesystem.read_file(
+            config.files.env, instance.state.remote, instance.state.rev
+        )
+        value = env_dict.get("stages", {}).get(instance.name, {}).get(self.name, None)
+        return copy.deepcopy(value)
 
     def get_stage_add_argument(self, instance) -> typing.List[tuple]:
         """Get the dvc command for this field."""
         if self.is_parameter:
-            return [("--params", f"env.yaml:stages.{instance.name}.{self.name}")]
+            file = config.files.env
+            return [("--params", f"{file}:stages.{instance.name}.{self.name}")]
         return []
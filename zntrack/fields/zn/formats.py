@@ -0,0 +1,202 @@
+"""File formats for 'zntrack.outs'.
+
+The format defines the file suffix and how the value is written to and
+read from disk. Binary formats avoid expanding large arrays or DataFrames
+into JSON.
+"""
+
+import abc
+import os
+import pathlib
+import pickle
+import typing
+
+from zntrack.utils import config, file_io, filesystem
+
+if typing.TYPE_CHECKING:
+    from zntrack import Node
+
+
+class OutputFormat(abc.ABC):
+    """Base class for the file format of an 'Output' field.
+
+    Attributes
+    ----------
+    suffix : str
+        The suffix of the file, including the leading dot.
+    cache_results : bool
+        Whether loaded values can be stored in the result cache,
+        see 'zntrack.utils.result_cache'.
+    """
+
+    suffix: str = None
+    cache_results: bool = False
+
+    @abc.abstractmethod
+    def dump(self, value, file: pathlib.Path) -> None:
+        """Write the value to the file."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def load(self, file: pathlib.Path, instance: "Node") -> typing.Any:
+        """Read the value from the file using the file system of the Node."""
+        raise NotImplementedError
+
+
+class JSONFormat(OutputFormat):
+    """Serialize the value with 'znjson'."""
+
+    suffix = ".json"
+    cache_results = True
+
+    def dump(self, value, file: pathlib.Path) -> None:
+        """Write the value to the file."""
+        file.write_text(file_io.dumps(value, indent=config.json_indent))
+
+    def load(self, file: pathlib.Path, instance: "Node") -> typing.Any:
+        """Read the value from the file."""
+        return file_io.loads(instance.state.fs.read_bytes(file.as_posix()))
+
+
+class PickleFormat(OutputFormat):
+    """Serialize the value with 'pickle'.
+
+    Only load pickle files from sources you trust.
+    """
+
+    suffix = ".pkl"
+
+    def dump(self, value, file: pathlib.Path) -> None:
+        """Write the value to the file."""
+        with file.open("wb") as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def load(self, file: pathlib.Path, instance: "Node") -> typing.Any:
+        """Read the value from the file."""
+        with instance.state.fs.open(file.as_posix(), mode="rb") as f:
+            return pickle.load(f)
+
+
+class NPYFormat(OutputFormat):
+    """Store a single array in the NumPy '.npy' format.
+
+    If the file is available locally, i.e. in the workspace or in the local
+    DVC cache, it is loaded as a read-only 'numpy.memmap'. Only the parts of the
+    array that are accessed are read from disk. Otherwise, the file is streamed
+    from the file system of the Node.
+
+    Attributes
+    ----------
+    mmap_mode : str|None, default = "r"
+        The 'mmap_mode' passed to 'numpy.load' for local files.
+        Use None to always read the full array into memory.
+    """
+
+    suffix = ".npy"
+
+    def __init__(self, mmap_mode: typing.Optional[str] = "r"):
+        """Create a new NPYFormat."""
+        self.mmap_mode = mmap_mode
+
+    def dump(self, value, file: pathlib.Path) -> None:
+        """Write the array to the file."""
+        import numpy as np
+
+        # The array is written to a new file, which replaces the old one.
+        #  Truncating the old file would break memory maps that are still open.
+        tmp_file = file.with_name(f".{file.name}.tmp")
+        with tmp_file.open("wb") as f:
+            np.save(f, np.asarray(value), allow_pickle=False)
+        os.replace(tmp_file, file)
+
+    def load(self, file: pathlib.Path, instance: "Node") -> typing.Any:
+        """Read the array from the file."""
+        import numpy as np
+
+        if self.mmap_mode is not None:
+            local_file = filesystem.get_local_path(
+                file, instance.state.remote, instance.state.rev
+            )
+            if local_file is not None:
+                return np.load(local_file, mmap_mode=self.mmap_mode, allow_pickle=False)
+
+        with instance.state.fs.open(file.as_posix(), mode="rb") as f:
+            return np.load(f, allow_pickle=False)
+
+
+class NPZFormat(OutputFormat):
+    """Store a dictionary of arrays in the NumPy '.npz' format.
+
+    A single array is stored under the key 'arr_0'.
+    """
+
+    suffix = ".npz"
+
+    def dump(self, value, file: pathlib.Path) -> None:
+        """Write the arrays to the file."""
+        import numpy as np
+
+        arrays = value if isinstance(value, dict) else {"arr_0": value}
+        with file.open("wb") as f:
+            np.savez(f, **arrays)
+
+    def load(self, file: pathlib.Path, instance: "Node") -> typing.Any:
+        """Read the arrays from the file."""
+        import numpy as np
+
+        with instance.state.fs.open(file.as_posix(), mode="rb") as f:
+            with np.load(f, allow_pickle=False) as data:
+                return {key: data[key] for key in data.files}
+
+
+class ParquetFormat(OutputFormat):
+    """Store a 'pandas.DataFrame' in the parquet format.
+
+    Requires 'pyarrow' or 'fastparquet' to be installed.
+    """
+
+    suffix = ".parquet"
+
+    def dump(self, value, file: pathlib.Path) -> None:
+        """Write the DataFrame to the file."""
+        value.to_parquet(file)
+
+    def load(self, file: pathlib.Path, instance: "Node") -> typing.Any:
+        """Read the DataFrame from the file."""
+        import pandas as pd
+
+        with instance.state.fs.open(file.as_posix(), mode="rb") as f:
+            return pd.read_parquet(f)
+
+
+FORMATS: typing.Dict[str, OutputFormat] = {
+    "json": JSONFormat(),
+    "pickle": PickleFormat(),
+    "npy": NPYFormat(),
+    "npz": NPZFormat(),
+    "parquet": ParquetFormat(),
+}
+
+
+def register_format(name: str, output_format: OutputFormat) -> None:
+    """Make a custom format available as 'zntrack.outs(format=name)'."""
+    if not isinstance(output_format, OutputFormat):
+        raise TypeError(f"Expected an 'OutputFormat' instance, got {output_format}.")
+    FORMATS[name] = output_format
+
+
+def get_format(name: typing.Union[str, OutputFormat]) -> OutputFormat:
+    """Get the format by its name.
+
+    Raises
+    ------
+    ValueError: if the format is unknown.
+    """
+    if isinstance(name, OutputFormat):
+        return name
+    try:
+        return FORMATS[name]
+    except KeyError as err:
+        raise ValueError(
+            f"Unknown output format '{name}'. Available formats are {list(FORMATS)}."
+        ) from err
@@ -1,13 +1,13 @@
 """Base classes for 'zntrack.<field>' fields."""
 
+import contextlib
+import copy
 import dataclasses
-import json
+import functools
 import logging
 import pathlib
 import typing
 
-import pandas as pd
-import yaml
 import znflow
 import znflow.utils
 import zninit
@@ -22,9 +22,21 @@ from zntrack.fields.field import (
     LazyField,
     PlotsMixin,
 )
-from zntrack.utils import config, get_nwd, module_handler, update_key_val
+from zntrack.fields.zn import formats, plots_io
+from zntrack.utils import (
+    LazyOption,
+    config,
+    file_io,
+    filesystem,
+    get_nwd,
+    module_handler,
+    result_cache,
+    update_key_val,
+)
 
 if typing.TYPE_CHECKING:
+    import pandas as pd
+
     from zntrack import Node
 log = logging.getLogger(__name__)
 
@@ -127,27 +139,25 @@ class Params(Field):
             The node instance associated with this field.
         """
         file = self.get_files(instance)[0]
+        file_io.update_config_file(
+            file=file,
+            node_name=instance.name,
+            value_name=self.name,
+            value=self.get_config(instance),
+        )
 
-        try:
-            params_dict = yaml.safe_load(pathlib.Path(file).read_text())
-        except FileNotFoundError:
-            params_dict = {instance.name: {}}
-
-        if instance.name not in params_dict:
-            params_dict[instance.name] = {}
-
-        params_dict[instance.name][self.name] = getattr(instance, self.name)
-        params_dict = json.loads(json.dumps(params_dict, cls=znjson.ZnEncoder))
-
-        with open(file, "w") as f:
-            yaml.safe_dump(params_dict, f, indent=4)
+    def get_config(self, instance: "Node") -> typing.Any:
+        """Get the serialized value of the field."""
+        return file_io.encode(getattr(instance, self.name))
 
     def get_data(self, instance: "Node") -> any:
         """Get the value of the field from the file."""
         file = self.get_files(instance)[0]
-        params_dict = yaml.safe_load(instance.state.fs.read_text(file))
+        params_dict = filesystem.read_file(
+            file, instance.state.remote, instance.state.rev
+        )
         value = params_dict[instance.name][self.name]
-        return json.loads(json.dumps(value), cls=znjson.ZnDecoder)
+        return file_io.decode(value)
 
     def get_stage_add_argument(self, instance: "Node") -> typing.List[tuple]:
         """Get the DVC stage add argument for this field.
@@ -171,17 +181,25 @@ class Output(LazyField):
 
     group = FieldGroup.RESULT
 
-    def __init__(self, dvc_option: str, **kwargs):
+    def __init__(
+        self,
+        dvc_option: str,
+        format: typing.Union[str, formats.OutputFormat] = "json",
+        **kwargs,
+    ):
         """Create a new Output field.
 
         Parameters
         ----------
         dvc_option : str
             The DVC option used to specify the output file.
+        format : str|OutputFormat, default = "json"
+            The file format, see 'zntrack.fields.zn.formats.FORMATS'.
         **kwargs
             Additional arguments to pass to the parent constructor.
         """
         self.dvc_option = dvc_option
+        self.format = formats.get_format(format)
         super().__init__(**kwargs)
 
     def get_files(self, instance) -> list:
@@ -197,7 +215,7 @@ class Output(LazyField):
         list
             A list containing the path of the file.
         """
-        return [get_nwd(instance) / f"{self.name}.json"]
+        return [get_nwd(instance) / f"{self.name}{self.format.suffix}"]
 
     def save(self, instance: "Node"):
         """Save the field to disk.
@@ -214,14 +232,15 @@ class Output(LazyField):
 
         instance.nwd.mkdir(exist_ok=True, parents=True)
         file = self.get_files(instance)[0]
-        file.write_text(json.dumps(value, cls=znjson.ZnEncoder, indent=4))
+        self.format.dump(value, file)
 
     def get_data(self, instance: "Node") -> any:
-        """Get the value of the field from the file."""
+        """Get the value of the field from the file or the result cache."""
         file = self.get_files(instance)[0]
-        return json.loads(
-            instance.state.fs.read_text(file.as_posix()),
-            cls=znjson.ZnDecoder,
+        if not self.format.cache_results:
+            return self.format.load(file, instance)
+        return result_cache.load(
+            instance, self.name, functools.partial(self.format.load, file, instance)
         )
 
     def get_stage_add_argument(self, instance) -> typing.List[tuple]:
@@ -242,38 +261,142 @@ class Output(LazyField):
 
 
 class Plots(PlotsMixin, LazyField):
-    """A field that is saved to disk."""
+    """A field that is saved to disk.
+
+    Attributes
+    ----------
+    stream : bool, default = False
+        Append rows during 'run()' instead of assigning a DataFrame.
+        Accessing the field on a Node whose results are not loaded returns a
+        'PlotsWriter' and every appended row is written to the CSV file directly.
+        A restarted Node continues the existing file. Once the Node is saved,
+        the field is read from the file like a field that is not streamed.
+    parquet : bool, default = False
+        Write a parquet sidecar of the CSV file on save. Selected columns
+        are then read from the sidecar. Requires 'pyarrow' or 'fastparquet'.
+    proxy : bool, default = False
+        Load the field as a 'LazyDataFrame' that only reads the columns and
+        rows that are accessed, e.g. 'node.plots["loss"]' or 'node.plots.tail()'.
+    """
 
     dvc_option: str = "plots"
     group = FieldGroup.RESULT
 
+    def __init__(
+        self,
+        *args,
+        stream: bool = False,
+        parquet: bool = False,
+        proxy: bool = False,
+        **kwargs,
+    ):
+        """Create a new Plots field."""
+        super().__init__(*args, **kwargs)
+        self.stream = stream
+        self.parquet = parquet
+        self.proxy = proxy
+
+    def __get__(self, instance, owner=None):
+        """Get a 'PlotsWriter' for streamed fields that have no value yet."""
+        if instance is None:
+            return self
+        if self.stream and self.name not in instance.__dict__:
+            instance.__dict__[self.name] = plots_io.PlotsWriter(
+                self.get_files(instance)[0], resume=instance.state.restarted
+            )
+        return super().__get__(instance, owner)
+
     def get_files(self, instance) -> list:
         """Get the path of the file in the node directory."""
         return [get_nwd(instance) / f"{self.name}.csv"]
 
+    def get_sidecar(self, instance) -> typing.Optional[pathlib.Path]:
+        """Get the path of the parquet sidecar, if enabled."""
+        if not self.parquet:
+            return None
+        return get_nwd(instance) / f"{self.name}.parquet"
+
     def save(self, instance: "Node"):
         """Save the field to disk."""
         super().save(instance)
-        try:
-            value = self.get_value_except_lazy(instance)
-        except DataIsLazyError:
-            return
-        if value is None:
+        value = instance.__dict__.get(self.name)
+        if value is LazyOption or value is None:
             return
 
-        instance.nwd.mkdir(exist_ok=True, parents=True)
         file = self.get_files(instance)[0]
-        value.to_csv(file)
+        if isinstance(value, plots_io.PlotsWriter):
+            # the rows are already in the file.
+            value.close()
+            if len(value) == 0:
+                self.close(instance)
+                return
+        else:
+            instance.nwd.mkdir(exist_ok=True, parents=True)
+            value.to_csv(file)
+
+        sidecar = self.get_sidecar(instance)
+        if sidecar is not None:
+            if isinstance(value, plots_io.PlotsWriter):
+                value = value.to_dataframe()
+            value.to_parquet(sidecar)
+        self.close(instance)
+
+    def close(self, instance: "Node") -> None:
+        """Close the 'PlotsWriter' of a streamed field after the Node has run.
+
+        The field is then loaded from the file on access, so it is a DataFrame
+        like for fields that are not streamed.
+        """
+        value = instance.__dict__.get(self.name)
+        if not isinstance(value, plots_io.PlotsWriter):
+            return
+        value.close()
+        if len(value) == 0:
+            import pandas as pd
+
+            instance.__dict__[self.name] = pd.DataFrame()
+        else:
+            instance.__dict__[self.name] = LazyOption
 
     def get_data(self, instance: "Node") -> any:
         """Get the value of the field from the file."""
+        if not self.proxy:
+            return self.read(instance)
         file = self.get_files(instance)[0]
-        return pd.read_csv(instance.state.fs.open(file.as_posix()), index_col=0)
+        return plots_io.LazyDataFrame(
+            reader=functools.partial(self.read, instance),
+            columns=plots_io.read_header(instance, file),
+            length=functools.partial(plots_io.count_rows, instance, file),
+        )
+
+    def read(
+        self, instance: "Node", columns: typing.List[str] = None, rows: slice = None
+    ) -> "pd.DataFrame":
+        """Read selected columns and rows of the field from the file.
+
+        Parameters
+        ----------
+        instance : Node
+            The Node to read the field for.
+        columns : list[str], optional
+            The columns to read. Defaults to all columns.
+        rows : slice, optional
+            The rows to read, e.g. 'slice(1000, 2000)'. Defaults to all rows.
+        """
+        sidecar = self.get_sidecar(instance)
+        if sidecar is not None and (columns is not None or rows is not None):
+            with contextlib.suppress(FileNotFoundError):
+                return plots_io.read_parquet(instance, sidecar, columns, rows)
+        return plots_io.read_csv(instance, self.get_files(instance)[0], columns, rows)
 
     def get_stage_add_argument(self, instance) -> typing.List[tuple]:
         """Get the dvc command for this field."""
         file = self.get_files(instance)[0]
-        return [(f"--{self.dvc_option}", file.as_posix())]
+        arguments = [(f"--{self.dvc_option}", file.as_posix())]
+        sidecar = self.get_sidecar(instance)
+        if sidecar is not None:
+            arguments.append(("--outs", sidecar.as_posix()))
+        return arguments
 
 
 _default = object()
@@ -295,6 +418,25 @@ def _get_all_connections_and_instances(value) -> list["Node"]:
     return connections
 
 
+def get_output_files(node: "Node") -> tuple:
+    """Get the files that a downstream Node depends on.
+
+    The files are collected once and stored on the state of the Node,
+    until the Node is saved or the project is built again.
+    """
+    if node.state._output_files is None:
+        files = [get_nwd(node) / "node-meta.json"]
+        for field in zninit.get_descriptors(Field, self=node):
+            if field.dvc_option in ["params", "deps"]:
+                # We do not want to depend on parameter files or
+                # recursively on dependencies.
+                continue
+            files.extend(field.get_files(node))
+        log.debug(f"Found output files {files} of {node}")
+        node.state._output_files = tuple(files)
+    return node.state._output_files
+
+
 class Dependency(LazyField):
     """A dependency field."""
 
@@ -383,15 +525,9 @@ class Dependency(LazyField):
             #     # nodes with the same name...)
             #     # and make the uuid a dependency of the node.
             #     continue
-            files.append(get_nwd(node) / "node-meta.json")
-            for field in zninit.get_descriptors(Field, self=node):
-                if field.dvc_option in ["params", "deps"]:
-                    # We do not want to depend on parameter files or
-                    # recursively on dependencies.
-                    continue
-                files.extend(field.get_files(node))
-                log.debug(f"Found field {field} and extended files to {files}")
-        return files
+            files.extend(get_output_files(node))
+        # remove duplicates but keep the order, so the command is reproducible.
+        return list(dict.fromkeys(pathlib.Path(x).as_posix() for x in files))
 
     def save(self, instance: "Node"):
         """Save the field to disk."""
@@ -408,18 +544,31 @@ class Dependency(LazyField):
             ),
         )
 
+    def get_config(self, instance: "Node") -> typing.Any:
+        """Get the serialized connections, or None if the value is lazy."""
+        try:
+            value = self.get_value_except_lazy(instance)
+        except DataIsLazyError:
+            return None
+        return file_io.encode(
+            value,
+            encoder=znjson.ZnEncoder.from_converters(
+                [ConnectionConverter, CombinedConnectionsConverter], add_default=True
+            ),
+        )
+
     def get_data(self, instance: "Node") -> any:
         """Get the value of the field from the file."""
-        zntrack_dict = json.loads(
-            instance.state.fs.read_text(config.files.zntrack),
+        zntrack_dict = filesystem.read_file(
+            config.files.zntrack, instance.state.remote, instance.state.rev
         )
-        value = zntrack_dict[instance.name][self.name]
+        value = copy.deepcopy(zntrack_dict[instance.name][self.name])
 
         value = update_key_val(value, instance=instance)
 
-        value = json.loads(
-            json.dumps(value),
-            cls=znjson.ZnDecoder.from_converters(
+        value = file_io.decode(
+            value,
+            decoder=znjson.ZnDecoder.from_converters(
                 [ConnectionConverter, CombinedConnectionsConverter], add_default=True
             ),
         )
@@ -499,6 +648,24 @@ class NodeField(Dependency):
                 _SaveNodes()(node, name=name)
         super().save(instance)
 
+    def get_config(self, instance: "Node") -> typing.Any:
+        """Get the serialized value and the configuration of the other Nodes."""
+        from zntrack.core.node import get_node_config
+
+        try:
+            value = self.get_value_except_lazy(instance)
+        except DataIsLazyError:
+            return None
+        if value is None:
+            return None
+        if not isinstance(value, (list, tuple)):
+            value = [value]
+        nodes = {}
+        for node, name in zip(value, self.get_node_names(instance)):
+            node.name = name
+            nodes[name] = get_node_config(node)
+        return {"value": super().get_config(instance), "nodes": nodes}
+
     def _get_nwd(self, instance: "Node", name: str) -> pathlib.Path:
         """Get the node working directory."""
         # get the name of the parent directory as string
@@ -0,0 +1,315 @@
+"""Append-only storage for 'zntrack.plots(stream=True)'.
+
+Rows are appended to the CSV file while the Node is running, so the file
+never has to be rewritten. The CSV has the layout of 'pandas.DataFrame.to_csv'
+and can be used with 'dvc plots'. Optionally, a parquet sidecar is written
+on save, from which selected columns can be read without parsing the CSV.
+"""
+
+import csv
+import logging
+import pathlib
+import typing
+
+if typing.TYPE_CHECKING:
+    import pandas as pd
+
+    from zntrack import Node
+
+log = logging.getLogger(__name__)
+
+
+def _count_rows(f: typing.BinaryIO) -> int:
+    """Count the data rows of a CSV file, excluding the header.
+
+    The lines are counted without parsing the file. Values of
+    plots do not contain quoted line breaks.
+    """
+    lines = sum(chunk.count(b"\n") for chunk in iter(lambda: f.read(1 << 20), b""))
+    return max(lines - 1, 0)
+
+
+class PlotsWriter:
+    """Append rows to the CSV file of a streamed 'zntrack.plots' field.
+
+    The file is created on the first appended row. The columns are defined
+    by the first row, missing values in later rows are written as empty cells.
+
+    Attributes
+    ----------
+    file : pathlib.Path
+        The CSV file to append to.
+    resume : bool
+        Continue an existing file, e.g. for a restarted Node.
+        Otherwise, an existing file is replaced.
+    """
+
+    def __init__(self, file: pathlib.Path, resume: bool = False):
+        """Create a new PlotsWriter."""
+        self.file = pathlib.Path(file)
+        self.resume = resume
+        self.columns: typing.Optional[typing.List[str]] = None
+        self._index = 0
+        self._handle = None
+        self._writer = None
+
+    def __len__(self) -> int:
+        """Get the number of rows in the file."""
+        return self._index
+
+    def _open(self) -> None:
+        """Open the file for appending."""
+        if self.columns is None and self.resume and self.file.exists():
+            with self.file.open(newline="") as f:
+                header = next(csv.reader(f), None)
+            if header:
+                self.columns = header[1:]
+                with self.file.open("rb") as f:
+                    self._index = _count_rows(f)
+                log.debug(f"Resuming {self.file} after {self._index} rows")
+
+        self.file.parent.mkdir(parents=True, exist_ok=True)
+        mode = "w" if self.columns is None else "a"
+        self._handle = self.file.open(mode, newline="")
+        self._writer = csv.writer(self._handle)
+
+    def append(self, row: dict = None, **kwargs) -> None:
+        """Append a single row.
+
+        Parameters
+        ----------
+        row : dict, optional
+            The values of the row by column name.
+        kwargs : dict
+            Additional values of the row by column name.
+
+        Raises
+        ------
+        ValueError: if the row contains a column that is not in the file.
+        """
+        row = {**(row or {}), **kwargs}
+        if self._handle is None:
+            self._open()
+        if self.columns is None:
+            self.columns = list(row)
+            self._writer.writerow(["", *self.columns])
+        unknown = [key for key in row if key not in self.columns]
+        if unknown:
+            raise ValueError(
+                f"Unable to append columns {unknown} to '{self.file}' with columns"
+                f" {self.columns}."
+            )
+        self._writer.writerow([self._index, *(row.get(x, "") for x in self.columns)])
+        self._index += 1
+
+    def extend(self, rows: typing.Union[typing.Iterable[dict], "pd.DataFrame"]) -> None:
+        """Append multiple rows, given as dictionaries or as a DataFrame."""
+        if hasattr(rows, "to_dict"):
+            rows = rows.to_dict(orient="records")
+        for row in rows:
+            self.append(row)
+
+    def close(self) -> None:
+        """Flush the rows to disk. Appending again reopens the file."""
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+            self._writer = None
+        # rows that are appended after closing, continue the file.
+        self.resume = True
+
+    def to_dataframe(self) -> "pd.DataFrame":
+        """Read all rows that have been written."""
+        import pandas as pd
+
+        if self._handle is not None:
+            self._handle.flush()
+        return pd.read_csv(self.file, index_col=0)
+
+
+def read_header(instance: "Node", file: pathlib.Path) -> typing.List[str]:
+    """Read the column names of a CSV file, excluding the index column."""
+    with instance.state.fs.open(file.as_posix(), mode="r") as f:
+        header = next(csv.reader(f), [""])
+    return header[1:]
+
+
+def count_rows(instance: "Node", file: pathlib.Path) -> int:
+    """Count the rows of a CSV file from the file system of the Node."""
+    with instance.state.fs.open(file.as_posix(), mode="rb") as f:
+        return _count_rows(f)
+
+
+def read_csv(
+    instance: "Node",
+    file: pathlib.Path,
+    columns: typing.List[str] = None,
+    rows: slice = None,
+) -> "pd.DataFrame":
+    """Read selected columns and rows of a CSV file from the file system of the Node.
+
+    Parameters
+    ----------
+    instance : Node
+        The Node whose file system is used.
+    file : pathlib.Path
+        The CSV file written by 'DataFrame.to_csv' or 'PlotsWriter'.
+    columns : list[str], optional
+        The columns to read. Defaults to all columns.
+    rows : slice, optional
+        The rows to read. Rows outside of the slice are skipped without
+        being parsed. Negative bounds require counting the rows first.
+    """
+    import pandas as pd
+
+    kwargs = {}
+    if columns is not None:
+        # the index column is always read.
+        header = ["", *read_header(instance, file)]
+        missing = [x for x in columns if x not in header[1:]]
+        if missing:
+            raise KeyError(f"Columns {missing} not found in '{file}'.")
+        kwargs["usecols"] = [0] + [header.index(x, 1) for x in columns]
+    step = None
+    if rows is not None:
+        start, stop, step = rows.start, rows.stop, rows.step
+        if any(x is not None and x < 0 for x in (start, stop)) or (step or 1) < 0:
+            start, stop, step = rows.indices(count_rows(instance, file))
+            if step < 0:
+                # read the rows in ascending order and reverse them afterwards.
+                start, stop = stop + 1, start + 1
+        start = start or 0
+        kwargs["skiprows"] = range(1, start + 1)
+        if stop is not None:
+            kwargs["nrows"] = max(stop - start, 0)
+
+    with instance.state.fs.open(file.as_posix()) as f:
+        df = pd.read_csv(f, index_col=0, **kwargs)
+    if columns is not None:
+        df = df[columns]
+    if step not in (None, 1):
+        df = df.iloc[:: -1 if step < 0 else 1].iloc[:: abs(step)]
+    return df
+
+
+def read_parquet(
+    instance: "Node",
+    file: pathlib.Path,
+    columns: typing.List[str] = None,
+    rows: slice = None,
+) -> "pd.DataFrame":
+    """Read selected columns and rows of a parquet file from the file system of the Node.
+
+    Only the selected columns are read from the file.
+    """
+    import pandas as pd
+
+    with instance.state.fs.open(file.as_posix(), mode="rb") as f:
+        df = pd.read_parquet(f, columns=columns)
+    return df if rows is None else df.iloc[rows]
+
+
+class _ILocIndexer:
+    """Row selection by position for 'LazyDataFrame.iloc'."""
+
+    def __init__(self, frame: "LazyDataFrame"):
+        self._frame = frame
+
+    def __getitem__(self, key):
+        """Read the selected rows."""
+        if isinstance(key, slice):
+            return self._frame.read(rows=key)
+        if isinstance(key, int):
+            rows = slice(key, key + 1 if key != -1 else None)
+            return self._frame.read(rows=rows).iloc[0]
+        return self._frame.to_pandas().iloc[key]
+
+
+class LazyDataFrame:
+    """Read-only proxy of a 'zntrack.plots' DataFrame that reads on access.
+
+    Selecting columns or rows only reads the selected part of the file,
+    e.g. 'df["loss"]', 'df[["step", "loss"]]', 'df.head()', 'df.tail(100)' or
+    'df.iloc[1000:2000]'. Any other attribute is taken from the full DataFrame,
+    which is read once on first use.
+
+    Attributes
+    ----------
+    reader : Callable
+        A function 'reader(columns, rows)' that reads the selected
+        columns and rows as a DataFrame.
+    columns : list[str]
+        The names of the columns.
+    """
+
+    def __init__(
+        self,
+        reader: typing.Callable[..., "pd.DataFrame"],
+        columns: typing.List[str],
+        length: typing.Callable[[], int],
+    ):
+        """Create a new LazyDataFrame."""
+        self.reader = reader
+        self.columns = list(columns)
+        self._length = length
+        self._data = None
+
+    def __repr__(self) -> str:
+        """Show the columns without reading the data."""
+        return f"{self.__class__.__name__}(columns={self.columns})"
+
+    def __len__(self) -> int:
+        """Get the number of rows."""
+        if self._data is not None:
+            return len(self._data)
+        return self._length()
+
+    def __getitem__(self, key):
+        """Read a column, a list of columns or a slice of rows."""
+        if self._data is not None:
+            return self._data[key]
+        if isinstance(key, str):
+            return self.read(columns=[key])[key]
+        if isinstance(key, slice):
+            return self.read(rows=key)
+        if isinstance(key, (list, tuple)) and all(isinstance(x, str) for x in key):
+            return self.read(columns=list(key))
+        return self.to_pandas()[key]
+
+    def __getattr__(self, item):
+        """Read a column by attribute or forward to the full DataFrame."""
+        if item.startswith("_"):
+            raise AttributeError(item)
+        if item in self.columns and self._data is None:
+            return self[item]
+        return getattr(self.to_pandas(), item)
+
+    @property
+    def iloc(self) -> _ILocIndexer:
+        """Select rows by position."""
+        if self._data is not None:
+            return self._data.iloc
+        return _ILocIndexer(self)
+
+    def read(
+        self, columns: typing.List[str] = None, rows: slice = None
+    ) -> "pd.DataFrame":
+        """Read selected columns and rows."""
+        if self._data is not None:
+            df = self._data if columns is None else self._data[columns]
+            return df if rows is None else df.iloc[rows]
+        return self.reader(columns=columns, rows=rows)
+
+    def head(self, n: int = 5) -> "pd.DataFrame":
+        """Read the first n rows."""
+        return self.read(rows=slice(None, n))
+
+    def tail(self, n: int = 5) -> "pd.DataFrame":
+        """Read the last n rows."""
+        return self.read(rows=slice(-n, None) if n > 0 else slice(0, 0))
+
+    def to_pandas(self) -> "pd.DataFrame":
+        """Read the full DataFrame. The result is kept for later access."""
+        if self._data is None:
+            self._data = self.reader(columns=None, rows=None)
+        return self._data
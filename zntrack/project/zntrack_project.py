@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import concurrent.futures
 import contextlib
 import dataclasses
 import json
@@ -10,24 +11,36 @@ import pathlib
 import shutil
 import subprocess
 import typing
+import uuid
 
-import dvc.api
-import git
-import tqdm
 import yaml
 import znflow
 from znflow.handler import UpdateConnectors
 
 from zntrack import exceptions
-from zntrack.core.node import Node, get_dvc_cmd
-from zntrack.utils import NodeName, config, run_dvc_cmd
+from zntrack.core.load import load_nodes
+from zntrack.core.node import Node, get_dvc_cmd, get_node_config_hash, get_node_hash
+from zntrack.utils import NodeName, NodeStatusResults, config, file_io, run_dvc_cmd
 from zntrack.utils.cli import get_groups
+from zntrack.utils.stages import add_stages
+
+if typing.TYPE_CHECKING:
+    import git
 
 log = logging.getLogger(__name__)
 
 
+def _get_git_repo() -> git.Repo:
+    """Get the git repository of the current directory."""
+    import git
+
+    return git.Repo()
+
+
 def _initalize():
     """Initialize the project."""
+    import git
+
     try:
         _ = git.Repo()
     except git.exc.InvalidGitRepositoryError:
@@ -44,10 +57,28 @@ def _initalize():
 
 
 class ZnTrackGraph(znflow.DiGraph):
-    """Subclass of the znflow.DiGraph."""
+    """Subclass of the znflow.DiGraph.
+
+    If automatic node names are used, the graph keeps an index of the node names
+    and the next free suffix for every name. A unique name is found without
+    comparing against every node in the graph.
+    """
 
     project: Project = None
 
+    def __init__(self, *args, **kwargs):
+        """Create a new ZnTrackGraph."""
+        super().__init__(*args, **kwargs)
+        self._name_index: dict[str, uuid.UUID] = {}
+        # node uuid -> (name, name without suffix, suffix)
+        self._node_names: dict[uuid.UUID, tuple[str, str, int]] = {}
+        self._next_suffix: dict[str, int] = {}
+
+    @property
+    def _use_name_index(self) -> bool:
+        """Whether the names are indexed."""
+        return self.project is not None and self.project.automatic_node_names
+
     def add_node(self, node_for_adding: Node, **attr):
         """Rename Nodes if required."""
         if node_for_adding._external_:
@@ -56,6 +87,47 @@ class ZnTrackGraph(znflow.DiGraph):
             node_for_adding.name = NodeName(self.active_group, node_for_adding.name)
 
         super().add_node(node_for_adding, **attr)
+        self.update_name_index(node_for_adding)
+
+    def remove_node(self, n):
+        """Remove the node and its name from the index."""
+        self._remove_from_name_index(n)
+        super().remove_node(n)
+
+    def update_name_index(self, node: Node) -> None:
+        """Add the current name of the node to the index."""
+        if not self._use_name_index or not isinstance(node._name_, NodeName):
+            return
+        self._remove_from_name_index(node.uuid)
+        name = str(node._name_)
+        suffix = node._name_.suffix
+        base = str(dataclasses.replace(node._name_, suffix=0)) if suffix else name
+        self._name_index[name] = node.uuid
+        self._node_names[node.uuid] = (name, base, suffix)
+        if suffix and suffix == self._next_suffix.get(base, 1):
+            self._next_suffix[base] = suffix + 1
+
+    def _remove_from_name_index(self, node_uuid: uuid.UUID) -> None:
+        """Remove the name of the node from the index and release its suffix."""
+        name, base, suffix = self._node_names.pop(node_uuid, (None, None, 0))
+        if name is not None and self._name_index.get(name) == node_uuid:
+            del self._name_index[name]
+        if suffix:
+            self._next_suffix[base] = min(self._next_suffix.get(base, 1), suffix)
+
+    def is_name_taken(self, name: str, node: Node) -> bool:
+        """Whether another node in the graph uses the name."""
+        node_uuid = self._name_index.get(name)
+        return node_uuid is not None and node_uuid != node.uuid and node_uuid in self
+
+    def get_next_suffix(self, name: NodeName) -> int:
+        """Get the smallest suffix for the name that might be free.
+
+        All suffixes below the returned value are used by other nodes.
+        """
+        if not self._use_name_index:
+            return 1
+        return self._next_suffix.get(str(dataclasses.replace(name, suffix=0)), 1)
 
 
 @dataclasses.dataclass
@@ -120,6 +192,7 @@ class Project:
             config.files.zntrack.unlink(missing_ok=True)
             config.files.dvc.unlink(missing_ok=True)
             config.files.params.unlink(missing_ok=True)
+            config.files.hashes.unlink(missing_ok=True)
             shutil.rmtree("nodes", ignore_errors=True)
 
         if self.automatic_node_names and self.magic_names:
@@ -141,6 +214,9 @@ class Project:
             node = self.graph.nodes[node_uuid]["value"]
             if node._external_:
                 continue
+            if self.magic_names:
+                # resolve all variable names, parsing every source file once.
+                node._name_.resolve_varname()
 
             if node.name in node_names and not self.force:
                 raise exceptions.DuplicateNodeNameError(node)
@@ -203,6 +279,8 @@ class Project:
         if len(nodes_to_remove):
             zntrack_config = json.loads(config.files.zntrack.read_text())
 
+            import tqdm
+
             for node_name in tqdm.tqdm(nodes_to_remove):
                 run_dvc_cmd(["remove", node_name, "--outs"])
                 _ = zntrack_config.pop(node_name, None)
@@ -224,6 +302,8 @@ class Project:
         environment: dict = None,
         nodes: list = None,
         auto_remove: bool = False,
+        max_workers: int = 1,
+        skip_unchanged: bool = True,
     ):
         """Run the Project Graph.
 
@@ -248,6 +328,14 @@ class Project:
         auto_remove : bool, default = False
             If True, remove all nodes from 'dvc.yaml' that are not in the graph.
             This is the same as calling 'project.auto_remove()'
+        max_workers : int, default = 1
+            if using 'eager=True', the number of threads used to run the nodes.
+            A node is started as soon as all nodes it depends on are finished.
+            Each node is saved as soon as it is finished.
+        skip_unchanged : bool, default = True
+            if True, only nodes whose definition changed since the last build are
+            written to 'dvc.yaml', 'params.yaml' and 'zntrack.json'.
+            if False, all nodes are written.
         """
         if not save and not eager:
             raise ValueError("Save can only be false if eager is True")
@@ -271,37 +359,76 @@ class Project:
                     raise ValueError(f"Unknown node type {type(node)}")
 
         sorted_nodes = self.graph.get_sorted_nodes()
+        # the output files of upstream nodes are collected once per build.
+        for node_uuid in sorted_nodes:
+            self.graph.nodes[node_uuid]["value"].state._output_files = None
+
+        import tqdm
 
         _tqdm_disabled = True if eager or len(sorted_nodes) <= 5 else False
 
         tbar = tqdm.tqdm(self.graph.get_sorted_nodes(), ncols=140, disable=_tqdm_disabled)
 
-        for node_uuid in tbar:
-            node: Node = self.graph.nodes[node_uuid]["value"]
-            if node_names is not None and node.name not in node_names:
-                continue
-            node.nwd  # create the node working directory (property-access will create it)
-            if node._external_:
-                continue
+        # batch all config file updates and write each file once.
+        session = contextlib.nullcontext() if eager else file_io.config_session()
+
+        with session:
+            # nodes are only added if their definition changed.
+            skip = skip_unchanged and not eager
+            node_hashes = self._get_node_hashes() if skip else {}
+            eager_nodes = {}
+            added_nodes = []
+            dvc_cmds = []
+            for node_uuid in tbar:
+                node: Node = self.graph.nodes[node_uuid]["value"]
+                if node_names is not None and node.name not in node_names:
+                    continue
+                node.nwd  # create the node working directory (property-access creates it)
+                if node._external_:
+                    continue
+                if eager:
+                    eager_nodes[node_uuid] = node
+                else:
+                    tbar.set_description(f"Adding node '{node.name}'")
+                    node_cmds = get_dvc_cmd(
+                        node,
+                        git_only_repo=self.git_only_repo,
+                        **optional.get(node.name, {}),
+                    )
+                    node_hash = get_node_hash(node, node_cmds)
+                    if node_hashes.get(node.name) == node_hash:
+                        log.debug(f"Skipping unchanged node {node}")
+                        continue
+                    log.info(f"Adding node {node}")
+                    node_hashes[node.name] = node_hash
+                    dvc_cmds += node_cmds
+                    added_nodes.append(node)
             if eager:
-                # update connectors
-                log.info(f"Running node {node}")
-                self.graph._update_node_attributes(node, UpdateConnectors())
-                node.run()
-                if save:
-                    node.save()
-                node.state.loaded = True
+                self._run_eager(eager_nodes, save=save, max_workers=max_workers)
             else:
-                log.info(f"Adding node {node}")
-                cmd = get_dvc_cmd(
-                    node, git_only_repo=self.git_only_repo, **optional.get(node.name, {})
+                # the stages must be in the 'dvc.yaml' before the nodes are saved.
+                add_stages(dvc_cmds)
+                for node in added_nodes:
+                    node.save(results=False)
+                if node_names is None:
+                    # remove the hashes of nodes that are no longer part of the graph.
+                    graph_node_names = {
+                        self.graph.nodes[x]["value"].name for x in self.graph.nodes
+                    }
+                    node_hashes = {
+                        key: val
+                        for key, val in node_hashes.items()
+                        if key in graph_node_names
+                    }
+                # the config entries are stored to detect changes that are not made
+                # by ZnTrack, e.g. 'dvc exp run -S' or a checkout of 'params.yaml'.
+                file_io.write_file(
+                    config.files.hashes,
+                    value={
+                        name: {"node": node_hash, "config": get_node_config_hash(name)}
+                        for name, node_hash in node_hashes.items()
+                    },
                 )
-                for x in cmd:
-                    stdout = None
-                    if not _tqdm_disabled:
-                        stdout = tbar.set_description
-                    run_dvc_cmd(x, stdout=stdout)
-                node.save(results=False)
         if not eager and repro:
             self.repro()
             # TODO should we load the nodes here? Maybe, if lazy loading is implemented.
@@ -309,26 +436,168 @@ class Project:
         if auto_remove:
             self.auto_remove()
 
+    def _run_eager(
+        self, nodes: dict[uuid.UUID, Node], save: bool, max_workers: int
+    ) -> None:
+        """Run the nodes in the current process.
+
+        Parameters
+        ----------
+        nodes : dict[uuid.UUID, Node]
+            The nodes to run in topological order.
+        save : bool
+            Save each node, once it is finished.
+        max_workers : int
+            The number of threads. Independent nodes are run concurrently.
+        """
+        import zninit
+
+        from zntrack.fields.zn import options as zn_options
+
+        def _run(node: Node) -> Node:
+            log.info(f"Running node {node}")
+            # update connectors
+            self.graph._update_node_attributes(node, UpdateConnectors())
+            node.run()
+            return node
+
+        def _finish(node: Node) -> None:
+            # nodes are saved in the main thread to avoid concurrent file updates.
+            if save:
+                node.save()
+            else:
+                # streamed plots are written while running, even without saving.
+                for attr in zninit.get_descriptors(zn_options.Plots, self=node):
+                    attr.close(node)
+            node.state.loaded = True
+
+        if max_workers == 1 or len(nodes) <= 1:
+            for node in nodes.values():
+                _finish(_run(node))
+            return
+
+        def _get_upstream(node_uuid) -> set:
+            # a node waits for all nodes it depends on, even if they are connected
+            #  through nodes that are not run.
+            upstream = set()
+            for predecessor in self.graph.predecessors(node_uuid):
+                if predecessor in nodes:
+                    upstream.add(predecessor)
+                else:
+                    upstream |= _get_upstream(predecessor)
+            return upstream
+
+        pending = {node_uuid: _get_upstream(node_uuid) for node_uuid in nodes}
+        running = {}
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+            while pending or running:
+                for node_uuid in [x for x, deps in pending.items() if not deps]:
+                    del pending[node_uuid]
+                    running[executor.submit(_run, nodes[node_uuid])] = node_uuid
+                done, _ = concurrent.futures.wait(
+                    running, return_when=concurrent.futures.FIRST_COMPLETED
+                )
+                for future in done:
+                    node_uuid = running.pop(future)
+                    _finish(future.result())
+                    for deps in pending.values():
+                        deps.discard(node_uuid)
+
     def build(self, **kwargs) -> None:
         """Build the project graph without running it."""
         self.run(repro=False, **kwargs)
 
-    def repro(self) -> None:
-        """Run dvc repro."""
-        run_dvc_cmd(["repro"])
+    def repro(self, jobs: int = 1) -> None:
+        """Run dvc repro.
+
+        Parameters
+        ----------
+        jobs : int, default = 1
+            The number of stages that are reproduced concurrently.
+            If larger than one, the stage commands are scheduled by ZnTrack
+            instead of 'dvc repro', using the dependencies of the 'dvc.yaml'
+            and the connections of the project graph. In this case, the run-cache
+            is lost: outputs are never restored from it and runs are not added to it.
+        """
+        if jobs == 1:
+            run_dvc_cmd(["repro"])
+            return
+
+        from zntrack.utils import scheduler
+
+        upstream = {}
+        for node_uuid in self.graph.nodes:
+            node = self.graph.nodes[node_uuid]["value"]
+            if node._external_:
+                continue
+            upstream[node.name] = {
+                self.graph.nodes[x]["value"].name
+                for x in self.graph.predecessors(node_uuid)
+            }
+        scheduler.repro(jobs=jobs, upstream=upstream)
         # TODO load nodes afterwards!
 
+    def status(self, nodes: list = None) -> dict[str, NodeStatusResults]:
+        """Get the status of the nodes without running 'dvc status'.
+
+        The 'dvc.lock' is compared to the current parameters and the hashes of
+        the dependencies and outputs. Hashes are cached by size, modification
+        time and inode of each file, so unchanged files are not read again.
+
+        Parameters
+        ----------
+        nodes : list[str], optional
+            The names of the nodes. Defaults to all nodes of the project graph
+            and all stages in the 'dvc.yaml'.
+
+        Returns
+        -------
+        dict[str, NodeStatusResults]
+            'PENDING' for every node that needs to be run, 'AVAILABLE' otherwise.
+        """
+        from zntrack.utils.status import get_status
+
+        if nodes is not None:
+            return get_status(nodes)
+        results = get_status()
+        for node_uuid in self.graph.nodes:
+            node = self.graph.nodes[node_uuid]["value"]
+            if not node._external_:
+                results.setdefault(node.name, NodeStatusResults.PENDING)
+        return results
+
+    def _get_node_hashes(self) -> dict[str, str]:
+        """Get the stored hashes of all nodes that are part of the project.
+
+        Nodes that are missing from 'dvc.yaml' or 'zntrack.json' are not included,
+        e.g. because they were removed, so they are added again. The same applies
+        to nodes whose entries in the config files changed since they were added.
+        """
+        try:
+            node_hashes = file_io.read_file(config.files.hashes)
+            stages = (file_io.read_file(config.files.dvc) or {}).get("stages", {})
+            zntrack_config = file_io.read_file(config.files.zntrack)
+        except FileNotFoundError:
+            return {}
+        return {
+            name: entry["node"]
+            for name, entry in node_hashes.items()
+            if isinstance(entry, dict)
+            and name in stages
+            and name in zntrack_config
+            and entry.get("config") == get_node_config_hash(name)
+        }
+
     def _handle_environment(self, environment: dict):
         """Write global environment variables to the env.yaml file."""
         if environment is not None:
-            file = pathlib.Path("env.yaml")
             try:
-                context = yaml.safe_load(file.read_text())
+                context = file_io.read_file(config.files.env)
             except FileNotFoundError:
                 context = {}
 
             context["global"] = environment
-            file.write_text(yaml.safe_dump(context))
+            file_io.write_file(config.files.env, value=context)
 
     def load(self):
         """Load all nodes in the project."""
@@ -371,7 +640,7 @@ class Project:
 
         exp = Experiment(name, project=self)
 
-        repo = git.Repo()
+        repo = _get_git_repo()
         dirty = repo.is_dirty()
         if dirty:
             repo.git.stash("save", "--include-untracked")
@@ -380,7 +649,7 @@ class Project:
         self.force = True
         with self:
             yield exp
-        self.run(repro=False)  # save nodes and update dvc.yaml
+        self.run(repro=False, skip_unchanged=False)  # save nodes and update dvc.yaml
         self.force = force
 
         cmd = ["dvc", "exp", "run"]
@@ -403,6 +672,8 @@ class Project:
     @property
     def experiments(self, *args, **kwargs) -> dict[str, Experiment]:
         """List all experiments."""
+        import dvc.api
+
         experiments = dvc.api.exp_show(*args, **kwargs)
         return {
             experiment["Experiment"]: Experiment(experiment["rev"], project=self)
@@ -417,7 +688,7 @@ class Project:
     @property
     def branches(self):
         """Get the branches in the project."""
-        repo = git.Repo()  # todo should be self.repo
+        repo = _get_git_repo()  # todo should be self.repo
         return [Branch(project=self, name=branch.name) for branch in repo.branches]
 
 
@@ -437,12 +708,20 @@ class Experiment:
         """Apply the experiment."""
         run_dvc_cmd(["exp", "apply", self.name])
 
-    def load(self) -> None:
-        """Load the nodes from this experiment."""
-        self.nodes = {
-            name: node.from_rev(name=name, rev=self.name)
-            for name, node in self.project.get_nodes().items()
-        }
+    def load(self, max_workers: int = 1) -> None:
+        """Load the nodes from this experiment.
+
+        Parameters
+        ----------
+        max_workers : int, default = 1
+            The number of threads used to load the nodes.
+        """
+        self.nodes = load_nodes(
+            self.project.get_nodes().values(),
+            remote=None,
+            rev=self.name,
+            max_workers=max_workers,
+        )
 
     def __getitem__(self, key: typing.Union[str, Node]) -> Node:
         """Get the Node from the experiment."""
@@ -459,7 +738,9 @@ class Branch:
 
     project: Project
     name: str
-    repo: git.Repo = dataclasses.field(init=False, repr=False, default_factory=git.Repo)
+    repo: git.Repo = dataclasses.field(
+        init=False, repr=False, default_factory=_get_git_repo
+    )
 
     def create(self):
         """Create the branch."""
@@ -7,7 +7,6 @@ This includes decorators to time method runtimes.
 import functools
 from time import time
 
-import numpy as np
 import zninit
 
 from zntrack.fields import Field
@@ -40,6 +39,8 @@ def timeit(field: str):
                 # TODO: hotfix, field_data is LazyOption here!
                 field_data = {}
             if func.__name__ in field_data:
+                import numpy as np
+
                 value = field_data[func.__name__]
                 if not isinstance(value, dict):
                     value = {"values": [value], "mean": value, "std": 0.0}
@@ -2,7 +2,6 @@
 
 import dataclasses
 import enum
-import json
 import logging
 import os
 import pathlib
@@ -11,11 +10,9 @@ import sys
 import tempfile
 import typing as t
 
-import dvc.cli
 import znflow
-import znjson
 
-from zntrack.utils import cli
+from zntrack.utils import cli, file_io, filesystem, magic_names
 from zntrack.utils.config import DISABLE_TMP_PATH, config
 
 __all__ = [
@@ -126,6 +123,15 @@ def run_dvc_cmd(script, stdout=None):
         script = [x for x in script if x != "--quiet"]
         script = script[:2] + ["--verbose", "--verbose"] + script[2:]
 
+    session = file_io.get_config_session()
+    if session is not None:
+        # DVC commands that run while building the graph only read and
+        # modify the 'dvc.yaml', the other config files stay in memory.
+        session.flush(config.files.dvc)
+        session.discard(config.files.dvc)
+
+    import dvc.cli
+
     return_code = dvc.cli.main(script)
     if return_code != 0:
         raise DVCProcessError(
@@ -230,6 +236,16 @@ class NodeName:
     varname: str = None
     suffix: int = 0
     use_varname: bool = False
+    location: magic_names.SourceLocation = None
+
+    def resolve_varname(self) -> None:
+        """Resolve the variable name from the location where the node was created.
+
+        If the variable name can not be resolved, the name is used instead.
+        """
+        if self.varname is None and self.location is not None:
+            self.varname = magic_names.resolve(self.location) or self.name
+            self.location = None
 
     def __str__(self) -> str:
         """Get the node name."""
@@ -237,6 +253,7 @@ class NodeName:
         if self.groups is not None:
             name.extend(self.groups)
         if self.use_varname:
+            self.resolve_varname()
             name.append(self.varname)
         else:
             name.append(self.name)
@@ -248,25 +265,28 @@ class NodeName:
 
     def get_name_without_groups(self) -> str:
         """Get the node name without the groups."""
+        if self.use_varname:
+            self.resolve_varname()
         name = self.varname if self.use_varname else self.name
         if self.suffix > 0:
             name += f"_{self.suffix}"
         return name
 
     def update_suffix(self, project: "Project", node: "Node") -> None:
-        """Update the suffix."""
-        node_names = [x["value"].name for x in project.graph.nodes.values()]
-        self.use_varname = project.magic_names
+        """Update the suffix.
 
-        node_names = []
-        for node_uuid in project.graph.nodes:
-            if node_uuid == node.uuid:
-                continue
-            node_names.append(project.graph.nodes[node_uuid]["value"].name)
+        The name index of the project graph is used to find the next free suffix.
+        """
+        self.use_varname = project.magic_names
+        if not project.automatic_node_names:
+            return
 
-        if project.automatic_node_names:
-            while str(self) in node_names:
-                self.suffix += 1
+        graph = project.graph
+        if not graph.is_name_taken(str(self), node):
+            return
+        self.suffix = max(self.suffix + 1, graph.get_next_suffix(self))
+        while graph.is_name_taken(str(self), node):
+            self.suffix += 1
 
 
 def get_nwd(node: "Node", mkdir: bool = False) -> pathlib.Path:
@@ -290,10 +310,11 @@ def get_nwd(node: "Node", mkdir: bool = False) -> pathlib.Path:
             nwd = pathlib.Path("nodes", znflow.get_attribute(node, "name"))
         else:
             try:
-                with node.state.fs.open(config.files.zntrack) as f:
-                    zntrack_config = json.load(f)
+                zntrack_config = filesystem.read_file(
+                    config.files.zntrack, node.state.remote, node.state.rev
+                )
                 nwd = zntrack_config[znflow.get_attribute(node, "name")]["nwd"]
-                nwd = json.loads(json.dumps(nwd), cls=znjson.ZnDecoder)
+                nwd = file_io.decode(nwd)
             except (FileNotFoundError, KeyError):
                 nwd = pathlib.Path("nodes", znflow.get_attribute(node, "name"))
 
@@ -6,8 +6,7 @@ import pathlib
 import subprocess
 import urllib.request
 
-import typer
-from dvc.api import DVCFileSystem
+from zntrack.utils.filesystem import get_fs
 
 
 @dataclasses.dataclass
@@ -25,6 +24,8 @@ class Initializer:
 
     def run(self):
         """Run the initializer."""
+        import typer
+
         self.check_empty()
         typer.echo(f"Creating new project: {self.name}")
         self.make_src()
@@ -41,6 +42,8 @@ class Initializer:
         ------
         typer.Exit: if the directory is not empty and force is false
         """
+        import typer
+
         is_empty = not any(pathlib.Path(".").iterdir())
         if not is_empty and not self.force:
             typer.echo(
@@ -93,7 +96,7 @@ def get_groups(remote, rev) -> (dict, list):
     node_names: list
         A list of all node names in the project.
     """
-    fs = DVCFileSystem(url=remote, rev=rev)
+    fs = get_fs(remote, rev)
     with fs.open("zntrack.json") as f:
         config = json.load(f)
 
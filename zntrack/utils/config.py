@@ -20,6 +20,8 @@ class Files:
     zntrack: Path = Path("zntrack.json")
     params: Path = Path("params.yaml")
     dvc: Path = Path("dvc.yaml")
+    env: Path = Path("env.yaml")
+    hashes: Path = Path("zntrack.hashes.json")
 
 
 @dataclasses.dataclass
@@ -55,6 +57,20 @@ class Config:
         Use the `dvc.cli.main` function instead of subprocess
     disable_operating_directory: bool, default = False
         Global config to disable operating directory context manager.
+    result_cache: bool, default = False
+        Cache results of Nodes that are loaded from a git revision on disk and reuse
+        them in other processes, see 'zntrack.utils.result_cache'.
+    result_cache_size: int, default = 2 GiB
+        The maximum size of the result cache in bytes.
+    json_indent: int|None, default = 4
+        The indentation of 'zntrack.outs' and 'zntrack.metrics' json files.
+        Use None to write large outputs without pretty-printing.
+    json_backend: str, default = "auto"
+        The library to parse and serialize json files with, see 'zntrack.utils.file_io'.
+        "auto" reads files with 'orjson' if it is installed and writes them with 'json'.
+        "orjson" also writes files with 'orjson' if 'json_indent' is None or 2.
+        Note, that 'orjson' writes NaN and infinite floats as null.
+        "json" only uses the 'json' standard library.
     """
 
     nb_name: str = None
@@ -64,6 +80,10 @@ class Config:
     interpreter: typing.Union[str, Path] = Path(sys.executable).name
     dvc_api: bool = True
     disable_operating_directory: bool = False
+    result_cache: bool = False
+    result_cache_size: int = 2 * 1024**3
+    json_indent: typing.Optional[int] = 4
+    json_backend: str = "auto"
     files: Files = dataclasses.field(default_factory=Files)
     _log_level: int = dataclasses.field(default=logging.INFO, init=False, repr=True)
 
@@ -1,19 +1,381 @@
 """ZnTrack file I/O."""
 
+import contextlib
+import dataclasses
+import functools
 import json
 import logging
+import math
+import os
 import pathlib
+import shutil
+import tempfile
+import threading
 import typing
 
 import yaml
 import znjson
 
+from zntrack.utils.config import config
+
 log = logging.getLogger(__name__)
 
 
+@dataclasses.dataclass
+class ConfigSession:
+    """In-memory view of the ZnTrack configuration files.
+
+    While a session is active, 'read_file' and 'write_file' operate on
+    the in-memory content of the tracked files. Each file is read at most
+    once and written at most once, when the session is flushed.
+
+    Attributes
+    ----------
+    files : set[pathlib.Path]
+        The files that are handled by this session.
+    """
+
+    files: typing.Set[pathlib.Path]
+    _content: dict = dataclasses.field(default_factory=dict, init=False, repr=False)
+    _modified: set = dataclasses.field(default_factory=set, init=False, repr=False)
+    _lock: threading.RLock = dataclasses.field(
+        default_factory=threading.RLock, init=False, repr=False
+    )
+
+    def __contains__(self, file: typing.Union[str, pathlib.Path]) -> bool:
+        """Check if the file is handled by this session."""
+        return pathlib.Path(file) in self.files
+
+    def read(self, file: pathlib.Path) -> dict:
+        """Get the content of the file, reading it from disk only once.
+
+        Raises
+        ------
+        FileNotFoundError: if the file neither exists in memory nor on disk.
+        """
+        file = pathlib.Path(file)
+        with self._lock:
+            if file not in self._content:
+                self._content[file] = _read_file(file)
+            return self._content[file]
+
+    def write(self, file: pathlib.Path, value: dict):
+        """Update the in-memory content of the file."""
+        file = pathlib.Path(file)
+        with self._lock:
+            self._content[file] = value
+            self._modified.add(file)
+
+    def exists(self, file: pathlib.Path) -> bool:
+        """Check if the file exists either in memory or on disk."""
+        file = pathlib.Path(file)
+        with self._lock:
+            return file in self._content or file.exists()
+
+    def flush(self, *files: pathlib.Path):
+        """Write the modified files to disk.
+
+        Parameters
+        ----------
+        files: pathlib.Path, optional
+            The files to write. If not given, all modified files are written.
+        """
+        files = [pathlib.Path(x) for x in files] if files else list(self.files)
+        with self._lock:
+            for file in files:
+                if file in self._modified:
+                    _write_file(file, self._content[file], atomic=True)
+                    self._modified.remove(file)
+
+    def discard(self, *files: pathlib.Path):
+        """Drop the in-memory content, e.g. because it was modified externally.
+
+        Parameters
+        ----------
+        files: pathlib.Path, optional
+            The files to discard. If not given, all files are discarded.
+        """
+        files = [pathlib.Path(x) for x in files] if files else list(self.files)
+        with self._lock:
+            for file in files:
+                self._content.pop(file, None)
+                self._modified.discard(file)
+
+
+_session: typing.Optional[ConfigSession] = None
+
+
+def get_config_session() -> typing.Optional[ConfigSession]:
+    """Get the active config session or None."""
+    return _session
+
+
+@contextlib.contextmanager
+def config_session() -> typing.ContextManager[ConfigSession]:
+    """Batch all config file updates and write them once at the end.
+
+    The session holds 'zntrack.json', 'params.yaml', 'env.yaml', 'dvc.yaml'
+    and 'zntrack.hashes.json' in memory. If the context is left without an exception,
+    every modified file is written exactly once. Otherwise, all changes are discarded.
+    Nested sessions reuse the outer session.
+    """
+    global _session
+
+    if _session is not None:
+        yield _session
+        return
+
+    _session = ConfigSession(files=_get_session_files())
+    try:
+        yield _session
+        _session.flush()
+    finally:
+        _session.discard()
+        _session = None
+
+
+def _get_session_files() -> typing.Set[pathlib.Path]:
+    """Get the files that are handled by a config session."""
+    files = config.files
+    return {files.zntrack, files.params, files.env, files.dvc, files.hashes}
+
+
+@functools.lru_cache(maxsize=1)
+def _get_orjson():
+    """Get the 'orjson' module, if it is installed."""
+    try:
+        import orjson
+    except ImportError:
+        return None
+    return orjson
+
+
+def _use_orjson(write: bool) -> bool:
+    """Check if the json backend of the config uses 'orjson'."""
+    if config.json_backend not in ("auto", "orjson", "json"):
+        raise ValueError(
+            f"Unknown json backend '{config.json_backend}'. Use 'auto', 'orjson' or"
+            " 'json'."
+        )
+    if config.json_backend == "json" or (write and config.json_backend == "auto"):
+        return False
+    return _get_orjson() is not None
+
+
+def _encode_key(key) -> str:
+    """Convert a dict key the same way 'json.dumps' does."""
+    if isinstance(key, str):
+        return str(key)
+    if isinstance(key, float):
+        if math.isnan(key):
+            return "NaN"
+        if math.isinf(key):
+            return "Infinity" if key > 0 else "-Infinity"
+        return float.__repr__(key)
+    if key is True:
+        return "true"
+    if key is False:
+        return "false"
+    if key is None:
+        return "null"
+    if isinstance(key, int):
+        return int.__repr__(key)
+    raise TypeError(
+        f"keys must be str, int, float, bool or None, not {type(key).__name__}"
+    )
+
+
+def encode(
+    value, encoder: typing.Optional[typing.Type[json.JSONEncoder]] = znjson.ZnEncoder
+):
+    """Convert the value into json data, applying the znjson converters.
+
+    This is equivalent to 'json.loads(json.dumps(value, cls=encoder))',
+    without serializing the value to a string.
+
+    Parameters
+    ----------
+    value: any
+        The value to encode.
+    encoder: json.JSONEncoder, default = znjson.ZnEncoder
+        The encoder, whose 'default' method converts values that are not json data.
+        Use None for plain json.
+
+    Raises
+    ------
+    TypeError: if the value can not be converted.
+    ValueError: if the value contains a circular reference.
+    """
+    default = (encoder or json.JSONEncoder)().default
+    containers = set()
+
+    def _encode(obj):
+        if obj is None or obj is True or obj is False:
+            return obj
+        if isinstance(obj, str):
+            return str(obj)
+        if isinstance(obj, int):
+            return int(obj)
+        if isinstance(obj, float):
+            return float(obj)
+
+        if id(obj) in containers:
+            raise ValueError("Circular reference detected")
+        containers.add(id(obj))
+        try:
+            if isinstance(obj, (list, tuple)):
+                return [_encode(x) for x in obj]
+            if isinstance(obj, dict):
+                return {_encode_key(key): _encode(val) for key, val in obj.items()}
+            return _encode(default(obj))
+        finally:
+            containers.discard(id(obj))
+
+    return _encode(value)
+
+
+def decode(value, decoder: typing.Type[json.JSONDecoder] = znjson.ZnDecoder):
+    """Convert json data into Python objects, applying the znjson converters.
+
+    This is equivalent to 'json.loads(json.dumps(value), cls=decoder)',
+    without serializing the value to a string. The returned containers are
+    always new objects, so the value is not modified.
+
+    Parameters
+    ----------
+    value: any
+        The json data, e.g. the content of 'zntrack.json'.
+    decoder: json.JSONDecoder, default = znjson.ZnDecoder
+        The decoder, whose 'object_hook' converts the znjson-typed dicts.
+    """
+    object_hook = decoder().object_hook
+
+    def _decode(obj):
+        if isinstance(obj, dict):
+            return object_hook(
+                {_encode_key(key): _decode(val) for key, val in obj.items()}
+            )
+        if isinstance(obj, (list, tuple)):
+            return [_decode(x) for x in obj]
+        return obj
+
+    return _decode(value)
+
+
+def dumps(
+    value,
+    indent: typing.Optional[int] = None,
+    encoder: typing.Optional[typing.Type[json.JSONEncoder]] = znjson.ZnEncoder,
+) -> str:
+    """Serialize the value to a json string with the backend of the config.
+
+    Parameters
+    ----------
+    value: any
+        The value to serialize.
+    indent: int, optional
+        The indentation. If None, the string is written without pretty-printing.
+    encoder: json.JSONEncoder, default = znjson.ZnEncoder
+        The encoder for values that are not json data. Use None for plain json.
+    """
+    if indent in (None, 2) and _use_orjson(write=True):
+        orjson = _get_orjson()
+        option = orjson.OPT_INDENT_2 if indent == 2 else 0
+        if encoder is not None:
+            # let the znjson converters handle all values that are no json data
+            value = encode(value, encoder)
+        try:
+            return orjson.dumps(value, option=option).decode("utf-8")
+        except orjson.JSONEncodeError as err:
+            # e.g. integers that exceed 64 bit
+            log.debug(f"Unable to serialize with orjson: {err}")
+    separators = None if indent is not None else (",", ":")
+    return json.dumps(value, indent=indent, cls=encoder, separators=separators)
+
+
+def loads(
+    content: typing.Union[str, bytes],
+    decoder: typing.Optional[typing.Type[json.JSONDecoder]] = znjson.ZnDecoder,
+):
+    """Parse the json string with the backend of the config.
+
+    Parameters
+    ----------
+    content: str|bytes
+        The json string.
+    decoder: json.JSONDecoder, default = znjson.ZnDecoder
+        The decoder for znjson-typed dicts. Use None for plain json.
+    """
+    if _use_orjson(write=False):
+        orjson = _get_orjson()
+        try:
+            value = orjson.loads(content)
+        except orjson.JSONDecodeError as err:
+            # e.g. NaN, which is not part of the json specification
+            log.debug(f"Unable to parse with orjson: {err}")
+        else:
+            return value if decoder is None else decode(value, decoder)
+    return json.loads(content, cls=decoder)
+
+
+def parse_content(file: typing.Union[str, pathlib.Path], content: str) -> dict:
+    """Parse the content of a json/yaml file based on the file suffix.
+
+    Raises
+    ------
+    ValueError: if the file type is not supported
+    """
+    suffix = pathlib.Path(file).suffix
+    if suffix in [".yaml", ".yml"]:
+        return yaml.safe_load(content)
+    elif suffix == ".json":
+        return loads(content, decoder=None)
+    raise ValueError(f"File with suffix {suffix} is not supported")
+
+
+def _read_file(file: pathlib.Path) -> dict:
+    """Read a json/yaml file from disk."""
+    if file.suffix not in [".yaml", ".yml", ".json"]:
+        raise ValueError(f"File with suffix {file.suffix} is not supported")
+    return parse_content(file, file.read_text())
+
+
+def _write_file(file: pathlib.Path, value: dict, atomic: bool = False):
+    """Write a json/yaml file to disk.
+
+    If 'atomic' is set, the content is written to a temporary file
+    first, which then replaces the original file.
+    """
+    if file.suffix in [".yaml", ".yml"]:
+        content = yaml.safe_dump(value, indent=4)
+    elif file.suffix == ".json":
+        content = dumps(value, indent=4)
+    else:
+        raise ValueError(f"File with suffix {file.suffix} is not supported")
+
+    if not atomic:
+        file.write_text(content)
+        return
+
+    fd, tmp_file = tempfile.mkstemp(dir=file.parent, prefix=f".{file.name}.")
+    try:
+        with os.fdopen(fd, "w") as f:
+            f.write(content)
+        if file.exists():
+            shutil.copymode(file, tmp_file)
+        else:
+            os.chmod(tmp_file, 0o644)
+        os.replace(tmp_file, file)
+    except BaseException:
+        pathlib.Path(tmp_file).unlink(missing_ok=True)
+        raise
+
+
 def read_file(file: pathlib.Path) -> dict:
     """Read a json/yaml file without the znjson.Decoder.
 
+    If a config session is active, the content of the session is used.
+
     Parameters
     ----------
     file: pathlib.Path
@@ -29,19 +391,17 @@ def read_file(file: pathlib.Path) -> dict:
     dict:
         Content of the json/yaml file
     """
-    if file.suffix in [".yaml", ".yml"]:
-        file_content = yaml.safe_load(file.read_text())
-    elif file.suffix == ".json":
-        file_content = json.loads(file.read_text())
-    else:
-        raise ValueError(f"File with suffix {file.suffix} is not supported")
-    return file_content
+    file = pathlib.Path(file)
+    if _session is not None and file in _session:
+        return _session.read(file)
+    return _read_file(file)
 
 
 def write_file(file: pathlib.Path, value: dict, mkdir: bool = True):
     """Save dict to file.
 
-    Store dictionary to json or yaml file
+    Store dictionary to json or yaml file. If a config session is active,
+    the file is only written when the session is flushed.
 
     Parameters
     ----------
@@ -52,15 +412,22 @@ def write_file(file: pathlib.Path, value: dict, mkdir: bool = True):
     mkdir: bool
         Create a parent directory if necessary
     """
+    file = pathlib.Path(file)
+    if _session is not None and file in _session:
+        _session.write(file, value)
+        return
+
     if mkdir:
         file.parent.mkdir(exist_ok=True, parents=True)
 
-    if file.suffix in [".yaml", ".yml"]:
-        file.write_text(yaml.safe_dump(value, indent=4))
-    elif file.suffix == ".json":
-        file.write_text(json.dumps(value, indent=4, cls=znjson.ZnEncoder))
-    else:
-        raise ValueError(f"File with suffix {file.suffix} is not supported")
+    _write_file(file, value)
+
+
+def file_exists(file: pathlib.Path) -> bool:
+    """Check if the file exists, including files of the active config session."""
+    if _session is not None and file in _session:
+        return _session.exists(file)
+    return pathlib.Path(file).exists()
 
 
 def clear_config_file(file: typing.Union[pathlib.Path, str], node_name: str):
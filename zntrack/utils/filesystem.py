@@ -0,0 +1,379 @@
+"""A process wide pool of 'dvc.api.DVCFileSystem' instances.
+
+Creating a 'DVCFileSystem' opens or even clones the repository.
+All parts of ZnTrack that read from a '(remote, rev)' share one instance.
+The parsed content of the configuration files is cached as well.
+"""
+
+import atexit
+import collections
+import dataclasses
+import logging
+import pathlib
+import re
+import threading
+import time
+import typing
+
+from zntrack.utils import file_io
+
+if typing.TYPE_CHECKING:
+    import dvc.api
+
+log = logging.getLogger(__name__)
+
+# If these files of a local repository change, a new file system is created
+#  to avoid reading an outdated index. The stages of the workspace are defined
+#  by the 'dvc.yaml' and 'dvc.lock'.
+_WORKSPACE_FILES = ("dvc.yaml", "dvc.lock")
+_SHA_PATTERN = re.compile(r"[0-9a-f]{40}")
+# files modified within this window might be modified again with the same
+#  modification time on file systems with a coarse timestamp resolution.
+_RACY_WINDOW_NS = 2 * 10**9
+
+
+def _get_stamp(path: pathlib.Path, files: typing.Iterable[str]) -> tuple:
+    """Get the modification time, size, inode and change time of the files.
+
+    The inode changes if a file is replaced, e.g. by an atomic write.
+    """
+    stamp = []
+    for file in files:
+        try:
+            stat = (path / file).stat()
+        except FileNotFoundError:
+            stamp.append(None)
+        else:
+            stamp.append((stat.st_mtime_ns, stat.st_size, stat.st_ino, stat.st_ctime_ns))
+    return tuple(stamp)
+
+
+def _is_racy(stamp: tuple) -> bool:
+    """Check if any of the files was modified too recently to trust the stamp."""
+    now = time.time_ns()
+    return any(x is not None and now - x[0] < _RACY_WINDOW_NS for x in stamp)
+
+
+def resolve_rev(
+    remote: typing.Optional[str], rev: typing.Optional[str]
+) -> typing.Optional[str]:
+    """Resolve the revision of the repository to a full commit sha.
+
+    Local repositories are resolved with 'git', other remotes with 'git ls-remote',
+    which only resolves branches, tags and 'HEAD'.
+
+    Parameters
+    ----------
+    remote : str, default = None
+        The url or path of the repository. Defaults to the current directory.
+    rev : str, default = None
+        The git revision. Defaults to 'HEAD'.
+
+    Returns
+    -------
+    str|None
+        The commit sha or None, if the revision can not be resolved.
+    """
+    if rev is not None and _SHA_PATTERN.fullmatch(rev):
+        return rev
+    import git
+    import gitdb.exc
+
+    path = pathlib.Path(remote or ".")
+    try:
+        if path.exists():
+            repo = git.Repo(path, search_parent_directories=True)
+            return repo.commit(rev or "HEAD").hexsha
+        output = git.cmd.Git().ls_remote(remote, rev or "HEAD")
+    except (git.GitError, gitdb.exc.ODBError, ValueError) as err:
+        log.debug(f"Unable to resolve revision '{rev}' of '{remote}': {err}")
+        return None
+    refs = dict(reversed(line.split("\t")) for line in output.splitlines())
+    for ref in (
+        "HEAD" if rev is None else rev,
+        f"refs/heads/{rev}",
+        f"refs/tags/{rev}^{{}}",
+        f"refs/tags/{rev}",
+    ):
+        if ref in refs:
+            return refs[ref]
+    return None
+
+
+def _get_key(
+    remote: typing.Optional[str], rev: typing.Optional[str]
+) -> typing.Optional[tuple]:
+    """Get the pool key for the given remote and revision.
+
+    The workspace of a local repository is identified by its absolute path and
+    the modification time of the files that define the stages. Revisions are
+    identified by the repository and their commit sha, so a moving revision,
+    e.g. a branch, gets a new key once it points to another commit.
+
+    Returns
+    -------
+    tuple|None
+        The key or None, if the revision can not be resolved to a commit.
+    """
+    path = pathlib.Path(remote or ".")
+    if path.exists():
+        path = path.resolve()
+        if rev is None:
+            return path.as_posix(), None, _get_stamp(path, _WORKSPACE_FILES)
+        remote = path.as_posix()
+    sha = resolve_rev(remote, rev)
+    if sha is None:
+        return None
+    return remote, sha, None
+
+
+@dataclasses.dataclass
+class FileSystemPool:
+    """Least recently used pool of 'DVCFileSystem' instances.
+
+    File systems of revisions that can not be resolved to a commit are not pooled.
+    A file system that is removed from the pool, because it is outdated or was not
+    used recently, is only closed after 'maxsize' further removals or when the
+    pool is closed, because other threads might still read from it.
+
+    Attributes
+    ----------
+    maxsize : int
+        The maximum number of pooled file systems. If exceeded,
+        the least recently used file system is removed from the pool.
+    """
+
+    maxsize: int = 16
+    _pool: collections.OrderedDict = dataclasses.field(
+        default_factory=collections.OrderedDict, init=False, repr=False
+    )
+    # file systems removed from the pool that are not closed yet.
+    _retired: collections.deque = dataclasses.field(
+        default_factory=collections.deque, init=False, repr=False
+    )
+    _lock: threading.RLock = dataclasses.field(
+        default_factory=threading.RLock, init=False, repr=False
+    )
+
+    def __len__(self) -> int:
+        """Get the number of open file systems."""
+        return len(self._pool)
+
+    def get(self, remote: str = None, rev: str = None) -> "dvc.api.DVCFileSystem":
+        """Get the file system for the remote and revision, creating it if necessary.
+
+        Parameters
+        ----------
+        remote : str, default = None
+            The url or path of the repository. Defaults to the current directory.
+        rev : str, default = None
+            The git revision. Defaults to the workspace.
+        """
+        key = _get_key(remote, rev)
+        if key is None:
+            log.debug(f"Not pooling the file system of '{remote}' at '{rev}'")
+            return self._create(remote, rev)
+        with self._lock:
+            if key in self._pool:
+                self._pool.move_to_end(key)
+                return self._pool[key]
+
+            # an outdated file system of the same workspace is no longer needed.
+            for old_key in [x for x in self._pool if x[:2] == key[:2]]:
+                self._retire(old_key)
+
+            # the resolved commit, in case the revision moves during its lifetime.
+            fs = self._create(remote, rev if key[1] is None else key[1])
+            self._pool[key] = fs
+            while len(self._pool) > self.maxsize:
+                self._retire(next(iter(self._pool)))
+            return fs
+
+    def close(self, remote: str = None, rev: str = None) -> None:
+        """Close the file system for the remote and revision, if it is open."""
+        key = _get_key(remote, rev)
+        if key is None:
+            return
+        with self._lock:
+            for old_key in [x for x in self._pool if x[:2] == key[:2]]:
+                self._close(old_key)
+
+    def close_all(self) -> None:
+        """Close all file systems, including outdated ones."""
+        with self._lock:
+            for key in list(self._pool):
+                self._close(key)
+            while self._retired:
+                self._close_fs(*self._retired.popleft())
+
+    def _retire(self, key: tuple) -> None:
+        """Remove the file system from the pool and close it later."""
+        self._retired.append((key, self._pool.pop(key)))
+        while len(self._retired) > self.maxsize:
+            self._close_fs(*self._retired.popleft())
+
+    def _close(self, key: tuple) -> None:
+        """Remove the file system from the pool and close it."""
+        self._close_fs(key, self._pool.pop(key))
+
+    @staticmethod
+    def _close_fs(key: tuple, fs: "dvc.api.DVCFileSystem") -> None:
+        """Close the file system."""
+        log.debug(f"Closing file system for {key}")
+        try:
+            fs.close()
+        except Exception as err:  # noqa: BLE001
+            log.debug(f"Unable to close file system for {key}: {err}")
+
+    @staticmethod
+    def _create(remote: str, rev: str) -> "dvc.api.DVCFileSystem":
+        """Create a new file system.
+
+        Retry if the 'dvc.yaml' is invalid, because it might be written concurrently.
+        """
+        import dvc.api
+        import dvc.utils.strictyaml
+
+        for _ in range(10):
+            try:
+                return dvc.api.DVCFileSystem(url=remote, rev=rev)
+            except dvc.utils.strictyaml.YAMLValidationError as err:
+                log.debug(err)
+                time.sleep(0.1)
+        raise dvc.utils.strictyaml.YAMLValidationError
+
+
+pool = FileSystemPool()
+atexit.register(pool.close_all)
+
+
+def get_fs(remote: str = None, rev: str = None) -> "dvc.api.DVCFileSystem":
+    """Get the shared file system for the remote and revision."""
+    return pool.get(remote, rev)
+
+
+def get_local_path(
+    path, remote: str = None, rev: str = None
+) -> typing.Optional[pathlib.Path]:
+    """Get a local file with the content of the path at the remote and revision.
+
+    For the workspace, this is the file itself. For a revision of a local
+    repository, this is the file in the local DVC cache, if it is available.
+
+    Returns
+    -------
+    pathlib.Path|None
+        The local file or None, if the file is not available locally.
+        The file must not be modified.
+    """
+    repo_path = pathlib.Path(remote or ".")
+    if not repo_path.exists():
+        return None
+    if rev is None:
+        local_path = repo_path / path
+        return local_path if local_path.is_file() else None
+
+    fs = get_fs(remote, rev)
+    try:
+        info = fs.info(pathlib.PurePath(path).as_posix())
+    except FileNotFoundError:
+        return None
+    return get_cache_path(fs, info)
+
+
+def get_cache_path(
+    fs: "dvc.api.DVCFileSystem", info: dict
+) -> typing.Optional[pathlib.Path]:
+    """Get the file in the local DVC cache for the 'fs.info' of a file.
+
+    Returns
+    -------
+    pathlib.Path|None
+        The file in the cache or None, if the file is not tracked by DVC
+        or the object is not in the local cache. The file must not be modified.
+    """
+    try:
+        md5 = info["dvc_info"]["md5"]
+    except KeyError:
+        return None
+    if md5.endswith(".dir"):
+        return None
+    local_path = pathlib.Path(fs.repo.cache.local.oid_to_path(md5))
+    return local_path if local_path.is_file() else None
+
+
+@dataclasses.dataclass
+class ContentCache:
+    """Least recently used cache of parsed json/yaml files.
+
+    Entries are keyed by the file system, the path and, for a workspace,
+    the modification time, size, inode and change time of the file.
+    Workspace files that were modified within the last seconds are not
+    cached, because a second modification might not change the stamp.
+    Entries for a revision are keyed by its resolved commit, so a file is
+    parsed again once a branch moves. Files of revisions that can not be
+    resolved to a commit are not cached.
+
+    Attributes
+    ----------
+    maxsize : int
+        The maximum number of cached files.
+    """
+
+    maxsize: int = 128
+    _cache: collections.OrderedDict = dataclasses.field(
+        default_factory=collections.OrderedDict, init=False, repr=False
+    )
+    _lock: threading.RLock = dataclasses.field(
+        default_factory=threading.RLock, init=False, repr=False
+    )
+
+    def read(self, path, remote: str = None, rev: str = None) -> dict:
+        """Read and parse the file from the file system of the remote and revision.
+
+        The returned content is shared and must not be modified.
+
+        Raises
+        ------
+        FileNotFoundError: if the file does not exist.
+        ValueError: if the file type is not supported.
+        """
+        path = pathlib.PurePath(path).as_posix()
+        fs_key = _get_key(remote, rev)
+        if fs_key is None:
+            return file_io.parse_content(path, get_fs(remote, rev).read_text(path))
+        stamp = None
+        if fs_key[2] is not None:
+            stamp = _get_stamp(pathlib.Path(fs_key[0]), [path])
+        key = (fs_key, path, stamp)
+
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+
+        content = file_io.parse_content(path, get_fs(remote, rev).read_text(path))
+        if stamp is not None and _is_racy(stamp):
+            return content
+        with self._lock:
+            self._cache[key] = content
+            while len(self._cache) > self.maxsize:
+                self._cache.popitem(last=False)
+        return content
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        with self._lock:
+            self._cache.clear()
+
+
+content_cache = ContentCache()
+
+
+def read_file(path, remote: str = None, rev: str = None) -> dict:
+    """Read a json/yaml file from the file system of the remote and revision.
+
+    The file is only parsed again, if it changed. The returned content
+    is shared and must not be modified.
+    """
+    return content_cache.read(path, remote, rev)
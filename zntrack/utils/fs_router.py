@@ -0,0 +1,241 @@
+"""Route file access with relative paths to the file system of a Node.
+
+Inside 'route(fs)', relative paths that are opened or listed with 'open',
+'io.open', 'pathlib.Path.open', 'os.listdir' or 'os.scandir' are resolved
+on the given file system instead of the local disk.
+
+The file system is stored in a context variable, so only the thread or task
+that entered 'route' is affected. Inside 'materialize_on_access(materializer)',
+files of lazy directories in a temporary directory of 'use_tmp_path' are
+fetched when they are opened, in all threads. The functions are replaced while at least
+one route is active anywhere in the process. Without an active route in the
+current context, the replacements call the original functions directly.
+"""
+
+import builtins
+import contextlib
+import contextvars
+import io
+import os
+import pathlib
+import sys
+import threading
+import typing
+
+from zntrack.utils.config import config
+
+if typing.TYPE_CHECKING:
+    import fsspec
+
+_ACTIVE: contextvars.ContextVar = contextvars.ContextVar("zntrack_fs_route", default=None)
+_LOCK = threading.Lock()
+_INSTALLED = {"count": 0, "originals": {}}
+# the active materializers of 'NodeStatus.use_tmp_path' in all threads.
+_MATERIALIZERS: list = []
+
+_original_open = builtins.open
+_original_path_open = pathlib.Path.open
+_original_listdir = os.listdir
+_original_scandir = os.scandir
+
+
+def _get_routed_fs(path) -> typing.Optional["fsspec.AbstractFileSystem"]:
+    """Get the file system of the active route, if the path should use it."""
+    get_fs = _ACTIVE.get()
+    if get_fs is None or not isinstance(path, (str, os.PathLike)):
+        return None
+    path = pathlib.Path(path)
+    if path.is_absolute() or path == config.files.params:
+        return None
+    return get_fs()
+
+
+def _prepare(file) -> None:
+    """Fetch the file, if it belongs to a lazy directory of a materializer."""
+    if _MATERIALIZERS and isinstance(file, (str, os.PathLike)):
+        for materializer in list(_MATERIALIZERS):
+            materializer.prepare(file)
+
+
+def _list_materialized(path) -> typing.Optional[typing.Dict[str, str]]:
+    """Get the entries of a lazy directory of a materializer by name."""
+    if _MATERIALIZERS and isinstance(path, (str, os.PathLike)):
+        for materializer in list(_MATERIALIZERS):
+            listing = materializer.list_dir(path)
+            if listing is not None:
+                return listing
+    return None
+
+
+def _fs_open(
+    fs, file, mode="r", buffering=-1, encoding=None, errors=None, newline=None, **kwargs
+):
+    """Open the file on the file system with the arguments of 'open'."""
+    text_kwargs = {"encoding": encoding, "errors": errors, "newline": newline}
+    text_kwargs = {key: val for key, val in text_kwargs.items() if val is not None}
+    return fs.open(pathlib.Path(file).as_posix(), mode=mode, **text_kwargs)
+
+
+def _open(file, *args, **kwargs):
+    """Replacement for 'open' and 'io.open'."""
+    fs = _get_routed_fs(file)
+    if fs is None:
+        _prepare(file)
+        return _original_open(file, *args, **kwargs)
+    return _fs_open(fs, file, *args, **kwargs)
+
+
+def _path_open(self, *args, **kwargs):
+    """Replacement for 'pathlib.Path.open', also used by 'read_text'."""
+    fs = _get_routed_fs(self)
+    if fs is None:
+        _prepare(self)
+        return _original_path_open(self, *args, **kwargs)
+    return _fs_open(fs, self, *args, **kwargs)
+
+
+def _listdir(path=".", *args, **kwargs):
+    """Replacement for 'os.listdir', returning full paths for routed paths."""
+    fs = _get_routed_fs(path)
+    if fs is None:
+        listing = _list_materialized(path)
+        if listing is not None:
+            return list(listing)
+        return _original_listdir(path, *args, **kwargs)
+    return fs.listdir(pathlib.Path(path).as_posix(), detail=False)
+
+
+class _DirEntry:
+    """An 'os.DirEntry' like entry of a file system directory listing."""
+
+    def __init__(self, info: dict):
+        self.path = info["name"]
+        self.name = pathlib.PurePosixPath(self.path).name
+        self._info = info
+
+    def is_dir(self, follow_symlinks: bool = True) -> bool:
+        return self._info["type"] == "directory"
+
+    def is_file(self, follow_symlinks: bool = True) -> bool:
+        return self._info["type"] == "file"
+
+    def is_symlink(self) -> bool:
+        return False
+
+    def __fspath__(self) -> str:
+        return self.path
+
+    def __repr__(self) -> str:
+        return f"<{type(self).__name__} '{self.name}'>"
+
+
+class _ScandirIterator:
+    """An iterator of '_DirEntry' that can be used as a context manager."""
+
+    def __init__(self, entries: typing.List[_DirEntry]):
+        self._entries = iter(entries)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> _DirEntry:
+        return next(self._entries)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._entries = iter(())
+
+
+def _scandir(path="."):
+    """Replacement for 'os.scandir'."""
+    fs = _get_routed_fs(path)
+    if fs is None:
+        listing = _list_materialized(path)
+        if listing is not None:
+            infos = [
+                {"name": os.path.join(path, name), "type": entry_type}
+                for name, entry_type in listing.items()
+            ]
+            return _ScandirIterator([_DirEntry(x) for x in infos])
+        return _original_scandir(path)
+    infos = fs.ls(pathlib.Path(path).as_posix(), detail=True)
+    return _ScandirIterator([_DirEntry(x) for x in infos])
+
+
+def _get_targets() -> typing.List[typing.Tuple[typing.Any, str, typing.Callable]]:
+    """Get the (owner, attribute, replacement) of every routed function."""
+    targets = [
+        (builtins, "open", _open),
+        (io, "open", _open),
+        (os, "listdir", _listdir),
+        (os, "scandir", _scandir),
+        (pathlib.Path, "open", _path_open),
+    ]
+    main = sys.modules.get("__main__")
+    # Jupyter Notebooks replace open with io.open
+    if main is not None and "open" in vars(main):
+        targets.append((main, "open", _open))
+    return targets
+
+
+def _install() -> None:
+    """Replace the functions, if this is the first active route."""
+    with _LOCK:
+        if _INSTALLED["count"] == 0:
+            for owner, name, replacement in _get_targets():
+                _INSTALLED["originals"][(owner, name)] = getattr(owner, name)
+                setattr(owner, name, replacement)
+        _INSTALLED["count"] += 1
+
+
+def _uninstall() -> None:
+    """Restore the functions, if this was the last active route."""
+    with _LOCK:
+        _INSTALLED["count"] -= 1
+        if _INSTALLED["count"] == 0:
+            for (owner, name), original in _INSTALLED["originals"].items():
+                setattr(owner, name, original)
+            _INSTALLED["originals"].clear()
+
+
+@contextlib.contextmanager
+def route(get_fs: typing.Callable[[], "fsspec.AbstractFileSystem"]) -> typing.Iterator:
+    """Resolve relative paths on a file system in the current context.
+
+    Parameters
+    ----------
+    get_fs : callable
+        Returns the file system. It is only called when a relative path is accessed.
+    """
+    token = _ACTIVE.set(get_fs)
+    _install()
+    try:
+        yield
+    finally:
+        _uninstall()
+        _ACTIVE.reset(token)
+
+
+@contextlib.contextmanager
+def materialize_on_access(materializer) -> typing.Iterator:
+    """Fetch files of the lazy directories of the materializer on access.
+
+    Parameters
+    ----------
+    materializer : zntrack.utils.materialize.Materializer
+        The materializer of a 'use_tmp_path' context.
+    """
+    with _LOCK:
+        _MATERIALIZERS.append(materializer)
+    _install()
+    try:
+        yield
+    finally:
+        _uninstall()
+        with _LOCK:
+            _MATERIALIZERS.remove(materializer)
@@ -0,0 +1,232 @@
+"""A persistent index of the md5 hashes of files and directories.
+
+Computing the md5 hash of a file reads its full content. The hash is stored
+together with the size, modification time, inode and change time of the file
+and only computed again if one of them changed, similar to the index of git or
+the state database of DVC. Like git, files that were modified within the last
+seconds are not stored, because a second modification might not change the
+modification time on file systems with a coarse timestamp resolution.
+
+The hash of a directory is computed from the hashes of its files, in the
+same way DVC computes the '.dir' hash. Unchanged directories are verified
+from the file metadata alone, without reading any file.
+"""
+
+import dataclasses
+import hashlib
+import json
+import logging
+import os
+import pathlib
+import sqlite3
+import threading
+import time
+import typing
+
+if typing.TYPE_CHECKING:
+    import dvc.repo
+
+log = logging.getLogger(__name__)
+
+DEFAULT_PATH = pathlib.Path(".dvc", "tmp", "zntrack", "hashes.db")
+_CHUNK_SIZE = 2**20
+_RACY_WINDOW_NS = 2 * 10**9
+# directories that are always ignored by DVC.
+_IGNORED_DIRS = (".git", ".hg", ".dvc")
+
+
+def file_md5(path: typing.Union[str, pathlib.Path]) -> str:
+    """Compute the md5 hash of the content of the file."""
+    md5 = hashlib.md5()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_CHUNK_SIZE), b""):
+            md5.update(chunk)
+    return md5.hexdigest()
+
+
+def tree_md5(entries: typing.Dict[str, str]) -> str:
+    """Compute the DVC '.dir' hash from the md5 hashes of the files by relpath."""
+    tree = [{"md5": md5, "relpath": relpath} for relpath, md5 in sorted(entries.items())]
+    content = json.dumps(tree, sort_keys=True).encode("utf-8")
+    return hashlib.md5(content).hexdigest() + ".dir"
+
+
+@dataclasses.dataclass
+class HashCache:
+    """Index of '(size, mtime, inode, ctime) -> md5' of files in a sqlite database.
+
+    Attributes
+    ----------
+    path : pathlib.Path
+        The database file. It is created on first use.
+    dvc_state : bool, default = False
+        If True, hashes that are missing from the index are looked up in the
+        state database of the DVC repository in the current directory and
+        newly computed hashes are added to it, so neither ZnTrack nor DVC
+        read a file that the other one already hashed.
+        This imports DVC on the first hash that is not in the index.
+    """
+
+    path: pathlib.Path = DEFAULT_PATH
+    dvc_state: bool = False
+    _connection: sqlite3.Connection = dataclasses.field(
+        default=None, init=False, repr=False
+    )
+    _repo: "dvc.repo.Repo" = dataclasses.field(default=None, init=False, repr=False)
+    _lock: threading.RLock = dataclasses.field(
+        default_factory=threading.RLock, init=False, repr=False
+    )
+
+    def __enter__(self) -> "HashCache":
+        """Use the cache as a context manager that closes the database."""
+        return self
+
+    def __exit__(self, *args) -> None:
+        """Close the database."""
+        self.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the database, creating it if necessary."""
+        if self._connection is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._connection = sqlite3.connect(
+                os.fspath(self.path), timeout=30, check_same_thread=False
+            )
+            columns = [
+                row[1] for row in self._connection.execute("PRAGMA table_info(files)")
+            ]
+            if columns and "ctime_ns" not in columns:
+                # the index of an older version, which is rebuilt.
+                self._connection.execute("DROP TABLE files")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS files (path TEXT PRIMARY KEY, size INTEGER,"
+                " mtime_ns INTEGER, inode INTEGER, ctime_ns INTEGER, md5 TEXT)"
+            )
+        return self._connection
+
+    def _get_repo(self) -> typing.Optional["dvc.repo.Repo"]:
+        """Open the DVC repository for its state database."""
+        if self._repo is None:
+            from dvc.exceptions import NotDvcRepoError
+            from dvc.repo import Repo
+
+            try:
+                self._repo = Repo()
+            except NotDvcRepoError:
+                log.debug("Not a DVC repository, the DVC state is not used.")
+                self.dvc_state = False
+        return self._repo
+
+    def close(self) -> None:
+        """Close the database and the DVC repository."""
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+            if self._repo is not None:
+                self._repo.close()
+                self._repo = None
+
+    def _get_md5(self, path: str, stat: os.stat_result) -> typing.Tuple[str, bool]:
+        """Get the md5 hash of the file and whether it has to be stored."""
+        key = (stat.st_size, stat.st_mtime_ns, stat.st_ino, stat.st_ctime_ns)
+        with self._lock:
+            row = (
+                self._connect()
+                .execute(
+                    "SELECT size, mtime_ns, inode, ctime_ns, md5 FROM files"
+                    " WHERE path = ?",
+                    (path,),
+                )
+                .fetchone()
+            )
+        if row is not None and tuple(row[:4]) == key:
+            return row[4], False
+
+        if self.dvc_state:
+            with self._lock:
+                repo = self._get_repo()
+                if repo is not None:
+                    _, hash_info = repo.state.get(path, repo.fs)
+                    if hash_info is not None and hash_info.name == "md5":
+                        return hash_info.value, True
+
+        log.debug(f"Computing md5 hash of '{path}'")
+        md5 = file_md5(path)
+        if self.dvc_state:
+            from dvc_data.hashfile.hash_info import HashInfo
+
+            with self._lock:
+                repo = self._get_repo()
+                if repo is not None:
+                    repo.state.save(path, repo.fs, HashInfo("md5", md5))
+        return md5, True
+
+    def _store(self, path: str, stat: os.stat_result, md5: str) -> bool:
+        """Add the hash of the file to the index, without committing.
+
+        Returns
+        -------
+        bool
+            False, if the file was modified too recently to trust its stat.
+        """
+        if time.time_ns() - stat.st_mtime_ns < _RACY_WINDOW_NS:
+            return False
+        with self._lock:
+            self._connect().execute(
+                "INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    path,
+                    stat.st_size,
+                    stat.st_mtime_ns,
+                    stat.st_ino,
+                    stat.st_ctime_ns,
+                    md5,
+                ),
+            )
+        return True
+
+    def get(self, file: typing.Union[str, pathlib.Path]) -> str:
+        """Get the md5 hash of the file, computing it only if the file changed.
+
+        Raises
+        ------
+        FileNotFoundError: if the file does not exist.
+        """
+        path = os.path.abspath(file)
+        stat = os.stat(path)
+        md5, modified = self._get_md5(path, stat)
+        if modified:
+            with self._lock:
+                if self._store(path, stat, md5):
+                    self._connect().commit()
+        return md5
+
+    def get_dir(self, directory: typing.Union[str, pathlib.Path]) -> str:
+        """Get the DVC '.dir' hash of the directory.
+
+        Only files that changed since they were last hashed are read.
+
+        Raises
+        ------
+        FileNotFoundError: if the directory does not exist.
+        """
+        root = os.path.abspath(directory)
+        if not os.path.isdir(root):
+            raise FileNotFoundError(f"No such directory: '{directory}'")
+        entries = {}
+        modified = False
+        for dirpath, dirnames, filenames in os.walk(root):
+            dirnames[:] = [x for x in dirnames if x not in _IGNORED_DIRS]
+            for filename in filenames:
+                path = os.path.join(dirpath, filename)
+                stat = os.stat(path)
+                md5, file_modified = self._get_md5(path, stat)
+                if file_modified and self._store(path, stat, md5):
+                    modified = True
+                relpath = pathlib.Path(os.path.relpath(path, root)).as_posix()
+                entries[relpath] = md5
+        if modified:
+            with self._lock:
+                self._connect().commit()
+        return tree_md5(entries)
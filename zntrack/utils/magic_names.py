@@ -0,0 +1,107 @@
+"""Variable names of Nodes for 'Project(magic_names=True)'.
+
+Only the file and position of the call that creates a Node are recorded
+while the graph is built. The variable names are resolved afterwards from
+the syntax tree of the file, which is parsed once per file.
+"""
+
+import ast
+import dataclasses
+import itertools
+import linecache
+import logging
+import sys
+import threading
+import typing
+
+log = logging.getLogger(__name__)
+
+# (lineno, end_lineno, col_offset, end_col_offset) of an assigned call.
+_Position = typing.Tuple[int, int, int, int]
+# filename -> (source lines, {position of the call: variable name})
+_ASSIGNMENTS: typing.Dict[str, typing.Tuple[list, typing.Dict[_Position, str]]] = {}
+_LOCK = threading.Lock()
+
+
+@dataclasses.dataclass(frozen=True)
+class SourceLocation:
+    """The location of the call that created a Node.
+
+    The position of the call is only available for Python 3.11 and above.
+    """
+
+    filename: str
+    lineno: int
+    position: typing.Optional[_Position] = None
+
+
+def get_location(frame: int = 1) -> SourceLocation:
+    """Get the location of the code, 'frame' levels above the caller."""
+    code_frame = sys._getframe(frame + 1)
+    position = None
+    if hasattr(code_frame.f_code, "co_positions"):
+        # the positions of the instructions, the current one is the call.
+        positions = code_frame.f_code.co_positions()
+        position = next(itertools.islice(positions, code_frame.f_lasti // 2, None))
+        if None in position:
+            position = None
+    return SourceLocation(code_frame.f_code.co_filename, code_frame.f_lineno, position)
+
+
+def _parse_assignments(source: str) -> typing.Dict[_Position, str]:
+    """Map the position of every assigned call to the name of the assigned variable."""
+    assignments = {}
+    try:
+        tree = ast.parse(source)
+    except SyntaxError as err:
+        log.debug(f"Unable to parse source for magic names: {err}")
+        return assignments
+
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Assign) and len(node.targets) == 1:
+            target = node.targets[0]
+        elif isinstance(node, ast.AnnAssign) and node.value is not None:
+            target = node.target
+        else:
+            continue
+        if not isinstance(target, ast.Name) or not isinstance(node.value, ast.Call):
+            continue
+        call = node.value
+        position = (call.lineno, call.end_lineno, call.col_offset, call.end_col_offset)
+        assignments[position] = target.id
+    return assignments
+
+
+def _get_assignments(filename: str) -> typing.Dict[_Position, str]:
+    """Get the assignments of the file, parsing it only if the source changed."""
+    lines = linecache.getlines(filename)
+    with _LOCK:
+        cached = _ASSIGNMENTS.get(filename)
+        if cached is not None and cached[0] == lines:
+            return cached[1]
+    assignments = _parse_assignments("".join(lines))
+    with _LOCK:
+        _ASSIGNMENTS[filename] = (lines, assignments)
+    return assignments
+
+
+def resolve(location: SourceLocation) -> typing.Optional[str]:
+    """Get the name of the variable that is assigned at the location.
+
+    Returns
+    -------
+    str|None
+        The variable name or None, if the source is not available
+        or the call is not assigned to a single variable.
+    """
+    assignments = _get_assignments(location.filename)
+    if location.position is not None:
+        return assignments.get(location.position)
+    # the line of the frame can be any line of a multi-line call.
+    names = [
+        name
+        for (lineno, end_lineno, *_), name in assignments.items()
+        if lineno <= location.lineno <= end_lineno
+    ]
+    # without the position, multiple calls on the same line can not be distinguished.
+    return names[0] if len(names) == 1 else None
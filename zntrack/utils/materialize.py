@@ -0,0 +1,227 @@
+"""Local copies of the path outputs of a Node for 'NodeStatus.use_tmp_path'.
+
+Every path is materialized at most once per 'use_tmp_path' context, no matter
+how often the attribute is accessed. Files that are available in the local
+DVC cache are reflinked or copied instead of being downloaded. Reflinks cost
+no additional disk space on file systems that support them. Hardlinks and
+symlinks share the file with the cache and are only used if requested.
+
+Directories can be materialized lazily: their structure is created right away,
+but files that are not in the local DVC cache are only fetched when they are
+opened. 'zntrack.utils.fs_router' calls 'prepare' on open and lists files
+that are not fetched yet in 'os.listdir' and 'os.scandir'. Other file
+access, e.g. 'os.stat', does not see these files, so lazy mode is opt-in.
+"""
+
+import dataclasses
+import logging
+import os
+import pathlib
+import posixpath
+import shutil
+import threading
+import typing
+
+from zntrack.utils import filesystem
+
+if typing.TYPE_CHECKING:
+    from zntrack.core.node import NodeStatus
+
+log = logging.getLogger(__name__)
+
+
+# the supported ways to materialize files from the local DVC cache.
+LINK_TYPES = ("reflink", "hardlink", "symlink", "copy")
+# the link types that are independent of the cache, in the order they are tried.
+DEFAULT_LINK_TYPES = ("reflink", "copy")
+# link types that share the file with the cache, which is made read-only.
+_SHARED_LINK_TYPES = ("hardlink", "symlink")
+
+
+def _create_link(link_type: str, source: pathlib.Path, target: pathlib.Path) -> None:
+    """Create a link of the given type."""
+    if link_type == "reflink":
+        from dvc_objects.fs import system
+
+        system.reflink(os.fspath(source), os.fspath(target))
+    elif link_type == "hardlink":
+        os.link(source, target)
+    elif link_type == "symlink":
+        os.symlink(source, target)
+    elif link_type == "copy":
+        shutil.copyfile(source, target)
+    else:
+        raise ValueError(f"Unknown link type '{link_type}'. Use one of {LINK_TYPES}.")
+
+
+def link_from_cache(
+    cache_file: pathlib.Path,
+    target: pathlib.Path,
+    link_types: typing.Sequence[str] = DEFAULT_LINK_TYPES,
+) -> typing.Optional[str]:
+    """Materialize the file from the local DVC cache.
+
+    Parameters
+    ----------
+    cache_file : pathlib.Path
+        The file in the local DVC cache.
+    target : pathlib.Path
+        The file to create.
+    link_types : list[str], default = DEFAULT_LINK_TYPES
+        The link types to try in order, see 'LINK_TYPES'. Reflinks and copies are
+        independent of the cache. Hardlinks and symlinks share the file with the
+        cache. The file is then made read-only, like DVC protects its cache, because
+        writing to it would corrupt the cache for every revision that uses it.
+
+    Returns
+    -------
+    str|None
+        The link type that was used or None, if no link could be created.
+    """
+    for link_type in link_types:
+        try:
+            _create_link(link_type, cache_file, target)
+        except OSError as err:
+            log.debug(f"Unable to {link_type} '{cache_file}' to '{target}': {err}")
+            continue
+        if link_type in _SHARED_LINK_TYPES:
+            os.chmod(target, 0o444)
+        return link_type
+    return None
+
+
+@dataclasses.dataclass
+class Materializer:
+    """Materialize paths of a Node into a temporary directory.
+
+    Attributes
+    ----------
+    state : NodeStatus
+        The state of the Node, which provides the file system, remote and rev.
+    root : pathlib.Path
+        The temporary directory.
+    lazy : bool, default = False
+        If True, files of directories that are not in the local DVC cache
+        are only fetched when they are opened. Otherwise, they are fetched
+        immediately.
+    link_types : list[str], default = DEFAULT_LINK_TYPES
+        The link types that are tried for files in the local DVC cache,
+        see 'link_from_cache'. Files are only downloaded if their object
+        is missing from the cache.
+    """
+
+    state: "NodeStatus"
+    root: pathlib.Path
+    lazy: bool = False
+    link_types: typing.Sequence[str] = DEFAULT_LINK_TYPES
+    # (rev, path) -> local path
+    _paths: dict = dataclasses.field(default_factory=dict, init=False, repr=False)
+    # local file -> path on the file system, for files that are not fetched yet.
+    _pending: dict = dataclasses.field(default_factory=dict, init=False, repr=False)
+    # local directory -> {name: "file"|"directory"} of lazy directories.
+    _listings: dict = dataclasses.field(default_factory=dict, init=False, repr=False)
+    _lock: threading.RLock = dataclasses.field(
+        default_factory=threading.RLock, init=False, repr=False
+    )
+
+    def get(self, path) -> pathlib.Path:
+        """Get the local path with the content of the path at the revision."""
+        path = pathlib.PurePath(path).as_posix()
+        key = (self.state.rev, path)
+        with self._lock:
+            if key not in self._paths:
+                self._paths[key] = self._materialize(path)
+            return self._paths[key]
+
+    def _get_target(self, path: str) -> pathlib.Path:
+        """Get a new local path in the temporary directory."""
+        target = self.root / posixpath.basename(path)
+        if target.exists() or target.as_posix() in self._listings:
+            # another path with the same name was materialized before.
+            target = self.root / str(len(self._paths)) / posixpath.basename(path)
+            target.parent.mkdir(parents=True)
+        return target
+
+    def _materialize(self, path: str) -> pathlib.Path:
+        """Create the local file or directory for the path."""
+        target = self._get_target(path)
+        fs = self.state.fs
+        if not fs.isdir(path):
+            self._fetch(path, target, fs.info(path))
+            return target
+
+        log.debug(f"Materializing directory '{path}' into '{target}'")
+        target.mkdir()
+        self._listings[target.as_posix()] = {}
+        for file_path, info in fs.find(path, detail=True).items():
+            relpath = posixpath.relpath(file_path, path)
+            local = target.joinpath(*relpath.split(posixpath.sep))
+            self._add_to_listing(target, local)
+            local.parent.mkdir(parents=True, exist_ok=True)
+            if self._link(info, local):
+                continue
+            if self.lazy:
+                self._pending[local.as_posix()] = file_path
+            else:
+                self._fetch(file_path, local, info)
+        return target
+
+    def _add_to_listing(self, target: pathlib.Path, local: pathlib.Path) -> None:
+        """Add the file and its parent directories to the listings."""
+        entry_type = "file"
+        while local != target:
+            listing = self._listings.setdefault(local.parent.as_posix(), {})
+            if listing.get(local.name) == "directory":
+                break
+            listing[local.name] = entry_type
+            entry_type = "directory"
+            local = local.parent
+
+    def _link(self, info: dict, target: pathlib.Path) -> bool:
+        """Link the file from the local DVC cache, if it is available."""
+        cache_file = filesystem.get_cache_path(self.state.fs, info)
+        if cache_file is None:
+            return False
+        link_type = link_from_cache(cache_file, target, self.link_types)
+        if link_type is not None:
+            log.debug(f"Materialized '{target}' from the local cache as {link_type}")
+        return link_type is not None
+
+    def _fetch(self, path: str, target: pathlib.Path, info: dict) -> None:
+        """Link or download the file."""
+        if not self._link(info, target):
+            log.debug(f"Fetching '{path}' into '{target}'")
+            self.state.fs.get_file(path, target.as_posix())
+
+    def prepare(self, file) -> None:
+        """Fetch the local file, if it is part of a lazy directory and not fetched yet."""
+        if not self._pending:
+            return
+        local = pathlib.Path(os.path.abspath(file)).as_posix()
+        with self._lock:
+            path = self._pending.get(local)
+            if path is not None:
+                log.debug(f"Fetching '{path}' on access")
+                self.state.fs.get_file(path, local)
+                # a failed fetch is retried on the next access.
+                del self._pending[local]
+
+    def list_dir(self, directory) -> typing.Optional[typing.Dict[str, str]]:
+        """Get the entries of a lazy directory, including files that are not fetched.
+
+        Returns
+        -------
+        dict[str, str]|None
+            The type "file" or "directory" of every entry by name
+            or None, if the directory is not part of a lazy directory.
+        """
+        local = pathlib.Path(os.path.abspath(directory)).as_posix()
+        with self._lock:
+            listing = self._listings.get(local)
+            return None if listing is None else dict(listing)
+
+    def fetch_all(self) -> None:
+        """Fetch all files that are not fetched yet."""
+        with self._lock:
+            for local in list(self._pending):
+                self.prepare(local)
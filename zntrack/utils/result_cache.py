@@ -0,0 +1,199 @@
+"""Persistent cache of Node results that are loaded from a git revision.
+
+The outputs of a commit never change. If 'config.result_cache' is enabled,
+results loaded via 'from_rev(..., rev=...)' are stored as pickle files under
+'~/.cache/zntrack/results', keyed by the repository, the resolved commit sha,
+the Node name and the field name, and are reused by all later processes.
+The least recently used entries are removed if the cache exceeds
+'config.result_cache_size' bytes.
+
+Only enable the cache if you trust everyone who can write to the cache directory,
+because loading a pickle file can execute arbitrary code.
+"""
+
+import dataclasses
+import functools
+import hashlib
+import json
+import logging
+import os
+import pathlib
+import pickle
+import tempfile
+import typing
+
+from zntrack.utils import filesystem
+from zntrack.utils.config import config
+
+if typing.TYPE_CHECKING:
+    from zntrack import Node
+
+log = logging.getLogger(__name__)
+
+
+def get_cache_dir() -> pathlib.Path:
+    """Get the directory of the result cache."""
+    cache_home = os.environ.get("XDG_CACHE_HOME") or pathlib.Path.home() / ".cache"
+    return pathlib.Path(cache_home, "zntrack", "results")
+
+
+def get_key(instance: "Node", name: str) -> typing.Optional[tuple]:
+    """Get the cache key for the field of the Node.
+
+    Returns
+    -------
+    tuple|None
+        The key or None, if the Node is not loaded from a fixed revision.
+    """
+    remote, rev = instance.state.remote, instance.state.rev
+    if rev is None:
+        # the workspace can change at any time.
+        return None
+    # resolved with git instead of the pooled file system, which might
+    #  be created for a revision that moved since.
+    commit = filesystem.resolve_rev(remote, rev)
+    if commit is None:
+        return None
+    repo = remote
+    if remote is None or pathlib.Path(remote).exists():
+        repo = pathlib.Path(remote or ".").resolve().as_posix()
+    return repo, commit, instance.name, name
+
+
+@dataclasses.dataclass
+class ResultCache:
+    """Least recently used cache of pickled values in a directory.
+
+    The modification time of a file is its last access,
+    so the cache is shared between processes without an index.
+    The cache directory is only scanned for entries to evict once the size
+    of the entries written by this instance exceeds 'max_size'.
+
+    Attributes
+    ----------
+    path : pathlib.Path
+        The cache directory.
+    max_size : int
+        The maximum size of all cached files in bytes.
+    """
+
+    path: pathlib.Path = dataclasses.field(default_factory=get_cache_dir)
+    max_size: int = 2 * 1024**3
+    # the estimated size of the cache, unknown until the directory is scanned.
+    _size: typing.Optional[int] = dataclasses.field(default=None, init=False, repr=False)
+
+    def _get_file(self, key: tuple) -> pathlib.Path:
+        """Get the file of the key."""
+        digest = hashlib.sha256(json.dumps(key).encode()).hexdigest()
+        return self.path / f"{digest}.pkl"
+
+    def get(self, key: tuple) -> typing.Any:
+        """Get the cached value.
+
+        Raises
+        ------
+        KeyError: if the value is not cached.
+        """
+        file = self._get_file(key)
+        try:
+            with file.open("rb") as f:
+                value = pickle.load(f)
+        except FileNotFoundError as err:
+            raise KeyError(key) from err
+        except (pickle.UnpicklingError, EOFError, AttributeError, ImportError) as err:
+            log.debug(f"Removing invalid cache entry {file}: {err}")
+            file.unlink(missing_ok=True)
+            raise KeyError(key) from err
+        try:
+            os.utime(file)
+        except FileNotFoundError:
+            # the entry was evicted by another process.
+            pass
+        return value
+
+    def set(self, key: tuple, value: typing.Any) -> None:
+        """Cache the value, evicting the least recently used values if necessary.
+
+        Values that can not be pickled or written, e.g. if the disk is full,
+        are not cached.
+        """
+        file = self._get_file(key)
+        tmp_file = None
+        try:
+            self.path.mkdir(parents=True, exist_ok=True)
+            # write to a temporary file, so other processes never read partial files.
+            fd, tmp_file = tempfile.mkstemp(dir=self.path, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+                size = f.tell()
+            os.replace(tmp_file, file)
+        except (pickle.PicklingError, TypeError, AttributeError, OSError) as err:
+            log.debug(f"Unable to cache {key}: {err}")
+            if tmp_file is not None:
+                pathlib.Path(tmp_file).unlink(missing_ok=True)
+            return
+        if self._size is not None and self._size + size <= self.max_size:
+            self._size += size
+        else:
+            self.evict()
+
+    def evict(self) -> None:
+        """Remove the least recently used entries until the cache fits 'max_size'."""
+        entries = []
+        for file in self.path.glob("*.pkl"):
+            try:
+                stat = file.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, file))
+        total = sum(x[1] for x in entries)
+        for _, size, file in sorted(entries, key=lambda x: x[0]):
+            if total <= self.max_size:
+                break
+            log.debug(f"Evicting {file} from the result cache")
+            file.unlink(missing_ok=True)
+            total -= size
+        self._size = total
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        for file in self.path.glob("*.pkl"):
+            file.unlink(missing_ok=True)
+        self._size = None
+
+
+@functools.lru_cache(maxsize=None)
+def _get_cache(path: pathlib.Path, max_size: int) -> ResultCache:
+    """Get the result cache of the process for the directory."""
+    return ResultCache(path=path, max_size=max_size)
+
+
+def load(instance: "Node", name: str, loader: typing.Callable[[], typing.Any]):
+    """Load the field of the Node from the result cache or with the loader.
+
+    Parameters
+    ----------
+    instance : Node
+        The Node to load the field for.
+    name : str
+        The name of the field.
+    loader : callable
+        Loads the value, if it is not cached.
+    """
+    if not config.result_cache:
+        return loader()
+    key = get_key(instance, name)
+    if key is None:
+        return loader()
+
+    cache = _get_cache(get_cache_dir(), config.result_cache_size)
+    try:
+        value = cache.get(key)
+    except KeyError:
+        pass
+    else:
+        log.debug(f"Loaded {key} from the result cache")
+        return value
+    value = loader()
+    cache.set(key, value)
+    return value
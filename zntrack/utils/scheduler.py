@@ -0,0 +1,196 @@
+"""Reproduce the stages of a project concurrently.
+
+'dvc repro' runs one stage at a time and holds the repository lock while
+the command of a stage is running, so multiple 'dvc repro' processes can
+not run side by side. Instead, the commands of independent stages are run
+as separate processes and everything that reads or writes the repository,
+i.e. checking whether a stage changed, removing its outputs and committing
+the results to the 'dvc.lock', is done by the scheduler one stage at a time.
+
+Unlike 'dvc repro', the run-cache is neither used nor updated: stages are
+always run, even if DVC could restore their outputs from the run-cache.
+Dependencies are checked before and outputs after running a stage, because
+'dvc commit --force' would otherwise commit a stage with missing outputs.
+"""
+
+import concurrent.futures
+import logging
+import subprocess
+import typing
+
+from zntrack.utils import DVCProcessError, run_dvc_cmd
+
+log = logging.getLogger(__name__)
+
+
+def _get_stages(repo) -> dict:
+    """Get the pipeline stages of the repository by name."""
+    return {stage.addressing: stage for stage in repo.index.stages}
+
+
+def _get_upstream(repo) -> typing.Dict[str, typing.Set[str]]:
+    """Get the stages that each stage depends on through its dependencies."""
+    upstream = {name: set() for name in _get_stages(repo)}
+    # the edges of the DVC graph point from a stage to its dependency.
+    for stage, dependency in repo.index.graph.edges:
+        if stage.addressing in upstream and dependency.addressing in upstream:
+            upstream[stage.addressing].add(dependency.addressing)
+    return upstream
+
+
+def _prepare(name: str, check: bool) -> typing.Optional[tuple]:
+    """Get the command of the stage and remove its outputs.
+
+    Parameters
+    ----------
+    name : str
+        The name of the stage.
+    check : bool
+        If True, the stage is only prepared if it changed.
+
+    Returns
+    -------
+    tuple[list[str], str]|None
+        The commands and the working directory of the stage
+        or None, if the stage should not be run.
+    """
+    from dvc.repo import Repo
+
+    with Repo() as repo, repo.lock:
+        stage = _get_stages(repo)[name]
+        if stage.frozen:
+            log.debug(f"Skipping frozen stage '{name}'")
+            return None
+        if check and not stage.changed():
+            log.debug(f"Skipping unchanged stage '{name}'")
+            return None
+        missing = [str(dep) for dep in stage.deps if not dep.exists]
+        if missing:
+            raise DVCProcessError(f"Stage '{name}' is missing dependencies {missing}.")
+        stage.remove_outs(ignore_remove=False, force=False)
+        cmds = stage.cmd if isinstance(stage.cmd, list) else [stage.cmd]
+        return cmds, stage.wdir
+
+
+def _run(name: str, cmds: typing.List[str], wdir: str) -> str:
+    """Run the commands of the stage."""
+    log.info(f"Running stage '{name}'")
+    for cmd in cmds:
+        log.debug(f"> {cmd}")
+        if subprocess.run(cmd, shell=True, cwd=wdir, check=False).returncode != 0:
+            raise DVCProcessError(f"Failed to reproduce stage '{name}': '{cmd}'")
+    return name
+
+
+def _commit(name: str) -> None:
+    """Commit the outputs of the stage to the 'dvc.lock'.
+
+    Raises
+    ------
+    DVCProcessError: if an output of the stage is missing.
+    """
+    from dvc.repo import Repo
+
+    with Repo() as repo:
+        stage = _get_stages(repo)[name]
+        missing = [str(out) for out in stage.outs if not out.exists]
+    if missing:
+        raise DVCProcessError(f"Stage '{name}' did not create the outputs {missing}.")
+    run_dvc_cmd(["commit", "--force", name], stdout=log.debug)
+
+
+def repro(
+    jobs: int, upstream: typing.Dict[str, typing.Set[str]] = None
+) -> typing.List[str]:
+    """Reproduce all changed stages of the repository in the current directory.
+
+    A stage is started as soon as all stages it depends on are finished.
+    Stages that changed and all stages downstream of them are checked,
+    similar to 'dvc repro'. The run-cache is not used, see the module docstring.
+
+    Parameters
+    ----------
+    jobs : int
+        The number of stage commands that run concurrently.
+    upstream : dict[str, set[str]], optional
+        Additional dependencies between stages, e.g. through 'zn.params',
+        which are not visible as file dependencies in the 'dvc.yaml'.
+
+    Raises
+    ------
+    DVCProcessError: if a stage fails, misses dependencies or does not create
+        all of its outputs. Stages that are running are finished and committed
+        before the error is raised.
+
+    Returns
+    -------
+    list[str]
+        The names of the stages that were run.
+    """
+    from dvc.repo import Repo
+
+    with Repo() as repo:
+        pending = _get_upstream(repo)
+        changed = set(repo.status())
+    for name, deps in (upstream or {}).items():
+        if name in pending:
+            pending[name] |= {x for x in deps if x in pending and x != name}
+
+    finished = []
+    failed = []
+    running = {}
+    dependencies = {name: set(deps) for name, deps in pending.items()}
+    with concurrent.futures.ThreadPoolExecutor(max_workers=jobs) as executor:
+        while pending or running:
+            ready = [x for x, deps in pending.items() if not deps]
+            while ready:
+                name = ready.pop(0)
+                del pending[name]
+                try:
+                    if name in changed:
+                        stage = _prepare(name, check=False)
+                    elif dependencies[name] & set(finished):
+                        stage = _prepare(name, check=True)
+                    else:
+                        stage = None
+                except DVCProcessError as err:
+                    log.error(err)
+                    failed.append(name)
+                    pending.clear()
+                    ready.clear()
+                    break
+                if stage is not None:
+                    running[executor.submit(_run, name, *stage)] = name
+                    continue
+                # skipped stages release their downstream stages immediately.
+                for downstream, deps in pending.items():
+                    deps.discard(name)
+                    if not deps and downstream not in ready:
+                        ready.append(downstream)
+            if not running:
+                if pending:
+                    raise DVCProcessError(
+                        f"Unable to schedule stages {list(pending)}: cyclic dependency."
+                    )
+                break
+            done, _ = concurrent.futures.wait(
+                running, return_when=concurrent.futures.FIRST_COMPLETED
+            )
+            for future in done:
+                name = running.pop(future)
+                try:
+                    future.result()
+                    # 'dvc.lock' updates are serialized in the main thread.
+                    _commit(name)
+                except DVCProcessError as err:
+                    log.error(err)
+                    failed.append(name)
+                    # no new stages are started, running stages are finished.
+                    pending.clear()
+                    continue
+                finished.append(name)
+                for deps in pending.values():
+                    deps.discard(name)
+    if failed:
+        raise DVCProcessError(f"Failed to reproduce stages {failed}.")
+    return finished
@@ -0,0 +1,191 @@
+"""Register multiple DVC stages in a single pass.
+
+Running 'dvc stage add' for every Node opens the repository, parses
+the 'dvc.yaml' and validates the full stage graph for every single stage.
+Instead, all stages are created through one 'dvc.repo.Repo' instance,
+written to the 'dvc.yaml' at once and the graph is validated once.
+
+This relies on internal DVC functions, so the supported DVC versions are
+pinned and the result is compared to 'dvc stage add' in the tests.
+"""
+
+import contextlib
+import json
+import logging
+import typing
+
+from zntrack.utils import DVCProcessError, config, file_io
+
+log = logging.getLogger(__name__)
+
+# Fields that are set on the stage or output level in the 'dvc.yaml' by the user
+#  or other DVC commands. These are kept when a stage is updated.
+_PRESERVED_STAGE_FIELDS = ("meta", "desc")
+_PRESERVED_OUT_FIELDS = ("desc", "type", "labels", "meta", "remote", "push")
+
+
+def _parse_cmd(script: typing.List[str]):
+    """Parse a DVC command with the DVC CLI parser."""
+    from dvc.cli import DvcParserError, parse_args
+
+    try:
+        return parse_args(script)
+    except DvcParserError as err:
+        raise DVCProcessError(f"Invalid DVC command: 'dvc {' '.join(script)}'") from err
+
+
+def _to_plain_data(value):
+    """Convert the OrderedDict based stage definition to plain python objects."""
+    return json.loads(json.dumps(value))
+
+
+def _restore_fields(entry: dict, old_entry: dict) -> dict:
+    """Keep fields of the existing stage, that are not set by 'dvc stage add'."""
+    for key in _PRESERVED_STAGE_FIELDS:
+        if key in old_entry and key not in entry:
+            entry[key] = old_entry[key]
+
+    for section in ("outs", "metrics", "plots"):
+        old_flags = {}
+        for out in old_entry.get(section, []):
+            if isinstance(out, dict):
+                (path, flags), *_ = out.items()
+                old_flags[path] = flags or {}
+        for idx, out in enumerate(entry.get(section, [])):
+            path, flags = (out, {}) if isinstance(out, str) else next(iter(out.items()))
+            restored = {
+                key: old_flags[path][key]
+                for key in _PRESERVED_OUT_FIELDS
+                if key in old_flags.get(path, {}) and key not in flags
+            }
+            if restored:
+                entry[section][idx] = {path: {**flags, **restored}}
+    return entry
+
+
+def _modify_plot(stages: dict, args) -> None:
+    """Apply a 'dvc plots modify' command to the stages that are being added."""
+    from dvc.schema import PLOT_PROPS
+    from dvc_render.vega_templates import get_template
+
+    props = {p: getattr(args, p) for p in PLOT_PROPS}
+    props = {key: value for key, value in props.items() if value is not None}
+
+    for stage in stages.values():
+        for out in stage.outs:
+            if out.def_path != args.target:
+                continue
+            if props.get("template"):
+                get_template(props["template"], stage.repo.plots.templates_dir)
+            if not isinstance(out.plot, dict):
+                out.plot = {}
+            out.plot.update(props)
+            if not out.plot:
+                out.plot = True
+            out.verify_metric()
+            return
+
+    raise DVCProcessError(
+        f"Unable to run 'dvc plots modify {args.target}': '{args.target}' is not an"
+        " output of the stages that are added."
+    )
+
+
+def add_stages(scripts: typing.List[typing.List[str]]) -> typing.List[str]:
+    """Add the stages of multiple 'dvc stage add' commands to the 'dvc.yaml'.
+
+    This is equivalent to calling 'run_dvc_cmd' for every script
+    but writes the 'dvc.yaml' once and validates the stage graph once.
+    Stages that are unchanged are not modified.
+
+    Parameters
+    ----------
+    scripts: list[list[str]]
+        The 'stage add' and 'plots modify' commands as returned by 'get_dvc_cmd'.
+        Commands are applied in the given order.
+
+    Raises
+    ------
+    DVCProcessError:
+        if any of the commands is invalid or the resulting graph is invalid.
+
+    Returns
+    -------
+    list[str]:
+        The names of the stages that were added or modified.
+    """
+    from dvc.commands.plots import CmdPlotsModify
+    from dvc.commands.stage import CmdStageAdd, parse_cmd
+    from dvc.dvcfile import PROJECT_FILE
+    from dvc.exceptions import DvcException
+    from dvc.repo import Repo, lock_repo
+    from dvc.stage import PipelineStage, create_stage
+    from dvc.stage.exceptions import InvalidStageName
+    from dvc.stage.serialize import to_pipeline_file
+    from dvc.stage.utils import is_valid_name, validate_kwargs
+    from dvc.utils.cli_parse import parse_params
+
+    try:
+        dvc_config = file_io.read_file(config.files.dvc) or {}
+    except FileNotFoundError:
+        dvc_config = {}
+    existing_stages = dvc_config.get("stages", {})
+
+    stages = {}
+    try:
+        quiet = config.log_level >= logging.INFO
+        with Repo() as repo, repo.scm_context(quiet=quiet), lock_repo(repo):
+            for script in scripts:
+                args = _parse_cmd(script)
+                if args.func is CmdPlotsModify:
+                    _modify_plot(stages, args)
+                    continue
+                if args.func is not CmdStageAdd:
+                    raise DVCProcessError(
+                        f"Only 'stage add' and 'plots modify' are supported, not 'dvc"
+                        f" {' '.join(script)}'."
+                    )
+                # the same check as 'dvc stage add'
+                if not (args.name and is_valid_name(args.name)):
+                    raise InvalidStageName
+                kwargs = vars(args)
+                kwargs.update({
+                    "cmd": parse_cmd(kwargs.pop("command")),
+                    "params": parse_params(args.params),
+                })
+                if not args.force and (
+                    args.name in existing_stages or args.name in stages
+                ):
+                    raise DVCProcessError(
+                        f"Stage '{args.name}' already exists in '{PROJECT_FILE}'. Use"
+                        " '--force' to overwrite."
+                    )
+                stage_data = validate_kwargs(**kwargs)
+                stages[args.name] = create_stage(
+                    PipelineStage, repo=repo, path=PROJECT_FILE, **stage_data
+                )
+
+            modified = []
+            for name, stage in stages.items():
+                entry = _to_plain_data(to_pipeline_file(stage)[name])
+                old_entry = existing_stages.get(name)
+                if old_entry is not None:
+                    entry = _restore_fields(entry, old_entry)
+                if entry != old_entry:
+                    existing_stages[name] = entry
+                    modified.append(stage)
+
+            if modified:
+                # validate the updated graph once for all stages.
+                repo.check_graph(stages=set(modified))
+                for stage in modified:
+                    with contextlib.suppress(FileNotFoundError):
+                        stage.ignore_outs()
+                log.debug(f"Added or modified stages: {[x.name for x in modified]}")
+    except DvcException as err:
+        raise DVCProcessError(f"DVC failed to add stages: {err}") from err
+
+    if modified:
+        dvc_config["stages"] = existing_stages
+        file_io.write_file(config.files.dvc, value=dvc_config)
+    return [stage.name for stage in modified]
@@ -0,0 +1,190 @@
+"""Check which stages are outdated without running 'dvc status'.
+
+The definition of each stage in the 'dvc.yaml' is compared to the 'dvc.lock'.
+Files are compared by their md5 hashes from the 'HashCache', so only files
+that were modified since the last check are read.
+Stages that can not be checked this way, e.g. with '.dvcignore' patterns,
+are passed on to 'dvc status'.
+"""
+
+import logging
+import pathlib
+import typing
+
+import yaml
+
+from zntrack.utils import NodeStatusResults, config, file_io
+from zntrack.utils.hash_cache import HashCache
+
+log = logging.getLogger(__name__)
+
+
+class _UndecidedError(Exception):
+    """The stage can only be checked by DVC."""
+
+
+def _get_out_paths(stage: dict) -> typing.List[str]:
+    """Get the paths of all outputs of the stage definition."""
+    paths = []
+    for key in ("outs", "metrics", "plots"):
+        for entry in stage.get(key, []):
+            paths.append(entry if isinstance(entry, str) else next(iter(entry)))
+    return paths
+
+
+def _get_params(stage: dict) -> typing.Dict[str, typing.Optional[list]]:
+    """Get the parameter keys of the stage definition for each file."""
+    params = {}
+    for entry in stage.get("params", []):
+        if isinstance(entry, str):
+            params.setdefault("params.yaml", []).append(entry)
+        else:
+            params.update(entry)
+    return params
+
+
+def _get_value(content: dict, key: str):
+    """Get the value of a dotted parameter key."""
+    for part in key.split("."):
+        content = content[part]
+    return content
+
+
+def _params_changed(params: dict, locked: dict) -> bool:
+    """Check if the parameters differ from the locked parameters."""
+    if set(params) != set(locked):
+        return True
+    for file, keys in params.items():
+        try:
+            content = file_io.read_file(pathlib.Path(file))
+        except FileNotFoundError:
+            return True
+        except ValueError as err:
+            raise _UndecidedError from err
+        if keys is None:
+            if content != locked[file]:
+                return True
+            continue
+        if set(keys) != set(locked[file]):
+            return True
+        for key in keys:
+            try:
+                if _get_value(content, key) != locked[file][key]:
+                    return True
+            except (KeyError, TypeError):
+                return True
+    return False
+
+
+def _has_dvcignore() -> bool:
+    """Check for '.dvcignore' patterns, which can exclude files from directories."""
+    try:
+        lines = pathlib.Path(".dvcignore").read_text().splitlines()
+    except FileNotFoundError:
+        return False
+    return any(x.strip() and not x.startswith("#") for x in lines)
+
+
+def _files_changed(entries: list, paths: list, cache: HashCache) -> bool:
+    """Check if the files differ from the locked entries."""
+    if sorted(x["path"] for x in entries) != sorted(paths):
+        return True
+    for entry in entries:
+        if entry.get("hash") != "md5":
+            # files hashed by DVC 2 are checked by DVC.
+            raise _UndecidedError
+        path = pathlib.Path(entry["path"])
+        if entry.get("md5", "").endswith(".dir"):
+            if not path.is_dir():
+                return True
+            if _has_dvcignore():
+                raise _UndecidedError
+            if cache.get_dir(path) != entry["md5"]:
+                return True
+            continue
+        if not path.is_file():
+            return True
+        if "size" in entry and path.stat().st_size != entry["size"]:
+            return True
+        if cache.get(path) != entry["md5"]:
+            return True
+    return False
+
+
+def _stage_changed(stage: dict, locked: typing.Optional[dict], cache: HashCache) -> bool:
+    """Check if the stage needs to be run."""
+    if stage.get("frozen", False):
+        return False
+    if stage.get("always_changed", False) or locked is None:
+        return True
+    if "wdir" in stage or "foreach" in stage or "matrix" in stage:
+        raise _UndecidedError
+    if stage.get("cmd") != locked.get("cmd"):
+        return True
+    if _params_changed(_get_params(stage), locked.get("params", {})):
+        return True
+    if _files_changed(locked.get("deps", []), stage.get("deps", []), cache):
+        return True
+    return _files_changed(locked.get("outs", []), _get_out_paths(stage), cache)
+
+
+def get_status(
+    names: typing.Iterable[str] = None,
+) -> typing.Dict[str, NodeStatusResults]:
+    """Get the status of the stages in the current directory.
+
+    Like 'dvc status', a stage is only outdated if its own definition,
+    parameters, dependencies or outputs changed. Stages downstream of an
+    outdated stage are not marked as outdated.
+
+    Parameters
+    ----------
+    names : list[str], optional
+        The names of the stages. Defaults to all stages in the 'dvc.yaml'.
+
+    Returns
+    -------
+    dict[str, NodeStatusResults]
+        'PENDING' for every stage that needs to be run, 'AVAILABLE' otherwise.
+        Stages that are not in the 'dvc.yaml' are 'PENDING'.
+    """
+    try:
+        stages = (file_io.read_file(config.files.dvc) or {}).get("stages", {})
+    except FileNotFoundError:
+        stages = {}
+    try:
+        lock = yaml.safe_load(pathlib.Path("dvc.lock").read_text()) or {}
+    except FileNotFoundError:
+        lock = {}
+    lock = lock.get("stages", {})
+    names = list(stages) if names is None else list(names)
+
+    results = {}
+    undecided = []
+    with HashCache(dvc_state=True) as cache:
+        for name in names:
+            if name not in stages:
+                results[name] = NodeStatusResults.PENDING
+                continue
+            try:
+                changed = _stage_changed(stages[name], lock.get(name), cache)
+            except _UndecidedError:
+                undecided.append(name)
+                continue
+            results[name] = (
+                NodeStatusResults.PENDING if changed else NodeStatusResults.AVAILABLE
+            )
+
+    if undecided:
+        from dvc.repo import Repo
+
+        log.debug(f"Checking stages {undecided} with 'dvc status'")
+        with Repo() as repo:
+            changed = repo.status(targets=undecided)
+        for name in undecided:
+            results[name] = (
+                NodeStatusResults.PENDING
+                if name in changed
+                else NodeStatusResults.AVAILABLE
+            )
+    return {name: results[name] for name in names}
@@ -0,0 +1,317 @@
+"""A persistent worker process for 'zntrack run'.
+
+Every DVC stage starts a new Python interpreter, which imports ZnTrack,
+DVC and their dependencies again. The worker imports them once and runs
+every request in a forked child process, so stages only pay for a fork.
+Output and exit code of the child are streamed back to the client over a
+Unix socket.
+
+The socket is only accessible by the current user and both sides reject
+peers of other users. Only the environment variables in 'FORWARDED_ENV' are
+sent to the worker, unless forwarding the full environment is enabled with
+'ZNTRACK_WORKER_FORWARD_ENV=1'.
+
+User modules are never imported by the worker itself, because they might
+change between two stages. They are imported in the forked child.
+"""
+
+import importlib
+import json
+import logging
+import os
+import pathlib
+import select
+import signal
+import socket
+import stat
+import struct
+import sys
+import tempfile
+import traceback
+import typing
+
+from zntrack import exceptions
+
+log = logging.getLogger(__name__)
+
+SOCKET_ENV = "ZNTRACK_WORKER_SOCKET"
+FORWARD_ENV = "ZNTRACK_WORKER_FORWARD_ENV"
+# environment variables that are sent to the worker by default.
+FORWARDED_ENV = ("PATH", "PYTHONPATH", "VIRTUAL_ENV")
+FORWARDED_ENV_PREFIXES = ("ZNTRACK_", "DVC_")
+# dependencies that are imported by the worker before the first request.
+DEFAULT_PRELOAD = ("zntrack", "zntrack.project", "dvc.api", "dvc.repo", "dvc.cli")
+
+_EXIT, _STDOUT, _STDERR = 0, 1, 2
+_HEADER = struct.Struct("!BI")
+
+
+def _get_private_dir() -> pathlib.Path:
+    """Get a directory that only the current user can access.
+
+    This is '$XDG_RUNTIME_DIR' or a 'zntrack-<uid>' directory in the temporary
+    directory, which is created with mode 0700.
+
+    Raises
+    ------
+    PermissionError: if the directory is owned by another user or accessible by others.
+    """
+    uid = os.getuid()
+    if "XDG_RUNTIME_DIR" in os.environ:
+        directory = pathlib.Path(os.environ["XDG_RUNTIME_DIR"])
+    else:
+        directory = pathlib.Path(tempfile.gettempdir(), f"zntrack-{uid}")
+        directory.mkdir(mode=0o700, exist_ok=True)
+    info = os.lstat(directory)
+    if not stat.S_ISDIR(info.st_mode) or info.st_uid != uid:
+        raise PermissionError(f"'{directory}' is not a directory owned by uid {uid}.")
+    if stat.S_IMODE(info.st_mode) & 0o077:
+        raise PermissionError(f"'{directory}' is accessible by other users.")
+    return directory
+
+
+def get_socket_path() -> pathlib.Path:
+    """Get the socket of the worker from the environment or the default location."""
+    if SOCKET_ENV in os.environ:
+        return pathlib.Path(os.environ[SOCKET_ENV])
+    return _get_private_dir() / "zntrack-worker.sock"
+
+
+def _get_peer_uid(sock: socket.socket) -> typing.Optional[int]:
+    """Get the uid of the process on the other side of the socket, if supported."""
+    if not hasattr(socket, "SO_PEERCRED"):
+        return None
+    credentials = sock.getsockopt(
+        socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize("3i")
+    )
+    _, uid, _ = struct.unpack("3i", credentials)
+    return uid
+
+
+def _get_env() -> dict:
+    """Get the environment variables that are sent to the worker."""
+    if os.environ.get(FORWARD_ENV) == "1":
+        return dict(os.environ)
+    return {
+        key: value
+        for key, value in os.environ.items()
+        if key in FORWARDED_ENV or key.startswith(FORWARDED_ENV_PREFIXES)
+    }
+
+
+def _send_frame(sock: socket.socket, channel: int, payload: bytes) -> None:
+    """Send a length prefixed message on the channel."""
+    sock.sendall(_HEADER.pack(channel, len(payload)) + payload)
+
+
+def _recv_exact(sock: socket.socket, size: int) -> bytes:
+    """Receive exactly 'size' bytes."""
+    data = b""
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            raise ConnectionError("The worker closed the connection.")
+        data += chunk
+    return data
+
+
+def _recv_frame(sock: socket.socket) -> typing.Tuple[int, bytes]:
+    """Receive a length prefixed message and its channel."""
+    channel, size = _HEADER.unpack(_recv_exact(sock, _HEADER.size))
+    return channel, _recv_exact(sock, size)
+
+
+def submit(kwargs: dict, socket_path: pathlib.Path = None) -> int:
+    """Run a request on the worker and stream its output to stdout and stderr.
+
+    Parameters
+    ----------
+    kwargs : dict
+        The keyword arguments for the target function of the worker.
+    socket_path : pathlib.Path, optional
+        The socket of the worker. Defaults to 'get_socket_path()'.
+
+    Raises
+    ------
+    WorkerNotAvailableError: if the worker is not available.
+
+    Returns
+    -------
+    int:
+        The exit code of the request.
+    """
+    socket_path = socket_path or get_socket_path()
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(os.fspath(socket_path))
+        except OSError as err:
+            raise exceptions.WorkerNotAvailableError(
+                f"No ZnTrack worker is listening on '{socket_path}'."
+            ) from err
+        peer_uid = _get_peer_uid(sock)
+        if peer_uid is None:
+            peer_uid = os.stat(socket_path).st_uid
+        if peer_uid != os.getuid():
+            raise exceptions.WorkerNotAvailableError(
+                f"The worker on '{socket_path}' belongs to uid {peer_uid}."
+            )
+        request = {
+            "kwargs": kwargs,
+            "cwd": os.getcwd(),
+            "env": _get_env(),
+            "replace_env": os.environ.get(FORWARD_ENV) == "1",
+        }
+        sock.sendall(json.dumps(request).encode() + b"\n")
+        while True:
+            channel, payload = _recv_frame(sock)
+            if channel == _EXIT:
+                return int(payload)
+            stream = sys.stdout if channel == _STDOUT else sys.stderr
+            stream.flush()
+            stream.buffer.write(payload)
+            stream.buffer.flush()
+
+
+def _run_target(target: typing.Callable, request: dict) -> int:
+    """Run the request in the current process, which is a fresh fork."""
+    os.chdir(request["cwd"])
+    if request["replace_env"]:
+        os.environ.clear()
+    os.environ.update(request["env"])
+    try:
+        target(**request["kwargs"])
+    except SystemExit as err:
+        code = err.code
+        if isinstance(code, int):
+            return code
+        if code is not None:
+            print(code, file=sys.stderr)
+            return 1
+        return 0
+    except BaseException:  # noqa: BLE001
+        traceback.print_exc()
+        return 1
+    return 0
+
+
+def _handle(conn: socket.socket, target: typing.Callable) -> None:
+    """Handle a single connection, called in a child process of the worker."""
+    buffer = b""
+    while not buffer.endswith(b"\n"):
+        chunk = conn.recv(65536)
+        if not chunk:
+            return
+        buffer += chunk
+    request = json.loads(buffer)
+
+    stdout_r, stdout_w = os.pipe()
+    stderr_r, stderr_w = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        conn.close()
+        os.close(stdout_r)
+        os.close(stderr_r)
+        os.dup2(stdout_w, 1)
+        os.dup2(stderr_w, 2)
+        code = _run_target(target, request)
+        sys.stdout.flush()
+        sys.stderr.flush()
+        os._exit(code)
+
+    os.close(stdout_w)
+    os.close(stderr_w)
+    channels = {stdout_r: _STDOUT, stderr_r: _STDERR}
+    while channels:
+        readable, _, _ = select.select(list(channels), [], [])
+        for fd in readable:
+            data = os.read(fd, 65536)
+            if data:
+                _send_frame(conn, channels[fd], data)
+            else:
+                os.close(fd)
+                del channels[fd]
+    _, status = os.waitpid(pid, 0)
+    _send_frame(conn, _EXIT, str(os.waitstatus_to_exitcode(status)).encode())
+
+
+def _is_listening(socket_path: pathlib.Path) -> bool:
+    """Whether a worker accepts connections on the socket."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(os.fspath(socket_path))
+        except OSError:
+            return False
+    return True
+
+
+def serve(
+    target: typing.Callable,
+    socket_path: pathlib.Path = None,
+    preload: typing.Iterable[str] = DEFAULT_PRELOAD,
+) -> None:
+    """Run the worker until it is interrupted.
+
+    Parameters
+    ----------
+    target : Callable
+        The function that is called with the keyword arguments of every request.
+    socket_path : pathlib.Path, optional
+        The socket to listen on. Defaults to 'get_socket_path()'.
+    preload : list[str]
+        Modules to import before the first request.
+    """
+    if not hasattr(os, "fork"):
+        raise OSError("The ZnTrack worker requires 'os.fork'.")
+    socket_path = pathlib.Path(socket_path or get_socket_path())
+
+    for module in preload:
+        try:
+            importlib.import_module(module)
+        except ImportError as err:
+            log.warning(f"Unable to preload '{module}': {err}")
+
+    if socket_path.exists():
+        if _is_listening(socket_path):
+            raise OSError(f"A worker is already listening on '{socket_path}'.")
+        # the socket of a worker that was killed.
+        socket_path.unlink()
+
+    # children are reaped automatically, the worker never waits for them.
+    signal.signal(signal.SIGCHLD, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as server:
+        umask = os.umask(0o177)
+        try:
+            server.bind(os.fspath(socket_path))
+        finally:
+            os.umask(umask)
+        os.chmod(socket_path, 0o600)
+        server.listen()
+        log.info(f"ZnTrack worker listening on '{socket_path}'")
+        try:
+            while True:
+                conn, _ = server.accept()
+                peer_uid = _get_peer_uid(conn)
+                if peer_uid is not None and peer_uid != os.getuid():
+                    log.warning(f"Rejected connection of uid {peer_uid}")
+                    conn.close()
+                    continue
+                # a SIGTERM during the fork would be raised and ignored in its hooks.
+                signal.pthread_sigmask(signal.SIG_BLOCK, {signal.SIGTERM})
+                pid = os.fork()
+                if pid == 0:
+                    server.close()
+                    signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+                    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+                    signal.pthread_sigmask(signal.SIG_UNBLOCK, {signal.SIGTERM})
+                    try:
+                        _handle(conn, target)
+                    except Exception:  # noqa: BLE001
+                        log.exception("Unable to handle request")
+                    finally:
+                        conn.close()
+                        os._exit(0)
+                conn.close()
+                signal.pthread_sigmask(signal.SIG_UNBLOCK, {signal.SIGTERM})
+        finally:
+            socket_path.unlink(missing_ok=True)